@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Throughput of the exporters' URL rewriting: ordered rule table vs single regex pass.
+
+src/export/rewrite.py applies each exporter's rule table as ordered str.replace
+passes. This script measures it against the single-pass alternative (origins
+normalised first, then one compiled alternation with a dict dispatch), checks that
+both give the same output, and reports throughput for every deployment mode.
+
+Pages, in order of preference:
+  - files given on the command line
+  - the largest dataviz2 pages rendered in-process (needs the app dependencies)
+  - the largest dataviz2 pages already in dist/pm/dataviz2/
+  - the largest pms/dataviz2 sources wrapped in a page shell (an approximation:
+    no layout, fewer links than a rendered page)
+
+Usage:
+  python scripts/benchmark_url_rewriter.py
+  python scripts/benchmark_url_rewriter.py dist/pm/dataviz2/session_2_a.html --repeat 50
+
+The exact-output golden check is tests/test_url_rewriter.py.
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# Load the module on its own: the in-process rendering below is optional
+_spec = importlib.util.spec_from_file_location(
+    "url_rewrite", ROOT / "src" / "export" / "rewrite.py"
+)
+rewrite = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(rewrite)
+
+PAGE_SHELL = (
+    '<!DOCTYPE html><html><head><link rel="stylesheet" href="/static/css/main.css">'
+    '<script type="module">import PMRuntime from "/static/js/pm-runtime.js";'
+    " import { ui } from '@js/index-ui.js';</script></head><body>"
+    '<nav><a href="/">Accueil</a><a href="/pm/dataviz2/index.md?format=html">Sommaire</a></nav>'
+    "{body}"
+    '<form action="/sujets0/form"></form><script src="/static/js/app.js"></script></body></html>'
+)
+
+
+class SinglePassRewriter:
+    """The single-pass candidate: ordered origin pass, then one alternation pass."""
+
+    def __init__(self, rewriter):
+        origins = [literal for literal, replacement in rewriter.rules if replacement == "/"]
+        self.origins = tuple(origins)
+        self.dispatch = {}
+        for literal, replacement in rewriter.rules[len(origins) :]:
+            self.dispatch.setdefault(literal, replacement)
+        # Longest first: `.md?format=html"` before `.md"`
+        literals = sorted(self.dispatch, key=len, reverse=True)
+        self.pattern = re.compile("|".join(map(re.escape, literals)))
+
+    def __call__(self, content: str) -> str:
+        # Origins cascade in order (stripping one can expose the next)
+        for origin in self.origins:
+            if origin in content:
+                content = content.replace(origin, "/")
+        dispatch = self.dispatch
+        return self.pattern.sub(lambda match: dispatch[match.group()], content)
+
+
+def hardcoded_rewriter(base_path: str = "/maths.pm"):
+    rules = rewrite.base_path_rules(base_path, js_alias_leads=("from '", 'from "'))
+    return rewrite.UrlRewriter(rules, rewrite.GITHUB_ORIGINS)
+
+
+# (name, rewriter for a route) for every deployment mode
+MODES = [
+    ("github modern", lambda route: rewrite.github_pages_rewriter("", False)),
+    ("github legacy /maths.pm", lambda route: rewrite.github_pages_rewriter("/maths.pm", True)),
+    ("hardcoded /maths.pm", lambda route: hardcoded_rewriter()),
+    ("builder base_path /maths.pm", lambda route: rewrite.static_builder_rewriter("/maths.pm", 0)),
+    (
+        "builder relative",
+        lambda route: rewrite.static_builder_rewriter("", rewrite.route_depth(route)),
+    ),
+    ("builder root", lambda route: rewrite.static_builder_rewriter("", 0)),
+]
+
+
+async def render_dataviz2_pages(limit: int) -> list:
+    """Render the largest dataviz2 PMs in-process, before any rewriting."""
+    sys.path.insert(0, str(ROOT))
+    from src import app
+    from src.export import ASGIExporter
+
+    sources = sorted(
+        (ROOT / "pms" / "dataviz2").glob("*.md"), key=lambda p: p.stat().st_size
+    )[-limit:]
+    pages = []
+    async with ASGIExporter(app, ROOT / "dist", run_lifespan=False) as exporter:
+        for source in reversed(sources):
+            route = f"/pm/dataviz2/{source.name}?format=html"
+            response = await exporter.client.get(route)
+            if response.status_code == 200:
+                pages.append((route, response.text))
+    return pages
+
+
+def load_pages(files: list, limit: int) -> tuple:
+    """(description, [(route, html)])."""
+    if files:
+        pages = [(f"/pm/{Path(f).name}", Path(f).read_text(encoding="utf-8")) for f in files]
+        return "given files", pages
+    try:
+        pages = asyncio.run(render_dataviz2_pages(limit))
+        if pages:
+            return "rendered dataviz2 pages", pages
+    except Exception as e:
+        print(f"In-process rendering unavailable ({e})")
+    built = sorted((ROOT / "dist/pm/dataviz2").glob("*.html"), key=lambda p: p.stat().st_size)
+    if built:
+        pages = [
+            (f"/pm/dataviz2/{p.name}", p.read_text(encoding="utf-8"))
+            for p in reversed(built[-limit:])
+        ]
+        return "dist/pm/dataviz2 pages", pages
+    sources = sorted((ROOT / "pms/dataviz2").glob("*.md"), key=lambda p: p.stat().st_size)
+    pages = [
+        (
+            f"/pm/dataviz2/{p.name}",
+            PAGE_SHELL.replace("{body}", p.read_text(encoding="utf-8")),
+        )
+        for p in reversed(sources[-limit:])
+    ]
+    return "pms/dataviz2 sources in a page shell (approximation)", pages
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("files", nargs="*", help="HTML files to use instead of dataviz2 pages")
+    parser.add_argument("--limit", type=int, default=5, help="Number of dataviz2 pages")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per page and mode")
+    args = parser.parse_args()
+
+    description, pages = load_pages(args.files, args.limit)
+    if not pages:
+        print("No pages to benchmark")
+        return 1
+    total_bytes = sum(len(html.encode("utf-8")) for _, html in pages) * args.repeat
+    print(f"Pages: {len(pages)} {description}, {total_bytes / 1e6:.1f} MB per mode")
+
+    mismatches = 0
+    for name, rewriter_for in MODES:
+        candidates = {
+            "rule table": [(route, html, rewriter_for(route)) for route, html in pages],
+        }
+        candidates["single pass"] = [
+            (route, html, SinglePassRewriter(rewriter))
+            for route, html, rewriter in candidates["rule table"]
+        ]
+        for (_, html, table), (route, _, single) in zip(
+            candidates["rule table"], candidates["single pass"]
+        ):
+            if table(html) != single(html):
+                mismatches += 1
+                print(f"✗ {name} {route}: single pass differs")
+
+        timings = {}
+        for label, runs in candidates.items():
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                for _, html, rewriter in runs:
+                    rewriter(html)
+            timings[label] = time.perf_counter() - start
+        print(
+            f"  {name:<28} rule table {total_bytes / timings['rule table'] / 1e6:8.1f} MB/s   "
+            f"single pass {total_bytes / timings['single pass'] / 1e6:8.1f} MB/s"
+        )
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
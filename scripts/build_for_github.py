@@ -13,13 +13,29 @@ Usage:
 
   # For legacy GitHub Pages (pointcarre-app.github.io/maths.pm)
   LEGACY_GITHUB_PAGES=true python scripts/build_for_github.py
+
+  # Routes are rendered in-process, concurrently (default: one per CPU)
+  BUILD_CONCURRENCY=16 python scripts/build_for_github.py
+
+  # dist/ is updated incrementally from dist/.build-manifest.json; force a clean build with
+  FULL_REBUILD=true python scripts/build_for_github.py
+
+  # Static CSS/JS get content-hashed copies (dist/asset-manifest.json) and text files
+  # get .gz/.br siblings; turn either off with
+  FINGERPRINT=false PRECOMPRESS=false python scripts/build_for_github.py
+
+  # Minify exported HTML/JSON (inline CSS/JS too when minify-html is installed)
+  MINIFY=true python scripts/build_for_github.py
+
+  # Files mirrored into dist/ are reflinked or hardlinked when possible; force copies with
+  BUILD_LINK_MODE=copy python scripts/build_for_github.py
 """
 
 import asyncio
+import os
 import sys
 import logging
 import time
-import threading
 from pathlib import Path
 import shutil
 import json
@@ -27,111 +43,110 @@ import json
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-import uvicorn
 from src import app
-import httpx
+from src.export import (
+    ASGIExporter,
+    BuildManifest,
+    RouteInputs,
+    copy_files_with_manifest,
+    has_build_manifest,
+    merge_route_results,
+    plan_routes,
+)
+from src.export.compress import is_generated_asset, run_asset_stage
+from src.export.minify import minify_route_outputs
+from src.export.rewrite import github_pages_rewriter
+from src.lifespan.sync import log_sync_stats, sync_tree
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 
-def run_server():
-    """Run the FastAPI server in a background thread"""
-    try:
-        uvicorn.run(app, host="127.0.0.1", port=8000, log_level="error")
-    except Exception as e:
-        logger.error(f"Server failed to start: {e}")
-        sys.exit(1)
-
-
-async def fetch_and_save(client, route, output_dir, base_path="/maths.pm", modern_paths=False):
-    """Fetch a route and save it to disk with proper path conversion"""
-    try:
-        url = f"http://127.0.0.1:8000{route}"
-        logger.info(f"Fetching: {route}")
-        response = await client.get(url, follow_redirects=True)
-
-        if response.status_code != 200:
-            logger.error(f"Failed {route}: Status {response.status_code}")
-            return False
-
-        # Determine output path
-        output_dir = Path(output_dir)
-
-        # Remove query parameters from route for file path determination
-        route_path = route.split("?")[0]
-
-        if route_path == "/":
-            output_path = output_dir / "index.html"
-        elif route_path.endswith("/"):
-            output_path = output_dir / route_path[1:] / "index.html"
-        elif "." in route_path.split("/")[-1]:
-            # Has extension - convert .md to .html for PM routes
-            if route_path.endswith(".md") and route_path.startswith("/pm/"):
-                output_path = output_dir / route_path[1:].replace(".md", ".html")
-            else:
-                output_path = output_dir / route_path[1:]
-        else:
-            # No extension, save as HTML
-            output_path = output_dir / f"{route_path[1:]}.html"
-
-        # Create parent directories
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-
-        # Fix paths in HTML content
-        if response.headers.get("content-type", "").startswith("text/html"):
-            content = response.text
-
-            # CRITICAL: Remove all localhost URLs first
-            content = content.replace("http://127.0.0.1:8000/", "/")
-            content = content.replace("http://localhost:8000/", "/")
-            content = content.replace("https://127.0.0.1:8000/", "/")
-            content = content.replace("https://localhost:8000/", "/")
-
-            # Fix all absolute paths to include base_path (only for legacy GitHub Pages)
-            if base_path and not modern_paths:
-                # Legacy GitHub Pages deployment: add /maths.pm prefix
-                content = content.replace('href="/', f'href="{base_path}/')
-                content = content.replace("href='/", f"href='{base_path}/")
-                content = content.replace('src="/', f'src="{base_path}/')
-                content = content.replace("src='/", f"src='{base_path}/")
-                content = content.replace('action="/', f'action="{base_path}/')
-
-                # Fix imports
-                content = content.replace("import '/static/", f"import '{base_path}/static/")
-                content = content.replace('import "/static/', f'import "{base_path}/static/')
-                content = content.replace("from '/static/", f"from '{base_path}/static/")
-                content = content.replace('from "/static/', f'from "{base_path}/static/')
-
-                # Fix PMRuntime import specifically
-                content = content.replace(
-                    "import PMRuntime from '/static/js/",
-                    f"import PMRuntime from '{base_path}/static/js/",
-                )
-                content = content.replace(
-                    'import PMRuntime from "/static/js/',
-                    f'import PMRuntime from "{base_path}/static/js/',
-                )
-            # Modern deployment (maths.pm): keep original paths
-            # No transformations needed - paths stay as /sujets0/form, /static/css/main.css, etc.
-
-            # Convert PM links from .md to .html and remove ?format=html
-            # This ensures links work in the static site
-            content = content.replace('.md?format=html"', '.html"')
-            content = content.replace(".md?format=html'", ".html'")
-            content = content.replace('.md"', '.html"')  # Convert any remaining .md links
-            content = content.replace(".md'", ".html'")
-
-            output_path.write_text(content, encoding="utf-8")
-        else:
-            output_path.write_bytes(response.content)
-
-        logger.info(f"✓ Saved: {output_path.relative_to(output_dir)}")
-        return True
+def collect_routes() -> list[str]:
+    """HARDCODED ROUTES - ALL OF THEM, plus every file under pms/"""
+    routes = []
+
+    # Core routes
+    routes.extend(
+        [
+            "/",  # CRITICAL - Main index
+            "/ressources",
+            "/readme",
+            "/settings",
+            "/sitemap.xml",  # SEO sitemap
+            "/kill-service-workers",
+            "/pm",  # PM root
+            "/rgpd",
+            "/identity",
+        ]
+    )
+
+    # PM example/demo routes
+    routes.extend(
+        [
+            "/dynamic-pm-demo",  # Dynamic PM loading demo
+            "/simple-dynamic-demo",  # Simple dynamic PM demo
+            # Add any other PM example routes here as needed
+        ]
+    )
+
+    # API routes
+    routes.extend(
+        [
+            "/api/health",
+            "/api/settings",
+            "/api/settings/serialized",
+            "/openapi.json",
+            "/docs",
+            "/redoc",
+        ]
+    )
+
+    # Product routes
+    routes.extend(
+        [
+            "/sujets0",
+            "/sujets0/form",
+            "/corsica/",
+            "/nagini",
+        ]
+    )
+
+    # JupyterLite routes (may fail but try anyway)
+    routes.extend(
+        [
+            "/jupyterlite/",
+            "/jupyterlite/lab",
+            "/jupyterlite/repl",
+            "/jupyterlite/embed",
+            "/jupyterlite/sandbox/repl",
+            "/jupyter",
+            "/jupyter/repl",
+        ]
+    )
+
+    # HARDCODE ALL PM ROUTES FROM pms/ directory
+    pms_dir = Path("pms")
+    if pms_dir.exists():
+        logger.info("Scanning pms/ directory for ALL files...")
+
+        # Get ALL markdown files
+        for md_file in pms_dir.rglob("*.md"):
+            relative_path = md_file.relative_to(pms_dir)
+            # Add ?format=html to get rendered HTML instead of raw markdown
+            route_path = f"/pm/{relative_path.as_posix()}?format=html"
+            routes.append(route_path)
+            logger.info(f"  Added MD route: {route_path}")
+
+        # Get ALL other files (SVG, HTML, etc.)
+        for file_path in pms_dir.rglob("*"):
+            if file_path.is_file() and file_path.suffix != ".md":
+                relative_path = file_path.relative_to(pms_dir)
+                route_path = f"/pm/{relative_path.as_posix()}"
+                routes.append(route_path)
+                logger.info(f"  Added asset route: {route_path}")
 
-    except Exception as e:
-        logger.error(f"✗ Failed {route}: {e}")
-        return False
+    return routes
 
 
 async def build_static_site():
@@ -142,8 +157,6 @@ async def build_static_site():
     # Detect deployment type
     # DEFAULT: GitHub Pages with custom domain (maths.pm) - no /maths.pm prefix needed
     # LEGACY: Old GitHub Pages format (pointcarre-app.github.io/maths.pm) - needs /maths.pm prefix
-    import os
-
     legacy_github_pages = os.environ.get("LEGACY_GITHUB_PAGES", "false").lower() == "true"
 
     if legacy_github_pages:
@@ -157,156 +170,97 @@ async def build_static_site():
         base_path = ""  # No base path for modern deployment
         use_legacy_paths = False
 
-    # Clean and create output directory
-    if output_dir.exists():
-        shutil.rmtree(output_dir)
+    # Incremental build: reuse dist/ when it carries a manifest, unless FULL_REBUILD=true
+    full_rebuild = os.environ.get("FULL_REBUILD", "false").lower() == "true"
+    manifest = BuildManifest.load(output_dir)
+    if full_rebuild or not manifest.loaded:
+        # An output left by StaticSiteBuilder (its own manifest) is kept and rendered over
+        if output_dir.exists() and (full_rebuild or not has_build_manifest(output_dir)):
+            logger.info("🧹 Full rebuild: cleaning output directory")
+            shutil.rmtree(output_dir)
+        manifest = BuildManifest(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    # Start server
-    logger.info("Starting server...")
-    server_thread = threading.Thread(target=run_server, daemon=True)
-    server_thread.start()
-
-    # Wait for server to start with retries
-    max_retries = 10
-    retry_delay = 2
-    server_ready = False
-
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        for i in range(max_retries):
-            try:
-                health = await client.get("http://127.0.0.1:8000/api/health")
-                if health.status_code == 200:
-                    logger.info(f"Server is ready (attempt {i + 1})")
-                    server_ready = True
-                    break
-            except Exception:
-                if i < max_retries - 1:
-                    logger.info(f"Waiting for server... (attempt {i + 1}/{max_retries})")
-                    time.sleep(retry_delay)
-                else:
-                    logger.error(f"Server failed to start after {max_retries} attempts")
-
-        if not server_ready:
-            logger.error("Server is not responding - build cannot continue")
-            sys.exit(1)
-
-        # HARDCODED ROUTES - ALL OF THEM
-        routes = []
-
-        # Core routes
-        routes.extend(
-            [
-                "/",  # CRITICAL - Main index
-                "/ressources",
-                "/readme",
-                "/settings",
-                "/sitemap.xml",  # SEO sitemap
-                "/kill-service-workers",
-                "/pm",  # PM root
-                "/rgpd",
-                "/identity",
-            ]
-        )
-
-        # PM example/demo routes
-        routes.extend(
-            [
-                "/dynamic-pm-demo",  # Dynamic PM loading demo
-                "/simple-dynamic-demo",  # Simple dynamic PM demo
-                # Add any other PM example routes here as needed
-            ]
-        )
-
-        # API routes
-        routes.extend(
-            [
-                "/api/health",
-                "/api/settings",
-                "/api/settings/serialized",
-                "/openapi.json",
-                "/docs",
-                "/redoc",
-            ]
-        )
+    concurrency = int(os.environ.get("BUILD_CONCURRENCY", os.cpu_count() or 4))
+    minify = os.environ.get("MINIFY", "false").lower() == "true"
+    # Share storage with src/static and pms/ (reflink, else hardlink, else copy)
+    link_mode = os.environ.get("BUILD_LINK_MODE", "auto")
 
-        # Product routes
-        routes.extend(
-            [
-                "/sujets0",
-                "/sujets0/form",
-                "/corsica/",
-                "/nagini",
-            ]
-        )
+    # Fix paths in HTML content: server origins, base path (legacy only), .md -> .html
+    rewriter = github_pages_rewriter(base_path, use_legacy_paths)
 
-        # JupyterLite routes (may fail but try anyway)
-        routes.extend(
-            [
-                "/jupyterlite/",
-                "/jupyterlite/lab",
-                "/jupyterlite/repl",
-                "/jupyterlite/embed",
-                "/jupyterlite/sandbox/repl",
-                "/jupyter",
-                "/jupyter/repl",
-            ]
-        )
+    def rewrite_html(content: str, route: str) -> str:
+        return rewriter(content)
 
-        # HARDCODE ALL PM ROUTES FROM pms/ directory
-        pms_dir = Path("pms")
-        if pms_dir.exists():
-            logger.info("Scanning pms/ directory for ALL files...")
+    # Drive the app in-process: no server thread, no loopback HTTP
+    async with ASGIExporter(
+        app, output_dir, concurrency=concurrency, rewrite_html=rewrite_html
+    ) as exporter:
+        # JupyterLite builds in the background; its output must exist before static/ is copied
+        await exporter.wait_for_jupyterlite()
 
-            # Get ALL markdown files
-            for md_file in pms_dir.rglob("*.md"):
-                relative_path = md_file.relative_to(pms_dir)
-                # Add ?format=html to get rendered HTML instead of raw markdown
-                route_path = f"/pm/{relative_path.as_posix()}?format=html"
-                routes.append(route_path)
-                logger.info(f"  Added MD route: {route_path}")
+        routes = collect_routes()
+        logger.info(f"Total routes to fetch: {len(routes)}")
 
-            # Get ALL other files (SVG, HTML, etc.)
-            for file_path in pms_dir.rglob("*"):
-                if file_path.is_file() and file_path.suffix != ".md":
-                    relative_path = file_path.relative_to(pms_dir)
-                    route_path = f"/pm/{relative_path.as_posix()}"
-                    routes.append(route_path)
-                    logger.info(f"  Added asset route: {route_path}")
+        # Only re-render routes whose inputs (PM, its dependencies, templates, settings) changed
+        route_hashes, stale_routes = plan_routes(
+            manifest,
+            routes,
+            # Minified and plain outputs differ: toggling MINIFY re-renders everything
+            RouteInputs(Path.cwd(), variant=f"{base_path}|minify" if minify else base_path),
+        )
+        logger.info(
+            f"Routes to render: {len(stale_routes)} "
+            f"({len(route_hashes) - len(stale_routes)} unchanged)"
+        )
 
-        logger.info(f"Total routes to fetch: {len(routes)}")
+        # Render stale routes concurrently
+        export_start = time.perf_counter()
+        rendered = await exporter.export(stale_routes)
+        timings = exporter.timing_report(rendered, time.perf_counter() - export_start)
+        results = merge_route_results(manifest, route_hashes, rendered)
 
-        # Fetch all routes
-        results = []
-        for route in routes:
-            success = await fetch_and_save(
-                client, route, output_dir, base_path, not use_legacy_paths
-            )
-            results.append({"route": route, "success": success})
+        # Minify what was just rendered (skipped routes were minified by an earlier run)
+        minified = (
+            minify_route_outputs(output_dir, rendered, max_workers=concurrency) if minify else None
+        )
 
-        # Copy static files DIRECTLY
+        # Copy static files DIRECTLY (changed files only, orphans removed)
         logger.info("Copying static files...")
         src_static = Path("src/static")
         dst_static = output_dir / "static"
         if src_static.exists():
-            shutil.copytree(src_static, dst_static, dirs_exist_ok=True)
-            logger.info(f"✓ Copied static files to {dst_static}")
+            stats = sync_tree(
+                src_static,
+                dst_static,
+                label="dist/static",
+                compare="hash",
+                keep=is_generated_asset,
+                link=link_mode,
+            )
+            log_sync_stats(stats, emoji="✓")
 
         # Copy PM files DIRECTLY as fallback
         logger.info("Copying PM files directly as fallback...")
-        src_pms = Path("pms")
-        dst_pm = output_dir / "pm"
-        if src_pms.exists():
-            # Ensure pm directory exists
-            dst_pm.mkdir(parents=True, exist_ok=True)
-            # Copy entire pms directory content
-            for item in src_pms.rglob("*"):
-                if item.is_file():
-                    relative = item.relative_to(src_pms)
-                    dst_path = dst_pm / relative
-                    dst_path.parent.mkdir(parents=True, exist_ok=True)
-                    shutil.copy2(item, dst_path)
-            logger.info(f"✓ Copied PM files to {dst_pm}")
+        route_outputs = {str(r["output"]) for r in results if r.get("output")}
+        pm_copies, copied = copy_files_with_manifest(
+            manifest, Path("pms"), "pm", skip_outputs=route_outputs, link=link_mode
+        )
+        logger.info(f"✓ Copied PM files to {output_dir / 'pm'} ({copied}/{len(pm_copies)} changed)")
+
+        # Remove outputs whose routes or sources disappeared
+        removed = manifest.prune(route_hashes, pm_copies)
+        if removed:
+            logger.info(f"🗑️ Removed {len(removed)} stale outputs")
+        manifest.save()
+
+        # Fingerprint CSS/JS and precompress text files (unchanged files are skipped)
+        assets = run_asset_stage(
+            output_dir,
+            fingerprint=os.environ.get("FINGERPRINT", "true").lower() == "true",
+            precompress=os.environ.get("PRECOMPRESS", "true").lower() == "true",
+            max_workers=concurrency,
+        )
 
         # Create .nojekyll
         (output_dir / ".nojekyll").touch()
@@ -321,6 +275,12 @@ async def build_static_site():
             "total_routes": len(results),
             "successful": successful,
             "failed": failed,
+            "rendered": len(rendered),
+            "skipped": len(results) - len(rendered),
+            "removed": removed,
+            "timings": timings,
+            "minify": minified,
+            "assets": assets,
             "routes": results,
         }
 
@@ -332,6 +292,10 @@ async def build_static_site():
         logger.info(f"  Total routes: {len(results)}")
         logger.info(f"  Successful: {successful}")
         logger.info(f"  Failed: {failed}")
+        logger.info(
+            f"  Render: {timings['elapsed_s']}s ({timings['routes_per_second']} routes/s, "
+            f"p95 {timings['p95_ms']} ms)"
+        )
         logger.info(f"  Output: {output_dir}")
         logger.info("=" * 60)
 
@@ -42,11 +42,29 @@ async def build_static_site(for_github_pages=False):
             health_data = health_response.json()
             logger.info(f"Server is healthy: {health_data}")
 
-            # Trigger build
+            # Trigger build: it runs as a background job on the server
             logger.info("Starting static site build...")
-            response = await client.get("http://127.0.0.1:8000/api/build")
+            response = await client.post("http://127.0.0.1:8000/api/build")
             response.raise_for_status()
-            result = response.json()
+            job = response.json()
+            logger.info(f"Build job {job['id']} submitted")
+
+            # Poll the job until it finishes
+            while job["status"] in ("queued", "running"):
+                await asyncio.sleep(1.0)
+                response = await client.get(f"http://127.0.0.1:8000{job['status_url']}")
+                response.raise_for_status()
+                job = {**response.json(), "status_url": job["status_url"]}
+                if job.get("total"):
+                    logger.info(
+                        f"  {job['phase']}: {job['done']}/{job['total']} routes "
+                        f"({job['failed']} failed) {job.get('current') or ''}"
+                    )
+
+            if job["status"] == "error":
+                logger.error(f"❌ Build failed: {job.get('error')}")
+                return False
+            result = job["report"]
 
             # Display results
             if result.get("status") == "success":
@@ -18,6 +18,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import uvicorn
 from src import app
+from src.export.rewrite import GITHUB_ORIGINS, UrlRewriter, base_path_rules
 import httpx
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -67,27 +68,9 @@ async def fetch_and_save(client, route, output_dir, base_path="/maths.pm"):
         if response.headers.get("content-type", "").startswith("text/html"):
             content = response.text
             
-            # CRITICAL: Remove all localhost URLs first
-            content = content.replace("http://127.0.0.1:8000/", "/")
-            content = content.replace("http://localhost:8000/", "/")
-            content = content.replace("https://127.0.0.1:8000/", "/")
-            content = content.replace("https://localhost:8000/", "/")
-
-            # Fix all absolute paths to include base_path
-            if base_path:
-                content = content.replace('href="/', f'href="{base_path}/')
-                content = content.replace("href='/", f"href='{base_path}/")
-                content = content.replace('src="/', f'src="{base_path}/')
-                content = content.replace("src='/", f"src='{base_path}/")
-                content = content.replace('action="/', f'action="{base_path}/')
-
-                # Fix imports
-                content = content.replace("import '/static/", f"import '{base_path}/static/")
-                content = content.replace('import "/static/', f'import "{base_path}/static/')
-                content = content.replace("from '/static/", f"from '{base_path}/static/")
-                content = content.replace('from "/static/', f'from "{base_path}/static/')
-                content = content.replace("from '@js/", f"from '{base_path}/static/js/")
-                content = content.replace('from "@js/', f'from "{base_path}/static/js/')
+            # CRITICAL: Remove all localhost URLs first, then add base_path to absolute paths
+            rules = base_path_rules(base_path, js_alias_leads=("from '", 'from "')) if base_path else []
+            content = UrlRewriter(rules, GITHUB_ORIGINS)(content)
 
             output_path.write_text(content, encoding="utf-8")
         else:
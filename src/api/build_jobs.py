@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (C) 2025 SAS POINTCARRE.APP
+"""
+Background static builds for /api/build
+A build is submitted as a job and runs as an asyncio task: the request returns at
+once with a job id, progress is read from /api/build/{id} (polling) or
+/api/build/{id}/events (SSE), and the final report stays available afterwards.
+One build runs at a time per output directory; a submission for a target that
+already has a queued or running job returns that job.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger("maths_pm")
+
+# Finished jobs kept for /api/build/{id}
+MAX_FINISHED_JOBS = 20
+
+
+class BuildJob:
+    """State of one static build, shared with the progress endpoints."""
+
+    def __init__(self, output_dir: str, base_path: str, incremental: bool):
+        self.id = uuid.uuid4().hex[:12]
+        self.output_dir = output_dir
+        self.base_path = base_path
+        self.incremental = incremental
+        self.status = "queued"  # queued | running | success | partial | error
+        self.phase: Optional[str] = None
+        self.done = 0
+        self.total = 0
+        self.current: Optional[str] = None
+        self.failures: List[str] = []
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.report: Optional[dict] = None
+        self.task: Optional[asyncio.Task] = None
+        self.version = 0
+        self._changed = asyncio.Event()
+
+    @property
+    def target(self) -> str:
+        return str(Path(self.output_dir).resolve())
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("success", "partial", "error")
+
+    def update(self, **progress) -> None:
+        """Record progress (phase, done, total, current, failures) and wake listeners."""
+        for key, value in progress.items():
+            setattr(self, key, value)
+        self.version += 1
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait_for_change(self, version: int, timeout: float) -> bool:
+        """Wait until the job moves past `version`. False on timeout."""
+        if self.version != version:
+            return True
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def to_dict(self, include_report: bool = False) -> dict:
+        duration = None
+        if self.started_at is not None:
+            duration = round((self.finished_at or time.time()) - self.started_at, 2)
+        data = {
+            "id": self.id,
+            "status": self.status,
+            "phase": self.phase,
+            "done": self.done,
+            "total": self.total,
+            "current": self.current,
+            "failed": len(self.failures),
+            "failures": self.failures,
+            "output_dir": self.output_dir,
+            "base_path": self.base_path,
+            "incremental": self.incremental,
+            "created_at": self.created_at,
+            "duration": duration,
+            "error": self.error,
+        }
+        if include_report:
+            data["report"] = self.report
+        return data
+
+
+class BuildJobRunner:
+    """Submit builds as background tasks, at most one running per output directory."""
+
+    def __init__(self):
+        self.jobs: "OrderedDict[str, BuildJob]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def get(self, job_id: str) -> Optional[BuildJob]:
+        return self.jobs.get(job_id)
+
+    def active_job(self, target: str) -> Optional[BuildJob]:
+        for job in self.jobs.values():
+            if job.target == target and not job.finished:
+                return job
+        return None
+
+    def submit(
+        self, app, output_dir: str = "dist", base_path: str = "", incremental: bool = True
+    ) -> Tuple[BuildJob, bool]:
+        """Start a build of `app` (or join the one already pending). Returns (job, created)."""
+        job = BuildJob(output_dir, base_path, incremental)
+        existing = self.active_job(job.target)
+        if existing is not None:
+            return existing, False
+
+        self.jobs[job.id] = job
+        self._forget_old_jobs()
+        job.task = asyncio.create_task(self._run(app, job), name=f"static-build-{job.id}")
+        logger.info(f"🏗️ Static build {job.id} queued ({output_dir})")
+        return job, True
+
+    def _forget_old_jobs(self) -> None:
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+    async def _run(self, app, job: BuildJob) -> None:
+        import httpx
+
+        from ..build import build_static_site
+
+        lock = self._locks.setdefault(job.target, asyncio.Lock())
+        async with lock:
+            job.started_at = time.time()
+            job.update(status="running", phase="starting")
+            try:
+                # Routes are rendered through the app itself: no loopback HTTP
+                report = await build_static_site(
+                    base_url="http://127.0.0.1:8000",
+                    base_path=job.base_path,
+                    incremental=job.incremental,
+                    output_dir=job.output_dir,
+                    transport=httpx.ASGITransport(app=app),
+                    progress=job.update,
+                )
+                job.report = report
+                job.finished_at = time.time()
+                job.update(status=report["status"], phase="done", current=None)
+                logger.info(
+                    f"✅ Static build {job.id} {report['status']}: "
+                    f"{report['successful']}/{report['total_routes']} routes"
+                )
+            except Exception as e:
+                job.error = str(e)
+                job.finished_at = time.time()
+                job.update(status="error", phase="done", current=None)
+                logger.error(f"❌ Static build {job.id} failed: {e}")
+
+
+build_jobs = BuildJobRunner()
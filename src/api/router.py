@@ -6,9 +6,10 @@ API Router for Maths.pm Application
 """
 
 import json
-from fastapi import APIRouter
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from ..settings import settings
+from .build_jobs import build_jobs
 
 # Create API router
 api_router = APIRouter(tags=["api"])
@@ -42,34 +43,100 @@ async def health_check():
 
     Returns useful information about the application state,
     including how many products were loaded and domain info.
+    JupyterLite builds in the background: `jupyterlite_ready` tells when it can be served.
     """
+    from ..lifespan.manager import jupyterlite_state
+
     return {
         "status": "healthy",
         "products_loaded": len(settings.products),
         "version": settings.app_version,
         "jupyterlite_enabled": settings.jupyterlite_enabled,
+        "jupyterlite_ready": jupyterlite_state.ready,
+        "jupyterlite_build": jupyterlite_state.to_dict(),
         "domain": settings.domain_name,
         "product_names": [p.name for p in settings.products],
     }
 
 
+# Seconds between SSE keep-alive comments while a build makes no progress
+BUILD_EVENTS_KEEPALIVE = 15.0
+
+
+def _build_job_response(job, created: bool) -> JSONResponse:
+    data = job.to_dict()
+    data["created"] = created
+    data["status_url"] = f"/api/build/{job.id}"
+    data["events_url"] = f"/api/build/{job.id}/events"
+    return JSONResponse(content=data, status_code=202)
+
+
+@api_router.post("/build")
+async def submit_static_build(request: Request, base_path: str = "", incremental: bool = True):
+    """
+    Start a static site build in the background.
+
+    Returns 202 with the job id right away; follow it with GET /api/build/{id}
+    (polling) or GET /api/build/{id}/events (server-sent events). One build runs at a
+    time per output directory: while one is pending, its job is returned instead.
+    """
+    job, created = build_jobs.submit(request.app, base_path=base_path, incremental=incremental)
+    return _build_job_response(job, created)
+
+
 @api_router.get("/build")
-async def build_static_site():
+async def build_static_site(request: Request):
     """
     Build static site for deployment.
 
-    This endpoint triggers the static site generation process,
-    crawling all routes and saving them as static HTML/JSON files.
-    Used by GitHub Actions for deployment.
+    Kept for existing callers: same as POST /api/build with the default target.
+    The build no longer runs inside the request; poll the returned `status_url`
+    for progress and the final report.
     """
-    try:
-        from ..build import build_static_site as build_func
+    job, created = build_jobs.submit(request.app)
+    return _build_job_response(job, created)
+
+
+@api_router.get("/build/jobs")
+async def list_static_builds():
+    """Known build jobs, oldest first (finished ones are kept for a while)."""
+    return {"jobs": [job.to_dict() for job in build_jobs.jobs.values()]}
 
-        # Run the build process
-        result = await build_func(base_url="http://127.0.0.1:8000")
 
+@api_router.get("/build/{job_id}")
+async def get_static_build(job_id: str):
+    """Progress of a build job; `report` holds the build report once it is finished."""
+    job = build_jobs.get(job_id)
+    if job is None:
         return JSONResponse(
-            content=result, status_code=200 if result["status"] == "success" else 207
+            content={"status": "error", "message": f"Unknown build job {job_id}"},
+            status_code=404,
         )
-    except Exception as e:
-        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
+    return job.to_dict(include_report=job.finished)
+
+
+@api_router.get("/build/{job_id}/events")
+async def stream_static_build(job_id: str):
+    """Server-sent events: a `progress` event per update, then `done` with the report."""
+    job = build_jobs.get(job_id)
+    if job is None:
+        return JSONResponse(
+            content={"status": "error", "message": f"Unknown build job {job_id}"},
+            status_code=404,
+        )
+
+    async def events():
+        while True:
+            version = job.version
+            if job.finished:
+                yield f"event: done\ndata: {json.dumps(job.to_dict(include_report=True))}\n\n"
+                return
+            yield f"event: progress\ndata: {json.dumps(job.to_dict())}\n\n"
+            while not await job.wait_for_change(version, BUILD_EVENTS_KEEPALIVE):
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -6,31 +6,66 @@ Static site builder for maths.pm
 Generates static HTML files from the FastAPI application
 """
 
+import asyncio
 import json
 import shutil
 from pathlib import Path
-from typing import Dict
+from typing import Callable, Dict, List, Optional
 import httpx
 import logging
 
+from .export.manifest import (
+    BUILDER_MANIFEST_NAME,
+    BuildManifest,
+    RouteInputs,
+    has_build_manifest,
+    merge_route_results,
+    plan_routes,
+)
+from .export.rewrite import route_depth, static_builder_rewriter
+from .lifespan.sync import log_sync_stats, place_file, sync_tree, write_atomic
+
 logger = logging.getLogger(__name__)
 
 
 class StaticSiteBuilder:
-    """Builds static site from FastAPI routes"""
+    """Builds static site from FastAPI routes
+
+    With `incremental` (default), the output directory is reused when it holds a build
+    manifest: only routes whose inputs changed are fetched again, and outputs of
+    routes that disappeared are removed.
+
+    `transport` lets the builder render through an app in-process (httpx.ASGITransport)
+    instead of over HTTP; `progress` is called with keyword updates (phase, done,
+    total, current, failures) as the build advances.
+    """
 
     def __init__(
-        self, base_url: str = "http://localhost:8000", output_dir: str = "dist", base_path: str = ""
+        self,
+        base_url: str = "http://localhost:8000",
+        output_dir: str = "dist",
+        base_path: str = "",
+        incremental: bool = True,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        progress: Optional[Callable[..., None]] = None,
     ):
         self.base_url = base_url
         self.output_dir = Path(output_dir)
         self.client = None
         self.base_path = base_path  # For GitHub Pages, this would be "/repository-name"
+        self.incremental = incremental
+        self.outputs: Dict[str, str] = {}  # route -> output path, relative to output_dir
+        self.transport = transport
+        self.progress = progress
 
     async def __aenter__(self):
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.client = httpx.AsyncClient(timeout=30.0, transport=self.transport)
         return self
 
+    def report_progress(self, **fields) -> None:
+        if self.progress is not None:
+            self.progress(**fields)
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.client:
             await self.client.aclose()
@@ -69,7 +104,7 @@ class StaticSiteBuilder:
             # Save content
             if response.headers.get("content-type", "").startswith("application/json"):
                 output_path = output_path.with_suffix(".json")
-                output_path.write_text(response.text, encoding="utf-8")
+                write_atomic(output_path, response.text)
             else:
                 content = response.content
 
@@ -77,106 +112,17 @@ class StaticSiteBuilder:
                 if response.headers.get("content-type", "").startswith("text/html"):
                     content_str = content.decode("utf-8")
 
-                    # Remove all server URLs (handle all internal links)
-                    content_str = content_str.replace("http://127.0.0.1:8000/", "/")
-                    content_str = content_str.replace("http://localhost:8000/", "/")
-                    content_str = content_str.replace("//127.0.0.1:8000/", "/")
-
-                    # Fix PM route links - change .md to .html
-                    content_str = content_str.replace('.md?format=html"', '.html"')
-                    content_str = content_str.replace(".md?format=html'", ".html'")
-                    content_str = content_str.replace('.md"', '.html"')
-                    content_str = content_str.replace(".md'", ".html'")
-
-                    # IMPORTANT: For GitHub Pages, we need to handle the repository path
-                    # The site is served at /maths.pm/ so absolute paths need this prefix
-
-                    # First, add the GitHub Pages base path to all absolute URLs
-                    if self.base_path:
-                        # For GitHub Pages deployment, prepend the base path
-                        content_str = content_str.replace('href="/', f'href="{self.base_path}/')
-                        content_str = content_str.replace("href='/", f"href='{self.base_path}/")
-                        content_str = content_str.replace('src="/', f'src="{self.base_path}/')
-                        content_str = content_str.replace("src='/", f"src='{self.base_path}/")
-                        content_str = content_str.replace('action="/', f'action="{self.base_path}/')
-
-                        # Fix JavaScript import statements
-                        content_str = content_str.replace(
-                            "import '/static/", f"import '{self.base_path}/static/"
-                        )
-                        content_str = content_str.replace(
-                            'import "/static/', f'import "{self.base_path}/static/'
-                        )
-                        content_str = content_str.replace(
-                            "from '/static/", f"from '{self.base_path}/static/"
-                        )
-                        content_str = content_str.replace(
-                            'from "/static/', f'from "{self.base_path}/static/'
-                        )
-
-                        # Fix @js alias in imports
-                        content_str = content_str.replace(
-                            "from '@js/", f"from '{self.base_path}/static/js/"
-                        )
-                        content_str = content_str.replace(
-                            'from "@js/', f'from "{self.base_path}/static/js/'
-                        )
-                        content_str = content_str.replace(
-                            "import '@js/", f"import '{self.base_path}/static/js/"
-                        )
-                        content_str = content_str.replace(
-                            'import "@js/', f'import "{self.base_path}/static/js/'
-                        )
-                    else:
-                        # For local testing, use relative paths
-                        depth = len(Path(path).parts) - 1
-                        if depth > 0:
-                            # Create relative path prefix
-                            prefix = "../" * depth
-                            # Replace all absolute paths with relative ones
-                            content_str = content_str.replace('href="/', f'href="{prefix}')
-                            content_str = content_str.replace("href='/", f"href='{prefix}")
-                            content_str = content_str.replace('src="/', f'src="{prefix}')
-                            content_str = content_str.replace("src='/", f"src='{prefix}")
-                            content_str = content_str.replace('action="/', f'action="{prefix}')
-
-                            # Fix JavaScript import statements for local testing
-                            content_str = content_str.replace(
-                                "import '/static/", f"import '{prefix}static/"
-                            )
-                            content_str = content_str.replace(
-                                'import "/static/', f'import "{prefix}static/'
-                            )
-                            content_str = content_str.replace(
-                                "from '/static/", f"from '{prefix}static/"
-                            )
-                            content_str = content_str.replace(
-                                'from "/static/', f'from "{prefix}static/'
-                            )
-                            content_str = content_str.replace(
-                                "from '@js/", f"from '{prefix}static/js/"
-                            )
-                            content_str = content_str.replace(
-                                'from "@js/', f'from "{prefix}static/js/'
-                            )
-                        else:
-                            # For root level files, remove leading slashes
-                            content_str = content_str.replace('href="/', 'href="')
-                            content_str = content_str.replace("href='/", "href='")
-                            content_str = content_str.replace('src="/', 'src="')
-                            content_str = content_str.replace("src='/", "src='")
-                            content_str = content_str.replace('action="/', 'action="')
-
-                            # Fix imports for root level
-                            content_str = content_str.replace("import '/static/", "import 'static/")
-                            content_str = content_str.replace('import "/static/', 'import "static/')
-                            content_str = content_str.replace("from '@js/", "from 'static/js/")
-                            content_str = content_str.replace('from "@js/', 'from "static/js/')
+                    # Server origins, .md -> .html links, then base path or relative prefixes
+                    rewriter = static_builder_rewriter(self.base_path, route_depth(path))
+                    content_str = rewriter(content_str)
 
                     content = content_str.encode("utf-8")
 
-                output_path.write_bytes(content)
+                # dist/ files may be hardlinks into pms/ or src/static: replace, never
+                # write through
+                write_atomic(output_path, content)
 
+            self.outputs[path] = output_path.relative_to(self.output_dir).as_posix()
             logger.info(f"✓ Saved {path} → {output_path.relative_to(self.output_dir)}")
             return True
 
@@ -237,9 +183,16 @@ class StaticSiteBuilder:
 
     async def build(self) -> Dict:
         """Build the static site"""
-        # Clean and create output directory
-        if self.output_dir.exists():
-            shutil.rmtree(self.output_dir)
+        # Reuse the previous output when it has a manifest, otherwise start clean. An
+        # output left by the other exporter (its own manifest) is kept: every route
+        # is rendered again over it
+        manifest = BuildManifest.load(self.output_dir, BUILDER_MANIFEST_NAME)
+        if not self.incremental or not manifest.loaded:
+            if self.output_dir.exists() and (
+                not self.incremental or not has_build_manifest(self.output_dir)
+            ):
+                shutil.rmtree(self.output_dir)
+            manifest = BuildManifest(self.output_dir, BUILDER_MANIFEST_NAME)
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
         # ====== CORE ROUTES ======
@@ -259,7 +212,7 @@ class StaticSiteBuilder:
             "/api/health",  # Health check endpoint
             "/api/settings",  # Get public settings
             "/api/settings/serialized",  # Get serialized settings
-            "/api/build",  # Build static site endpoint
+            # /api/build is not exported: it starts a build job
             # Note: Add any additional API routes here as needed
         ]
         routes.extend(api_routes)
@@ -315,43 +268,64 @@ class StaticSiteBuilder:
         routes.extend(markdown_routes)
         routes.extend(asset_routes)
 
-        # Fetch all routes
-        results = []
-        for route in routes:
+        # Fetch only the routes whose inputs changed since the last build
+        # (hashing and copies run in a thread: the server keeps answering during a build)
+        self.report_progress(phase="planning")
+        route_hashes, stale_routes = await asyncio.to_thread(
+            plan_routes, manifest, routes, RouteInputs(Path.cwd(), variant=self.base_path)
+        )
+        logger.info(
+            f"🔁 {len(stale_routes)} routes to fetch, "
+            f"{len(route_hashes) - len(stale_routes)} unchanged"
+        )
+        self.report_progress(phase="routes", done=0, total=len(stale_routes))
+        rendered = []
+        failures: List[str] = []
+        for index, route in enumerate(stale_routes):
+            self.report_progress(current=route)
             success = await self.fetch_and_save(route)
-            results.append({"route": route, "success": success})
-
-        # Copy static files
+            rendered.append({"route": route, "success": success, "output": self.outputs.get(route)})
+            if not success:
+                failures.append(route)
+            self.report_progress(done=index + 1, failures=list(failures))
+        results = merge_route_results(manifest, route_hashes, rendered)
+
+        removed = manifest.prune(route_hashes, [])
+        if removed:
+            logger.info(f"🗑️ Removed {len(removed)} stale outputs")
+        manifest.save()
+
+        # Copy static files (changed files only, orphans removed)
         logger.info("📁 Copying static files...")
+        self.report_progress(phase="static", current=None)
         src_static = Path("src/static")
         dst_static = self.output_dir / "static"
 
         if src_static.exists():
-            shutil.copytree(src_static, dst_static, dirs_exist_ok=True)
-            logger.info(f"✓ Copied static files to {dst_static}")
+            stats = await asyncio.to_thread(
+                sync_tree, src_static, dst_static, label="static", compare="hash", link="auto"
+            )
+            log_sync_stats(stats, emoji="✓")
 
         # Copy CNAME file for custom domain (if exists)
         cname_file = Path("CNAME")
         if cname_file.exists():
-            shutil.copy2(cname_file, self.output_dir / "CNAME")
+            place_file(cname_file, self.output_dir / "CNAME")
             logger.info("✓ Copied CNAME file for custom domain")
 
         # Copy .nojekyll file to disable Jekyll processing on GitHub Pages
         nojekyll_file = Path(".nojekyll")
         if nojekyll_file.exists():
-            shutil.copy2(nojekyll_file, self.output_dir / ".nojekyll")
+            place_file(nojekyll_file, self.output_dir / ".nojekyll")
             logger.info("✓ Copied .nojekyll file to disable Jekyll processing")
         else:
             # Create it if it doesn't exist
             (self.output_dir / ".nojekyll").touch()
             logger.info("✓ Created .nojekyll file to disable Jekyll processing")
 
-        # Copy JupyterLite output if it exists
-        jupyterlite_output = Path("src/static/jupyterlite/_output")
-        if jupyterlite_output.exists():
-            dst_jupyter = self.output_dir / "static/jupyterlite/_output"
-            shutil.copytree(jupyterlite_output, dst_jupyter, dirs_exist_ok=True)
-            logger.info("✓ Copied JupyterLite files")
+        # JupyterLite output lives under src/static and was synced with it
+        if Path("src/static/jupyterlite/_output").exists():
+            logger.info("✓ JupyterLite files included with static files")
 
         # Generate build report
         total = len(results)
@@ -362,13 +336,16 @@ class StaticSiteBuilder:
             "total_routes": total,
             "successful": successful,
             "failed": total - successful,
+            "rendered": len(rendered),
+            "skipped": total - len(rendered),
+            "removed": removed,
             "output_dir": str(self.output_dir),
             "routes": results,
         }
 
         # Save build report
         report_path = self.output_dir / "build-report.json"
-        report_path.write_text(json.dumps(report, indent=2))
+        write_atomic(report_path, json.dumps(report, indent=2))
 
         logger.info(f"📊 Build complete: {successful}/{total} routes exported")
         logger.info(f"📁 Output directory: {self.output_dir}")
@@ -376,7 +353,21 @@ class StaticSiteBuilder:
         return report
 
 
-async def build_static_site(base_url: str = "http://localhost:8000", base_path: str = "") -> Dict:
+async def build_static_site(
+    base_url: str = "http://localhost:8000",
+    base_path: str = "",
+    incremental: bool = True,
+    output_dir: str = "dist",
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+    progress: Optional[Callable[..., None]] = None,
+) -> Dict:
     """Main build function"""
-    async with StaticSiteBuilder(base_url=base_url, base_path=base_path) as builder:
+    async with StaticSiteBuilder(
+        base_url=base_url,
+        output_dir=output_dir,
+        base_path=base_path,
+        incremental=incremental,
+        transport=transport,
+        progress=progress,
+    ) as builder:
         return await builder.build()
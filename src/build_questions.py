@@ -1,15 +1,46 @@
 #!/usr/bin/env python3
 """
 Build script to pre-generate questions from all generator files.
-Generates 100 questions (seeds 0-99) for each generator and saves as JSON.
+Generates 100 questions (seeds 0-99) for each generator and saves them as one
+JSON-lines bundle per generator, plus a debug sidecar and a byte-offset index
+(see sujets0/question_bundles.py), and a searchable SQLite bank of all of them
+(sujets0/question_bank.py).
+
+Generators run in sandboxed worker processes (sujets0/generator_sandbox.py): a
+seed past --timeout or over --memory-mb is recorded as failed (error_type
+"Timeout", "MemoryError" or "WorkerCrashed") and the build carries on. With
+--jobs N, generators (or blocks of seeds of a generator, --seed-block) are spread
+over N workers; the output is the same as a sequential run.
+
+--capture sets what is kept of generator stdout/stderr: off for production
+builds, errors-only (default: the last 16 KB of each stream, failed seeds only)
+or full for debugging.
+
+Each generator's index.json entry gets a "profile": wall time per seed
+(min/median/p95/max) and module load time; --profile adds the time spent in
+generate_components, solve and render_question, import time and peak memory.
+
+Builds are incremental: a generator is regenerated only when its source, the
+`teachers` package, the seed range or this builder changed (.build-cache.json next
+to the output). --force rebuilds everything from scratch.
 """
 
+import argparse
+import functools
+import hashlib
+import io
 import json
+import math
+import os
+import statistics
 import sys
-import importlib.util
+import time
+import tracemalloc
+import types
+from collections import deque
 from pathlib import Path
 import traceback
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Set, Tuple
 
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -17,6 +48,40 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 # Add the sujets0/generators to path so imports work
 sys.path.insert(0, str(Path(__file__).parent / "sujets0" / "generators"))
 
+try:
+    from .sujets0.dispatch_2de_1ere import GENERATOR_LEVELS
+    from .sujets0.generator_sandbox import CRASH_ERROR, TIMEOUT_ERROR, run_sandboxed
+    from .sujets0.question_bank import BANK_NAME, write_question_bank
+    from .sujets0.question_bundles import (
+        BUNDLE_FORMAT,
+        BUNDLE_SUFFIX,
+        DEBUG_SUFFIX,
+        UNIQUE_SEEDS_NAME,
+        dedupe_results,
+        load_offsets,
+        read_bundle,
+        write_generator_bundle,
+        write_offsets,
+        write_unique_seeds,
+    )
+except ImportError:
+    # Run as a script: src/ is on sys.path
+    from sujets0.dispatch_2de_1ere import GENERATOR_LEVELS
+    from sujets0.generator_sandbox import CRASH_ERROR, TIMEOUT_ERROR, run_sandboxed
+    from sujets0.question_bank import BANK_NAME, write_question_bank
+    from sujets0.question_bundles import (
+        BUNDLE_FORMAT,
+        BUNDLE_SUFFIX,
+        DEBUG_SUFFIX,
+        UNIQUE_SEEDS_NAME,
+        dedupe_results,
+        load_offsets,
+        read_bundle,
+        write_generator_bundle,
+        write_offsets,
+        write_unique_seeds,
+    )
+
 # Import teachers modules (will be available to all generators)
 try:
     import teachers.generator as tg
@@ -28,8 +93,24 @@ except ImportError:
     pass
 
 
+# Compiled generator code, keyed by path: (mtime_ns, code object)
+_compiled_generators: Dict[str, Tuple[int, Any]] = {}
+
+
+def compile_generator(filepath: Path):
+    """Read and compile a generator file once; recompiled only if the file changes."""
+    key = str(filepath)
+    mtime_ns = filepath.stat().st_mtime_ns
+    cached = _compiled_generators.get(key)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+    code = compile(filepath.read_bytes(), key, "exec")
+    _compiled_generators[key] = (mtime_ns, code)
+    return code
+
+
 def load_generator_module(filepath: Path):
-    """Dynamically load a generator module from file path"""
+    """Run a generator's (cached) code in a fresh module namespace"""
     # Create a custom globals dict with missive function
     import builtins
 
@@ -40,10 +121,11 @@ def load_generator_module(filepath: Path):
     builtins.missive = capture_missive
 
     try:
-        spec = importlib.util.spec_from_file_location("generator", filepath)
-        module = importlib.util.module_from_spec(spec)
+        code = compile_generator(filepath)
+        module = types.ModuleType("generator")
+        module.__file__ = str(filepath)
         sys.modules["generator"] = module
-        spec.loader.exec_module(module)
+        exec(code, module.__dict__)
         return module
     finally:
         # Restore original builtins
@@ -63,23 +145,177 @@ def capture_missive(*args, **kwargs):
     return kwargs
 
 
-def generate_question(generator_file: Path, seed: int) -> Dict[str, Any]:
+# What generate_question keeps of a generator's stdout/stderr:
+# off: nothing, errors-only: the tail of each stream for failed seeds, full: everything
+CAPTURE_MODES = ("off", "errors-only", "full")
+CAPTURE_TAIL_CHARS = 16 * 1024
+
+
+class _NullOutput(io.TextIOBase):
+    """Discards what the generator prints (capture "off")."""
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        return len(text)
+
+    def getvalue(self):
+        return ""
+
+
+class _TailOutput(io.TextIOBase):
+    """Ring buffer of the last `limit` characters printed (capture "errors-only")."""
+
+    def __init__(self, limit: int = CAPTURE_TAIL_CHARS):
+        self.limit = limit
+        self.dropped = 0
+        self._chunks = deque()
+        self._size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self._chunks.append(text)
+        self._size += len(text)
+        while self._size > self.limit:
+            excess = self._size - self.limit
+            head = self._chunks[0]
+            if len(head) <= excess:
+                self._chunks.popleft()
+                self._size -= len(head)
+                self.dropped += len(head)
+            else:
+                self._chunks[0] = head[excess:]
+                self._size -= excess
+                self.dropped += excess
+        return len(text)
+
+    def getvalue(self):
+        text = "".join(self._chunks)
+        if self.dropped:
+            return f"[... {self.dropped} earlier characters dropped]\n{text}"
+        return text
+
+
+def _capture_stream(capture: str):
+    if capture == "off":
+        return _NullOutput()
+    if capture == "errors-only":
+        return _TailOutput()
+    if capture == "full":
+        return io.StringIO()
+    raise ValueError(f"Unknown capture mode {capture!r} (expected one of {CAPTURE_MODES})")
+
+
+PROFILED_PHASES = ("generate_components", "solve", "render_question")
+
+
+class _SeedProfiler:
+    """Wall and module load time of one seed; with detail, time spent in each
+    generator function and peak memory (tracemalloc), at the cost of a slower run."""
+
+    def __init__(self, generator_file: Path, detail: bool = False):
+        self.filename = str(generator_file)
+        self.detail = detail
+        self.phases = dict.fromkeys(PROFILED_PHASES, 0.0)
+        self._active = None
+        self._started = time.perf_counter()
+        self._load = self._load_phases = 0.0
+        self.profile: Optional[dict] = None
+        if detail:
+            tracemalloc.start()
+            sys.setprofile(self._hook)
+
+    def _hook(self, frame, event, arg):
+        # Outermost call of a phase function of this generator only
+        if event == "call" and self._active is None:
+            code = frame.f_code
+            if code.co_name in self.phases and code.co_filename == self.filename:
+                self._active = (frame, code.co_name, time.perf_counter())
+        elif event == "return" and self._active is not None and frame is self._active[0]:
+            _, name, started = self._active
+            self.phases[name] += time.perf_counter() - started
+            self._active = None
+
+    def loaded(self) -> None:
+        """The module (imports and module-level script) has run."""
+        self._load = time.perf_counter() - self._started
+        self._load_phases = sum(self.phases.values())
+
+    def stop(self) -> dict:
+        if self.profile is None:
+            self.profile = {
+                "wall_ms": round((time.perf_counter() - self._started) * 1000, 3),
+                "load_ms": round(self._load * 1000, 3),
+            }
+            if self.detail:
+                sys.setprofile(None)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                # Module-level code other than the three functions (imports included)
+                self.profile["import_ms"] = round((self._load - self._load_phases) * 1000, 3)
+                self.profile["phases_ms"] = {
+                    name: round(elapsed * 1000, 3) for name, elapsed in self.phases.items()
+                }
+                self.profile["peak_kb"] = round(peak / 1024, 1)
+        return self.profile
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted values: the ceil(fraction * n)-th smallest."""
+    rank = math.ceil(fraction * len(values))
+    return values[max(0, min(len(values) - 1, rank - 1))]
+
+
+def profile_summary(profiles: List[dict]) -> dict:
+    """Per-generator profile from its seeds' profiles (times in ms, memory in KB)."""
+    wall = sorted(profile["wall_ms"] for profile in profiles)
+    summary = {
+        "seeds": len(profiles),
+        "wall_ms": {
+            "min": wall[0],
+            "median": round(statistics.median(wall), 3),
+            "p95": _percentile(wall, 0.95),
+            "max": wall[-1],
+        },
+        "load_ms": round(statistics.median(profile["load_ms"] for profile in profiles), 3),
+    }
+    detailed = [profile for profile in profiles if "phases_ms" in profile]
+    if detailed:
+        summary["import_ms"] = round(
+            statistics.median(profile["import_ms"] for profile in detailed), 3
+        )
+        summary["phases_ms"] = {
+            name: round(statistics.median(p["phases_ms"][name] for p in detailed), 3)
+            for name in PROFILED_PHASES
+        }
+        summary["peak_kb"] = max(profile["peak_kb"] for profile in detailed)
+    return summary
+
+
+def generate_question(
+    generator_file: Path, seed: int, capture: str = "full", profile: bool = False
+) -> Dict[str, Any]:
     """Generate a single question from a generator file with given seed
 
-    Always returns a dict - either with question data or error information
+    Always returns a dict - either with question data or error information.
+    capture (see CAPTURE_MODES) decides what is kept of the generator's output;
+    "profile" holds the seed's timings, per function and with peak memory if profile.
     """
     global last_missive
     last_missive = None
+    profiler = _SeedProfiler(generator_file, detail=profile)
 
     # Capture stdout and stderr
-    import io
     import sys
     import random
 
     old_stdout = sys.stdout
     old_stderr = sys.stderr
-    stdout_capture = io.StringIO()
-    stderr_capture = io.StringIO()
+    stdout_capture = _capture_stream(capture)
+    stderr_capture = _capture_stream(capture)
 
     # Save original seeds
     original_teachers_seed = None
@@ -112,6 +348,7 @@ def generate_question(generator_file: Path, seed: int) -> Dict[str, Any]:
 
         # Load the generator module
         module = load_generator_module(generator_file)
+        profiler.loaded()
 
         # Force seed into module namespace as well
         if hasattr(module, "SEED"):
@@ -132,20 +369,31 @@ def generate_question(generator_file: Path, seed: int) -> Dict[str, Any]:
                 "error_type": "missing_function",
                 "stdout": stdout_capture.getvalue(),
                 "stderr": stderr_capture.getvalue(),
+                "profile": profiler.stop(),
             }
 
-        # Generate components with specific seed
-        components = module.generate_components(None, seed=seed)
-
-        # Solve if available
-        answer = None
-        if hasattr(module, "solve") and components:
-            answer = module.solve(**components)
-
-        # Render question if available
-        question = None
-        if hasattr(module, "render_question") and components:
-            question = module.render_question(**components)
+        # The module-level script already ran with this seed; when its missive holds
+        # components, answer and statement, calling the functions again would only
+        # produce values that are discarded below
+        missive_data = (
+            last_missive["args"][0]
+            if last_missive and last_missive.get("args") and isinstance(last_missive["args"][0], dict)
+            else {}
+        )
+        complete = all(key in missive_data for key in ("components", "answer", "statement"))
+
+        components = answer = question = None
+        if not complete:
+            # Generate components with specific seed
+            components = module.generate_components(None, seed=seed)
+
+            # Solve if available
+            if hasattr(module, "solve") and components:
+                answer = module.solve(**components)
+
+            # Render question if available
+            if hasattr(module, "render_question") and components:
+                question = module.render_question(**components)
 
         # Try to call main if it exists (some generators use this pattern)
         if hasattr(module, "main"):
@@ -196,8 +444,10 @@ def generate_question(generator_file: Path, seed: int) -> Dict[str, Any]:
         result["seed"] = seed
         result["generator"] = generator_file.stem
         result["success"] = True
-        result["stdout"] = stdout_capture.getvalue()
-        result["stderr"] = stderr_capture.getvalue()
+        if capture == "full":
+            result["stdout"] = stdout_capture.getvalue()
+            result["stderr"] = stderr_capture.getvalue()
+        result["profile"] = profiler.stop()
 
         return result
 
@@ -219,11 +469,14 @@ def generate_question(generator_file: Path, seed: int) -> Dict[str, Any]:
         # Try to include partial data if available
         if last_missive:
             error_result["partial_missive"] = last_missive
+        error_result["profile"] = profiler.stop()
 
         print(f"  ❌ Error with seed {seed}: {e}")
         return error_result
 
     finally:
+        profiler.stop()
+
         # Restore stdout and stderr
         sys.stdout = old_stdout
         sys.stderr = old_stderr
@@ -238,8 +491,142 @@ def generate_question(generator_file: Path, seed: int) -> Dict[str, Any]:
                 pass
 
 
-def build_all_questions():
-    """Build questions for all generators"""
+SEEDS_PER_GENERATOR = 100
+BUILD_CACHE_NAME = ".build-cache.json"
+BUILD_CACHE_VERSION = 1
+
+
+def teachers_fingerprint() -> str:
+    """Version and source hash of the installed `teachers` package."""
+    try:
+        import teachers
+    except ImportError:
+        return "missing"
+    from importlib import metadata
+
+    digest = hashlib.sha256()
+    try:
+        digest.update(metadata.version("teachers").encode())
+    except metadata.PackageNotFoundError:
+        digest.update(str(getattr(teachers, "__version__", "")).encode())
+    package_dir = Path(teachers.__file__).parent
+    for path in sorted(package_dir.rglob("*.py")):
+        digest.update(path.relative_to(package_dir).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def builder_fingerprint() -> str:
+    """Hash of the code that turns a generator run into output (this file, bundles)."""
+    digest = hashlib.sha256()
+    here = Path(__file__).resolve()
+    for path in (here, here.parent / "sujets0" / "question_bundles.py"):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def generator_cache_key(generator_file: Path, shared: str) -> str:
+    digest = hashlib.sha256(shared.encode())
+    digest.update(generator_file.read_bytes())
+    return digest.hexdigest()
+
+
+def _load_json(path: Path) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _init_worker():
+    """Worker start: import teachers once, every generator of the shard reuses it."""
+    try:
+        import teachers.generator  # noqa: F401
+        import teachers.maths  # noqa: F401
+    except ImportError:
+        pass
+
+
+def run_seed(
+    generator_path: str, seed: int, capture: str = "full", profile: bool = False
+) -> Dict[str, Any]:
+    """One seed of one generator, in a sandbox worker (stdout/stderr capture is per process)."""
+    return generate_question(Path(generator_path), seed, capture, profile)
+
+
+def _seed_records(output_dir: Path, index: dict, offsets: Dict[str, Dict[str, List[int]]]):
+    """Every (generator, seed) record; duplicate seeds carry "same_as"."""
+    for generator_info in index["generators"]:
+        name = generator_info["name"]
+        records = read_bundle(output_dir, name)
+        by_line = {tuple(offsets[name][str(seed)]): record for seed, record in records.items()}
+        for seed_key, line in offsets.get(name, {}).items():
+            record = by_line[tuple(line)]
+            seed = int(seed_key)
+            if record["seed"] != seed:
+                record = {**record, "seed": seed, "same_as": record["seed"]}
+            yield record
+
+
+def report_duplicates(index: dict) -> None:
+    """Print the generators whose seeds repeat questions, worst first."""
+    rows = sorted(
+        (info for info in index["generators"] if info.get("duplicate_rate")),
+        key=lambda info: (-info["duplicate_rate"], info["name"]),
+    )
+    total_unique = sum(info.get("unique_questions", 0) for info in index["generators"])
+    print(f"🧬 Distinct questions: {total_unique}/{index['total_successful']} ({UNIQUE_SEEDS_NAME})")
+    for info in rows:
+        print(
+            f"   ⚠️  {info['name']}: {info['unique_questions']} distinct of "
+            f"{info['successful']} ({info['duplicate_rate']:.0%} duplicates)"
+        )
+
+
+def report_profiles(index: dict, top: int = 5) -> None:
+    """Print the slowest generators (median wall time per seed)."""
+    rows = sorted(
+        (info for info in index["generators"] if info.get("profile")),
+        key=lambda info: -info["profile"]["wall_ms"]["median"],
+    )
+    if not rows:
+        return
+    print('🐢 Slowest generators (median / p95 per seed, index.json "profile"):')
+    for info in rows[:top]:
+        wall = info["profile"]["wall_ms"]
+        line = f"   • {info['name']}: {wall['median']:.1f} / {wall['p95']:.1f} ms"
+        if "peak_kb" in info["profile"]:
+            line += f", peak {info['profile']['peak_kb'] / 1024:.1f} MB"
+        print(line)
+
+
+def build_all_questions(
+    jobs: int = 1,
+    seed_block: int = SEEDS_PER_GENERATOR,
+    force: bool = False,
+    timeout: float = 30.0,
+    memory_mb: int = 2048,
+    max_seeds_per_worker: int = 500,
+    capture: str = "errors-only",
+    profile: bool = False,
+):
+    """Build questions for all generators
+
+    Args:
+        jobs: Sandboxed worker processes
+        seed_block: Seeds per task; below 100, one generator is split across workers
+        force: Ignore the build cache and regenerate every generator
+        timeout: Seconds a seed may run before its worker is killed (0: no limit)
+        memory_mb: Address-space cap of each worker (0: no cap)
+        max_seeds_per_worker: Seeds after which a worker is replaced by a fresh one
+        capture: Generator output kept in the debug bundles (see CAPTURE_MODES)
+        profile: Also time generate_components/solve/render_question and trace peak
+            memory of each seed (slower); wall and load times are always recorded
+    """
+    if capture not in CAPTURE_MODES:
+        raise ValueError(f"Unknown capture mode {capture!r} (expected one of {CAPTURE_MODES})")
+
     # Paths
     base_dir = Path(__file__).parent.parent
     generators_dir = base_dir / "src" / "sujets0" / "generators"
@@ -257,8 +644,110 @@ def build_all_questions():
 
     print(f"📚 Found {len(generator_files)} generator files")
     print(f"📁 Output directory: {output_dir}")
+    if jobs > 1:
+        print(f"⚙️  {jobs} worker processes, {seed_block} seeds per task")
+    print(
+        f"🛡️  Sandbox: {f'{timeout:g}s' if timeout > 0 else 'no'} timeout per seed, "
+        f"{f'{memory_mb} MB' if memory_mb > 0 else 'no'} memory cap, output capture {capture}"
+    )
     print("-" * 50)
 
+    # Reuse generators whose inputs are unchanged since the previous build
+    # Sandbox limits too: a seed that timed out may pass with a longer timeout.
+    # Generators with a Timeout or WorkerCrashed seed are never reused (see below)
+    shared_key = (
+        f"{teachers_fingerprint()}:{builder_fingerprint()}:{SEEDS_PER_GENERATOR}"
+        f":{timeout}:{memory_mb}:{capture}:{profile}"
+    )
+    cache_file = output_dir / BUILD_CACHE_NAME
+    cache = _load_json(cache_file)
+    cached_keys = cache.get("generators", {}) if cache.get("version") == BUILD_CACHE_VERSION else {}
+    previous_info = {
+        info["name"]: info for info in _load_json(output_dir / "index.json").get("generators", [])
+    }
+    previous_offsets = load_offsets(output_dir)
+
+    keys = {path.stem: generator_cache_key(path, shared_key) for path in generator_files}
+    reused = {
+        name
+        for name, key in keys.items()
+        if not force
+        and cached_keys.get(name) == key
+        and name in previous_info
+        and name in previous_offsets
+        and (output_dir / f"{name}{BUNDLE_SUFFIX}").exists()
+    }
+    stale_files = [path for path in generator_files if path.stem not in reused]
+    print(f"♻️  {len(reused)} generators unchanged, {len(stale_files)} to build")
+
+    # Shards: (generator, block of seeds)
+    seed_block = max(1, min(seed_block, SEEDS_PER_GENERATOR))
+    shards = [
+        (str(generator_file), list(range(start, min(start + seed_block, SEEDS_PER_GENERATOR))))
+        for generator_file in stale_files
+        for start in range(0, SEEDS_PER_GENERATOR, seed_block)
+    ]
+
+    # Per generator: file name, seed -> success and bundle offsets, filled in whatever
+    # order shards finish; a bundle is written once all its seeds are in
+    outcomes: Dict[str, Dict[int, bool]] = {}
+    files: Dict[str, str] = {}
+    pending: Dict[str, List[dict]] = {}
+    profiles: Dict[str, List[dict]] = {}
+    duplicates: Dict[str, Dict[int, int]] = {}
+    # Generators with a seed the sandbox cut short: machine load or a crash, not
+    # necessarily the generator, so they are rebuilt next time
+    interrupted: Set[str] = set()
+    offsets: Dict[str, Dict[str, List[int]]] = {
+        name: previous_offsets[name] for name in reused
+    }
+
+    def collect(shard_result):
+        generator_name, file_name, results = shard_result
+        files[generator_name] = file_name
+        # Timings go to the index summary, not into the bundles
+        profiles.setdefault(generator_name, []).extend(
+            result.pop("profile") for result in results if "profile" in result
+        )
+        pending.setdefault(generator_name, []).extend(results)
+        outcomes.setdefault(generator_name, {}).update(
+            (result["seed"], bool(result.get("success", False))) for result in results
+        )
+        if len(outcomes[generator_name]) == SEEDS_PER_GENERATOR:
+            # Seeds repeating a lower seed's question only get an offsets entry
+            kept, duplicates[generator_name] = dedupe_results(pending.pop(generator_name))
+            offsets[generator_name] = write_generator_bundle(
+                output_dir, generator_name, kept, duplicates[generator_name]
+            )
+            failed = sum(1 for ok in outcomes[generator_name].values() if not ok)
+            print(
+                f"  ✅ {generator_name}: {SEEDS_PER_GENERATOR - failed} questions"
+                + (f", ⚠️  {failed} failed" if failed else "")
+            )
+
+    def announce(path, seeds):
+        if jobs == 1:
+            print(f"\n🔧 Processing {Path(path).stem} (seeds {seeds[0]}-{seeds[-1]})...")
+
+    results = run_sandboxed(
+        shards,
+        functools.partial(run_seed, capture=capture, profile=profile),
+        jobs=jobs,
+        timeout=timeout,
+        memory_mb=memory_mb,
+        max_seeds_per_worker=max_seeds_per_worker,
+        initializer=_init_worker,
+        on_submit=announce,
+    )
+    for path, result in results:
+        if result.get("error_type") == TIMEOUT_ERROR:
+            print(f"  ⏱️ {Path(path).stem} seed {result['seed']}: {result['error']}")
+            interrupted.add(Path(path).stem)
+        elif result.get("error_type") == CRASH_ERROR:
+            print(f"  💥 {Path(path).stem} seed {result['seed']}: {result['error']}")
+            interrupted.add(Path(path).stem)
+        collect((Path(path).stem, Path(path).name, [result]))
+
     # Index to track all generators
     index = {
         "generators": [],
@@ -266,76 +755,101 @@ def build_all_questions():
         "total_attempts": 0,  # All questions including failures
         "total_successful": 0,
         "total_failed": 0,
-        "seeds_per_generator": 100,
+        "total_unique": 0,
+        "seeds_per_generator": SEEDS_PER_GENERATOR,
+        "format": BUNDLE_FORMAT,
     }
 
-    # Process each generator
+    # Merge in generator and seed order: the output does not depend on scheduling
     for generator_file in generator_files:
         generator_name = generator_file.stem
-        print(f"\n🔧 Processing {generator_name}...")
-
-        # Create directory for this generator
-        generator_output_dir = output_dir / generator_name
-        generator_output_dir.mkdir(parents=True, exist_ok=True)
-
-        # Track this generator
-        generator_info = {
-            "name": generator_name,
-            "file": generator_file.name,
-            "questions": [],
-            "successful": 0,
-            "failed": 0,
-        }
-
-        # Generate questions with different seeds
-        for seed in range(100):
-            if seed % 10 == 0:
-                print(f"  Generating seeds {seed}-{min(seed + 9, 99)}...")
-
-            result = generate_question(generator_file, seed)
-
-            # Always save the result (success or failure)
-            output_file = generator_output_dir / f"{seed}.json"
-            with open(output_file, "w", encoding="utf-8") as f:
-                json.dump(result, f, ensure_ascii=False, indent=2)
-
-            # Track success/failure
-            if result.get("success", False):
-                generator_info["successful"] += 1
-                generator_info["questions"].append(seed)
-            else:
-                generator_info["failed"] += 1
-                if "failed_seeds" not in generator_info:
-                    generator_info["failed_seeds"] = []
-                generator_info["failed_seeds"].append(seed)
-
-        # Save generator metadata
-        metadata_file = generator_output_dir / "metadata.json"
-        with open(metadata_file, "w", encoding="utf-8") as f:
-            json.dump(generator_info, f, ensure_ascii=False, indent=2)
+        if generator_name in reused:
+            generator_info = previous_info[generator_name]
+        else:
+            seed_outcomes = outcomes.get(generator_name, {})
+            aliases = duplicates.get(generator_name, {})
+
+            # Track this generator
+            generator_info = {
+                "name": generator_name,
+                "file": files.get(generator_name, generator_file.name),
+                "bundle": f"{generator_name}.jsonl",
+                "questions": [],
+                "successful": 0,
+                "failed": 0,
+            }
+            for seed in sorted(seed_outcomes):
+                if seed_outcomes[seed]:
+                    generator_info["successful"] += 1
+                    if seed not in aliases:
+                        generator_info["questions"].append(seed)
+                else:
+                    generator_info["failed"] += 1
+                    if "failed_seeds" not in generator_info:
+                        generator_info["failed_seeds"] = []
+                    generator_info["failed_seeds"].append(seed)
+            # "questions" lists distinct seeds only
+            generator_info["unique_questions"] = len(generator_info["questions"])
+            generator_info["duplicate_rate"] = (
+                round(len(aliases) / generator_info["successful"], 3)
+                if generator_info["successful"]
+                else 0.0
+            )
+            if profiles.get(generator_name):
+                generator_info["profile"] = profile_summary(profiles[generator_name])
 
         # Add to index
         index["generators"].append(generator_info)
         index["total_questions"] += generator_info["successful"]
         index["total_successful"] += generator_info["successful"]
         index["total_failed"] += generator_info["failed"]
-        index["total_attempts"] += 100  # Always 100 attempts per generator
+        index["total_unique"] += generator_info["unique_questions"]
+        index["total_attempts"] += SEEDS_PER_GENERATOR  # Always 100 attempts per generator
 
-        print(f"  ✅ Generated {generator_info['successful']} questions")
-        if generator_info["failed"] > 0:
-            print(f"  ⚠️  Failed: {generator_info['failed']}")
+    # Drop the bundles of generators that no longer exist
+    for bundle in output_dir.glob(f"*{BUNDLE_SUFFIX}"):
+        suffix = DEBUG_SUFFIX if bundle.name.endswith(DEBUG_SUFFIX) else BUNDLE_SUFFIX
+        if bundle.name[: -len(suffix)] not in keys:
+            bundle.unlink()
 
-    # Save index
+    # Save byte offsets and index
+    write_offsets(output_dir, offsets)
     index_file = output_dir / "index.json"
     with open(index_file, "w", encoding="utf-8") as f:
         json.dump(index, f, ensure_ascii=False, indent=2)
 
+    # Distinct seeds of the generators that repeat (or fail) within 0-99, for class
+    # sets that must not hand out identical copies
+    write_unique_seeds(
+        output_dir,
+        {
+            info["name"]: info["questions"]
+            for info in index["generators"]
+            if info["unique_questions"] < SEEDS_PER_GENERATOR
+        },
+    )
+
+    # Searchable bank over every seed (reused generators included)
+    bank_rows = write_question_bank(
+        output_dir, _seed_records(output_dir, index, offsets), GENERATOR_LEVELS
+    )
+    print(f"🗃️  {BANK_NAME}: {bank_rows} questions indexed")
+
+    # Written last: an interrupted build leaves nothing marked as reusable
+    reusable = {name: key for name, key in keys.items() if name not in interrupted}
+    with open(cache_file, "w", encoding="utf-8") as f:
+        json.dump({"version": BUILD_CACHE_VERSION, "generators": reusable}, f, indent=1)
+    if interrupted:
+        print(f"🔁 Rebuilt next time (Timeout/WorkerCrashed seeds): {', '.join(sorted(interrupted))}")
+
     print("\n" + "=" * 50)
     print("✨ Build complete!")
     print(f"📊 Total attempts: {index['total_attempts']}")
     print(f"   ✅ Successful: {index['total_successful']}")
     print(f"   ❌ Failed: {index['total_failed']}")
     print(f"📁 Output location: {output_dir}")
+    report_duplicates(index)
+    report_profiles(index)
 
     return index
 
@@ -362,21 +876,69 @@ if __name__ == "__main__":
 
     import subprocess
 
-    subprocess.run(["rm", "-rf", "src/static/sujets0/questions/"])
-    build_all_questions()
-    # subprocess.run(["python", "src/build_questions.py", "--force-seed-injection"])
-    subprocess.run(
-        [
-            "python",
-            "-c",
-            """
-import json
-from pathlib import Path
-for gen in Path('src/static/sujets0/questions').iterdir():
-    if gen.is_dir():
-        q0 = json.load(open(gen / '0.json'))
-        q1 = json.load(open(gen / '1.json'))
-        if q0.get('statement') == q1.get('statement'):
-            print(f'⚠️ {gen.name}: No variation detected')""",
-        ]
+    parser = argparse.ArgumentParser(description="Pre-generate sujets0 questions")
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Sandboxed worker processes (0 = one per CPU, default 1)",
+    )
+    parser.add_argument(
+        "--seed-block",
+        type=int,
+        default=SEEDS_PER_GENERATOR,
+        help="Seeds per task (default: a whole generator per task)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Delete previous output and rebuild every generator",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=30.0,
+        help="Seconds a seed may run before it is recorded as a Timeout (0 = no limit)",
+    )
+    parser.add_argument(
+        "--memory-mb",
+        type=int,
+        default=2048,
+        help="Address-space cap per worker in MB (0 = no cap, default 2048)",
     )
+    parser.add_argument(
+        "--max-seeds-per-worker",
+        type=int,
+        default=500,
+        help="Seeds a worker runs before it is replaced (default 500)",
+    )
+    parser.add_argument(
+        "--capture",
+        choices=CAPTURE_MODES,
+        default="errors-only",
+        help="Generator stdout/stderr kept: off (production), errors-only "
+        f"(last {CAPTURE_TAIL_CHARS // 1024} KB of failed seeds, default) or full (debugging)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time generate_components/solve/render_question and trace peak memory per seed",
+    )
+    args = parser.parse_args()
+    jobs = args.jobs or os.cpu_count() or 1
+
+    if args.force:
+        subprocess.run(["rm", "-rf", "src/static/sujets0/questions/"])
+    build_all_questions(
+        jobs=jobs,
+        seed_block=args.seed_block,
+        force=args.force,
+        timeout=args.timeout,
+        memory_mb=args.memory_mb,
+        max_seeds_per_worker=args.max_seeds_per_worker,
+        capture=args.capture,
+        profile=args.profile,
+    )
+    # subprocess.run(["python", "src/build_questions.py", "--force-seed-injection"])
+    # Variation check: see the duplicate report printed by the build
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""
+Static export helpers shared by the dist/ builders.
+"""
+
+from .asgi import ASGIExporter, output_path_for_route
+from .compress import is_generated_asset, run_asset_stage
+from .minify import minify_html_document, minify_route_outputs
+from .manifest import (
+    BuildManifest,
+    RouteInputs,
+    copy_files_with_manifest,
+    has_build_manifest,
+    merge_route_results,
+    plan_routes,
+)
+
+__all__ = [
+    "ASGIExporter",
+    "output_path_for_route",
+    "is_generated_asset",
+    "run_asset_stage",
+    "minify_html_document",
+    "minify_route_outputs",
+    "BuildManifest",
+    "RouteInputs",
+    "copy_files_with_manifest",
+    "has_build_manifest",
+    "merge_route_results",
+    "plan_routes",
+]
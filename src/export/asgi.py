@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""
+In-process static export for Maths.pm
+Drives the FastAPI app through an ASGI transport instead of a uvicorn thread and
+loopback HTTP: the app lifespan runs once, its caches stay warm for every route,
+and routes render concurrently behind a semaphore.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import httpx
+from fastapi import FastAPI
+
+from ..lifespan.sync import write_atomic
+
+logger = logging.getLogger("maths_pm")
+
+# Host used for in-process requests; templates that render absolute URLs will use it,
+# so HTML rewriting keeps stripping it exactly like the old loopback server.
+EXPORT_BASE_URL = "http://127.0.0.1:8000"
+
+HtmlRewriter = Callable[[str, str], str]
+
+
+def output_path_for_route(output_dir: Path, route: str) -> Path:
+    """Map a route (query string ignored) to its file under output_dir."""
+    route_path = route.split("?")[0]
+
+    if route_path == "/":
+        return output_dir / "index.html"
+    if route_path.endswith("/"):
+        return output_dir / route_path[1:] / "index.html"
+    if "." in route_path.split("/")[-1]:
+        # Has extension - convert .md to .html for PM routes
+        if route_path.endswith(".md") and route_path.startswith("/pm/"):
+            return output_dir / route_path[1:].replace(".md", ".html")
+        return output_dir / route_path[1:]
+    # No extension, save as HTML
+    return output_dir / f"{route_path[1:]}.html"
+
+
+class ASGIExporter:
+    """Render routes of an ASGI app to files, concurrently and without a server.
+
+    Usage:
+        async with ASGIExporter(app, Path("dist"), concurrency=8) as exporter:
+            await exporter.wait_for_jupyterlite()
+            start = time.perf_counter()
+            results = await exporter.export(routes)
+            timings = exporter.timing_report(results, time.perf_counter() - start)
+    """
+
+    def __init__(
+        self,
+        app: FastAPI,
+        output_dir: Path,
+        concurrency: int = 8,
+        rewrite_html: Optional[HtmlRewriter] = None,
+        run_lifespan: bool = True,
+        timeout: float = 60.0,
+    ):
+        self.app = app
+        self.output_dir = Path(output_dir)
+        self.concurrency = max(1, concurrency)
+        self.rewrite_html = rewrite_html
+        self.run_lifespan = run_lifespan
+        self.timeout = timeout
+        self.client: Optional[httpx.AsyncClient] = None
+        self._stack: Optional[AsyncExitStack] = None
+
+    async def __aenter__(self):
+        self._stack = AsyncExitStack()
+        if self.run_lifespan:
+            # ASGITransport does not send lifespan events: run the app's lifespan ourselves
+            await self._stack.enter_async_context(self.app.router.lifespan_context(self.app))
+        self.client = await self._stack.enter_async_context(
+            httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=self.app),
+                base_url=EXPORT_BASE_URL,
+                timeout=self.timeout,
+                follow_redirects=True,
+            )
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._stack:
+            await self._stack.aclose()
+        self.client = None
+
+    async def wait_for_jupyterlite(self) -> str:
+        """Wait for the background JupyterLite build started by the lifespan."""
+        from ..lifespan.manager import jupyterlite_state
+
+        task = jupyterlite_state.task
+        if task is not None and not task.done():
+            logger.info("⏳ Waiting for JupyterLite build...")
+            await asyncio.wait({task})
+        logger.info(f"🧪 JupyterLite build status: {jupyterlite_state.status}")
+        return jupyterlite_state.status
+
+    def _write(self, output_path: Path, payload: bytes) -> None:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        # Replace, never write through: the previous file may be a hardlinked copy
+        write_atomic(output_path, payload)
+
+    async def export_route(self, route: str, semaphore: asyncio.Semaphore) -> Dict[str, object]:
+        """Render one route and save it. Never raises: failures end up in the result."""
+        result: Dict[str, object] = {"route": route, "success": False}
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await self.client.get(route)
+                render_ms = (time.perf_counter() - start) * 1000
+                result["status_code"] = response.status_code
+                result["render_ms"] = round(render_ms, 2)
+
+                if response.status_code != 200:
+                    logger.error(f"✗ Failed {route}: Status {response.status_code}")
+                    return result
+
+                output_path = output_path_for_route(self.output_dir, route)
+                if response.headers.get("content-type", "").startswith("text/html"):
+                    content = response.text
+                    if self.rewrite_html:
+                        content = self.rewrite_html(content, route)
+                    payload = content.encode("utf-8")
+                else:
+                    payload = response.content
+
+                await asyncio.to_thread(self._write, output_path, payload)
+                result["success"] = True
+                result["output"] = output_path.relative_to(self.output_dir).as_posix()
+                result["bytes"] = len(payload)
+            except Exception as e:
+                logger.error(f"✗ Failed {route}: {e}")
+                result["error"] = str(e)
+            finally:
+                result["total_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return result
+
+    async def export(self, routes: Iterable[str]) -> List[Dict[str, object]]:
+        """Render all routes concurrently (bounded by `concurrency`), in input order."""
+        unique_routes = list(dict.fromkeys(routes))
+        semaphore = asyncio.Semaphore(self.concurrency)
+        logger.info(
+            f"🚀 Exporting {len(unique_routes)} routes in-process (concurrency={self.concurrency})"
+        )
+        return list(
+            await asyncio.gather(*(self.export_route(route, semaphore) for route in unique_routes))
+        )
+
+    @staticmethod
+    def timing_report(results: List[Dict[str, object]], elapsed: float, slowest: int = 10) -> Dict:
+        """Aggregate per-route timings: totals, percentiles and the slowest routes."""
+        timings = sorted(float(r.get("total_ms", 0.0)) for r in results)
+
+        def percentile(p: float) -> float:
+            if not timings:
+                return 0.0
+            return timings[min(len(timings) - 1, int(round(p * (len(timings) - 1))))]
+
+        return {
+            "elapsed_s": round(elapsed, 3),
+            "routes_per_second": round(len(results) / elapsed, 2) if elapsed > 0 else None,
+            "sum_route_ms": round(sum(timings), 2),
+            "median_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "max_ms": percentile(1.0),
+            "slowest": [
+                {"route": r["route"], "total_ms": r.get("total_ms")}
+                for r in sorted(results, key=lambda r: r.get("total_ms", 0.0), reverse=True)[
+                    :slowest
+                ]
+            ],
+        }
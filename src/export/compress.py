@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""
+Post-export asset stage for Maths.pm
+Fingerprints static CSS/JS (content-hashed copies plus dist/asset-manifest.json),
+points exported pages at the hashed names, and writes precompressed .gz/.br
+siblings so a static host or CDN can serve them with immutable caching.
+ES modules are not fingerprinted: they import their siblings by unhashed path, so a
+hashed entry point would load a second copy of its module graph.
+The per-file work runs on a process pool.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ..lifespan.sync import format_bytes, place_file, scan_tree, write_atomic
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        # .br siblings are skipped, .gz are still written
+        brotli = None
+
+logger = logging.getLogger("maths_pm")
+
+COMPRESSIBLE_SUFFIXES = (".html", ".css", ".js", ".json", ".jsonl", ".svg", ".csv")
+COMPRESSED_SUFFIXES = (".gz", ".br")
+MIN_COMPRESS_SIZE = 1024
+
+FINGERPRINT_SUFFIXES = (".css", ".js")
+# JupyterLite wires its own files together (service worker, federated extensions)
+FINGERPRINT_EXCLUDE = ("jupyterlite/",)
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+
+_HASHED_NAME = re.compile(r"\.[0-9a-f]{10}$")
+# Static or dynamic import, or an export: the file is (or loads) an ES module
+_ES_MODULE = re.compile(
+    rb"^\s*(?:import(?:\s+[\w{*'\"]|\s*[{*'\"])|export\b)|\bimport\s*\(", re.MULTILINE
+)
+# A static CSS/JS path at the start of a quoted or url() reference (after an optional
+# path such as /maths.pm/ or ../), ending the URL or followed by its query or fragment
+_ASSET_REFERENCE = re.compile(
+    r"""(?P<lead>["'(](?:[^"'()\s]*?/)?)(?P<asset>static/[\w@./-]+?\.(?:css|js))(?=["'?#)])"""
+)
+
+
+def is_generated_asset(rel_path: str) -> bool:
+    """True for files this stage writes (.gz/.br siblings, hashed copies): sync_tree keeps them."""
+    if rel_path.endswith(COMPRESSED_SUFFIXES):
+        return True
+    stem, dot, suffix = rel_path.rpartition(".")
+    return bool(dot) and f".{suffix}" in FINGERPRINT_SUFFIXES and bool(_HASHED_NAME.search(stem))
+
+
+def _is_fresh(sibling: Path, source_stat: os.stat_result) -> bool:
+    # ctime moves whenever the source is rewritten or replaced, even if mtime is preserved
+    try:
+        sibling_stat = sibling.stat()
+    except FileNotFoundError:
+        return False
+    return sibling_stat.st_mtime_ns >= max(source_stat.st_mtime_ns, source_stat.st_ctime_ns)
+
+
+def _write_if_smaller(path: Path, data: bytes, original_size: int) -> int:
+    if len(data) >= original_size:
+        path.unlink(missing_ok=True)
+        return 0
+    write_atomic(path, data)
+    return len(data)
+
+
+def _compress_file(path_str: str) -> Tuple[int, int, int]:
+    """Worker: write .gz (and .br) next to a file. Returns (input, gz, br) byte counts."""
+    path = Path(path_str)
+    source_stat = path.stat()
+    gz_path = path.with_name(path.name + ".gz")
+    br_path = path.with_name(path.name + ".br")
+    need_gz = not _is_fresh(gz_path, source_stat)
+    need_br = brotli is not None and not _is_fresh(br_path, source_stat)
+    if not (need_gz or need_br):
+        return 0, 0, 0
+
+    data = path.read_bytes()
+    gz_size = br_size = 0
+    if need_gz:
+        gz_size = _write_if_smaller(gz_path, gzip.compress(data, 9, mtime=0), len(data))
+    if need_br:
+        br_size = _write_if_smaller(br_path, brotli.compress(data, quality=11), len(data))
+    return len(data), gz_size, br_size
+
+
+def _hashed_reference(mapping: Dict[str, str], match: "re.Match[str]") -> str:
+    lead, asset = match.group("lead", "asset")
+    if "//" in lead:
+        # Absolute URL (https://cdn.example/static/...): another host's file
+        return match.group()
+    return lead + mapping.get(asset, asset)
+
+
+def _rewrite_page(mapping: Dict[str, str], path_str: str) -> bool:
+    """Worker: point a page at fingerprinted assets. Returns True if it changed."""
+    path = Path(path_str)
+    content = path.read_text(encoding="utf-8")
+    updated = _ASSET_REFERENCE.sub(partial(_hashed_reference, mapping), content)
+    if updated == content:
+        return False
+    # Pages copied from pms/ may be hardlinks: replace them, never write through
+    write_atomic(path, updated)
+    return True
+
+
+def _load_asset_manifest(output_dir: Path) -> Dict[str, str]:
+    try:
+        with open(output_dir / ASSET_MANIFEST_NAME, "r", encoding="utf-8") as f:
+            return json.load(f).get("assets", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def fingerprint_static(output_dir: Path, static_prefix: str = "static") -> Dict[str, str]:
+    """Write content-hashed copies of static CSS and classic scripts, return {original: hashed}.
+
+    ES modules keep their names (see the module docstring). Originals are kept.
+    """
+    static_dir = output_dir / static_prefix
+    assets: Dict[str, str] = {}
+    wanted = set()
+
+    def include(path: Path) -> bool:
+        return path.suffix in FINGERPRINT_SUFFIXES and not _HASHED_NAME.search(path.stem)
+
+    for rel_path in sorted(scan_tree(static_dir, include=include)):
+        if rel_path.startswith(FINGERPRINT_EXCLUDE):
+            continue
+        source = static_dir / rel_path
+        data = source.read_bytes()
+        if source.suffix == ".js" and _ES_MODULE.search(data):
+            continue
+        digest = hashlib.sha256(data).hexdigest()[:10]
+        hashed = source.with_name(f"{source.stem}.{digest}{source.suffix}")
+        if not hashed.exists():
+            place_file(source, hashed, "auto")
+        hashed_rel = f"{static_prefix}/{hashed.relative_to(static_dir).as_posix()}"
+        assets[f"{static_prefix}/{rel_path}"] = hashed_rel
+        wanted.add(hashed_rel)
+
+    # Drop hashed copies from previous runs whose content changed since
+    for old_hashed in set(_load_asset_manifest(output_dir).values()) - wanted:
+        (output_dir / old_hashed).unlink(missing_ok=True)
+
+    return assets
+
+
+def remove_orphan_siblings(output_dir: Path) -> int:
+    """Delete .gz/.br files whose source is gone."""
+    removed = 0
+    for rel_path in scan_tree(output_dir, include=lambda p: p.suffix in COMPRESSED_SUFFIXES):
+        sibling = output_dir / rel_path
+        if not sibling.with_suffix("").exists():
+            sibling.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+def run_asset_stage(
+    output_dir: Path,
+    fingerprint: bool = True,
+    precompress: bool = True,
+    min_size: int = MIN_COMPRESS_SIZE,
+    max_workers: Optional[int] = None,
+) -> Dict[str, object]:
+    """Fingerprint static CSS/JS, rewrite references in pages, then precompress.
+
+    Returns a summary for build-report.json.
+    """
+    output_dir = Path(output_dir)
+    start = time.perf_counter()
+    report: Dict[str, object] = {"brotli": brotli is not None}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        if fingerprint:
+            previous = _load_asset_manifest(output_dir)
+            assets = fingerprint_static(output_dir)
+            # Pages kept from an earlier incremental run may still point at old hashes
+            mapping = dict(assets)
+            for original, old_hashed in previous.items():
+                mapping[old_hashed] = assets.get(original, original)
+
+            # Exported pages only: HTML under static/ is mirrored from src/static and
+            # rewriting it would make the next sync copy it again
+            pages = [
+                str(output_dir / rel_path)
+                for rel_path in scan_tree(output_dir, include=lambda p: p.suffix == ".html")
+                if not rel_path.startswith("static/")
+            ]
+            rewritten = sum(
+                pool.map(partial(_rewrite_page, mapping), pages, chunksize=16)
+            )
+
+            manifest_path = output_dir / ASSET_MANIFEST_NAME
+            manifest_path.write_text(
+                json.dumps({"version": 1, "assets": assets}, indent=2), encoding="utf-8"
+            )
+            report["fingerprinted"] = len(assets)
+            report["pages_rewritten"] = rewritten
+            logger.info(
+                f"🔖 Fingerprinted {len(assets)} CSS/classic JS assets, {rewritten} pages updated"
+            )
+
+        if precompress:
+            candidates: List[str] = []
+            for rel_path, stat in scan_tree(
+                output_dir, include=lambda p: p.suffix in COMPRESSIBLE_SUFFIXES
+            ).items():
+                if stat.st_size >= min_size:
+                    candidates.append(str(output_dir / rel_path))
+
+            compressed = bytes_in = gz_total = br_total = 0
+            for size_in, gz_size, br_size in pool.map(_compress_file, candidates, chunksize=8):
+                if size_in:
+                    compressed += 1
+                    bytes_in += size_in
+                    gz_total += gz_size
+                    br_total += br_size
+            removed = remove_orphan_siblings(output_dir)
+
+            report.update(
+                {
+                    "compress_candidates": len(candidates),
+                    "compressed": compressed,
+                    "bytes_in": bytes_in,
+                    "gzip_bytes": gz_total,
+                    "brotli_bytes": br_total,
+                    "orphan_siblings_removed": removed,
+                }
+            )
+            logger.info(
+                f"🗜️ Precompressed {compressed}/{len(candidates)} files "
+                f"({format_bytes(bytes_in)} -> gz {format_bytes(gz_total)}"
+                + (f", br {format_bytes(br_total)}" if brotli is not None else ", no brotli")
+                + ")"
+            )
+
+    report["elapsed_s"] = round(time.perf_counter() - start, 3)
+    return report
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""
+Build manifest for incremental static exports
+Records, for every file written to dist/, the hash of the inputs it was produced
+from: the source PM and the files it references, templates, product/domain settings
+and application code. A rerun re-renders only the routes whose inputs changed, copies
+only changed assets and deletes outputs whose sources disappeared.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from ..lifespan.sync import file_digest, place_file, scan_tree
+
+logger = logging.getLogger("maths_pm")
+
+MANIFEST_NAME = ".build-manifest.json"
+# StaticSiteBuilder (/api/build) shares dist/ with scripts/build_for_github.py: each
+# exporter keeps its own manifest, so pruning only removes what that exporter wrote
+BUILDER_MANIFEST_NAME = ".build-manifest.builder.json"
+MANIFEST_VERSION = 1
+
+# Local files a PM can pull into its rendering: markdown links/images (SVG and HTML
+# are inlined), codex `script_path:` entries and raw src= attributes
+_PM_REFERENCE = re.compile(
+    r"""(?:\]\(|script_path:\s*["']?|src=["'])/?([\w./-]+\.[A-Za-z0-9]+)"""
+)
+
+
+def _hash_parts(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def hash_tree(root: Path, suffixes: Optional[Iterable[str]] = None) -> str:
+    """Content hash of every file under root (optionally filtered by suffix)."""
+    wanted = tuple(suffixes) if suffixes else None
+    entries = scan_tree(root, include=(lambda p: p.suffix in wanted) if wanted else None)
+    digest = hashlib.sha256()
+    for rel_path in sorted(entries):
+        digest.update(rel_path.encode("utf-8"))
+        digest.update(file_digest(root / rel_path, entries[rel_path]).encode("ascii"))
+    return digest.hexdigest()
+
+
+class RouteInputs:
+    """Compute the input hash of an exported route.
+
+    Args:
+        base_dir: Repository root (where pms/, domains/, products/ and src/ live)
+        variant: Anything else that changes the output, e.g. the deployment base path
+    """
+
+    def __init__(self, base_dir: Path, variant: str = ""):
+        self.base_dir = Path(base_dir)
+        self.pms_dir = self.base_dir / "pms"
+        self.static_dir = self.base_dir / "src" / "static"
+        self.variant = variant
+        self._global_hash: Optional[str] = None
+        self._digests: Dict[Path, str] = {}
+
+    @property
+    def global_hash(self) -> str:
+        """Templates, domain/product settings and application code: shared by every page."""
+        if self._global_hash is None:
+            src_dir = self.base_dir / "src"
+            self._global_hash = _hash_parts(
+                self.variant,
+                hash_tree(src_dir / "templates"),
+                hash_tree(self.base_dir / "domains"),
+                hash_tree(self.base_dir / "products"),
+                hash_tree(src_dir, suffixes=(".py",)),
+                # Index pages list the PMs, so their names are an input too
+                _hash_parts(*sorted(scan_tree(self.pms_dir))),
+            )
+        return self._global_hash
+
+    def _digest(self, path: Path) -> str:
+        if path not in self._digests:
+            self._digests[path] = file_digest(path)
+        return self._digests[path]
+
+    def _resolve_reference(self, md_path: Path, ref: str) -> Optional[Path]:
+        """Same lookup order as the fragment builder, plus the PM's own directory."""
+        candidates = [self.base_dir / ref, md_path.parent / ref, self.base_dir / "files" / ref]
+        if ref.startswith("static/"):
+            candidates.append(self.static_dir / ref[len("static/"):])
+        if "static/pm/" in ref:
+            candidates.append(self.pms_dir / ref.split("static/pm/", 1)[1])
+        for candidate in candidates:
+            if candidate.is_file():
+                return candidate
+        return None
+
+    def pm_dependencies(self, md_path: Path) -> List[Path]:
+        """Local files referenced by a PM, in a stable order."""
+        try:
+            text = md_path.read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            return []
+        found = set()
+        for ref in _PM_REFERENCE.findall(text):
+            resolved = self._resolve_reference(md_path, ref)
+            if resolved is not None:
+                found.add(resolved)
+        return sorted(found)
+
+    def for_route(self, route: str) -> str:
+        """Input hash for a route, as exported by the static builders."""
+        route_path = route.split("?")[0]
+        if route_path.startswith("/pm/"):
+            source = self.pms_dir / route_path[len("/pm/"):]
+            if source.is_file():
+                if source.suffix != ".md":
+                    # Raw PM asset: served as-is
+                    return _hash_parts(route, self._digest(source))
+                parts = [route, self.global_hash, self._digest(source)]
+                for dep in self.pm_dependencies(source):
+                    parts.extend((str(dep), self._digest(dep)))
+                return _hash_parts(*parts)
+        return _hash_parts(route, self.global_hash)
+
+
+class BuildManifest:
+    """Outputs of the previous export and the inputs they were built from.
+
+    `routes` maps a route to {"output", "inputs"}; `copies` maps a copied file
+    (output-relative) to {"inputs"}. Output paths are POSIX, relative to output_dir.
+    """
+
+    def __init__(self, output_dir: Path, name: str = MANIFEST_NAME):
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / name
+        self.routes: Dict[str, Dict[str, str]] = {}
+        self.copies: Dict[str, Dict[str, str]] = {}
+        self.loaded = False
+
+    @classmethod
+    def load(cls, output_dir: Path, name: str = MANIFEST_NAME) -> "BuildManifest":
+        manifest = cls(output_dir, name)
+        try:
+            with open(manifest.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                manifest.routes = data.get("routes", {})
+                manifest.copies = data.get("copies", {})
+                manifest.loaded = True
+        except (OSError, ValueError):
+            pass
+        return manifest
+
+    def save(self) -> None:
+        data = {
+            "version": MANIFEST_VERSION,
+            "routes": dict(sorted(self.routes.items())),
+            "copies": dict(sorted(self.copies.items())),
+        }
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def route_is_fresh(self, route: str, inputs: str) -> bool:
+        entry = self.routes.get(route)
+        return bool(
+            entry
+            and entry.get("inputs") == inputs
+            and (self.output_dir / entry["output"]).is_file()
+        )
+
+    def record_route(self, route: str, output: str, inputs: str) -> None:
+        self.routes[route] = {"output": output, "inputs": inputs}
+
+    def copy_is_fresh(self, output: str, inputs: str) -> bool:
+        entry = self.copies.get(output)
+        return bool(
+            entry and entry.get("inputs") == inputs and (self.output_dir / output).is_file()
+        )
+
+    def record_copy(self, output: str, inputs: str) -> None:
+        self.copies[output] = {"inputs": inputs}
+
+    def prune(self, routes: Iterable[str], copies: Iterable[str]) -> List[str]:
+        """Forget routes/copies that are no longer produced and delete their files.
+
+        Returns the output paths that were removed.
+        """
+        routes, copies = set(routes), set(copies)
+        stale_routes = [route for route in self.routes if route not in routes]
+        stale_copies = [output for output in self.copies if output not in copies]
+
+        kept_outputs = {self.routes[route]["output"] for route in routes if route in self.routes}
+        kept_outputs |= copies
+
+        candidates = [self.routes.pop(route)["output"] for route in stale_routes]
+        for output in stale_copies:
+            del self.copies[output]
+            candidates.append(output)
+
+        removed = []
+        for output in candidates:
+            if output in kept_outputs:
+                continue
+            try:
+                (self.output_dir / output).unlink()
+                removed.append(output)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"⚠️ Failed to remove stale output {output}: {e}")
+        return removed
+
+
+def has_build_manifest(output_dir: Path) -> bool:
+    """True if any exporter left a manifest in output_dir (its files are accounted for)."""
+    return any(
+        (Path(output_dir) / name).is_file() for name in (MANIFEST_NAME, BUILDER_MANIFEST_NAME)
+    )
+
+
+def plan_routes(
+    manifest: BuildManifest, routes: Iterable[str], inputs: RouteInputs
+) -> Tuple[Dict[str, str], List[str]]:
+    """Hash every route's inputs and list the routes that must be rendered again."""
+    hashes = {route: inputs.for_route(route) for route in dict.fromkeys(routes)}
+    stale = [route for route, digest in hashes.items() if not manifest.route_is_fresh(route, digest)]
+    return hashes, stale
+
+
+def merge_route_results(
+    manifest: BuildManifest, hashes: Dict[str, str], rendered: List[Dict[str, object]]
+) -> List[Dict[str, object]]:
+    """Record rendered routes in the manifest; return results for every route, in order.
+
+    Routes that were not rendered are reported with `"skipped": True`. Failed routes
+    keep their previous manifest entry, whose inputs no longer match: they are retried
+    on the next run.
+    """
+    by_route = {str(result["route"]): result for result in rendered}
+    results = []
+    for route, digest in hashes.items():
+        result = by_route.get(route)
+        if result is None:
+            result = {
+                "route": route,
+                "success": True,
+                "skipped": True,
+                "output": manifest.routes[route]["output"],
+            }
+        elif result.get("success") and result.get("output"):
+            manifest.record_route(route, str(result["output"]), digest)
+        results.append(result)
+    return results
+
+
+def copy_files_with_manifest(
+    manifest: BuildManifest,
+    src_root: Path,
+    dest_prefix: str,
+    skip_outputs: Iterable[str] = (),
+    link: Union[bool, str] = "copy",
+) -> Tuple[List[str], int]:
+    """Copy src_root into output_dir/dest_prefix, skipping files whose content is unchanged.
+
+    `link` is a sync_tree placement mode: "auto" reflinks or hardlinks instead of copying.
+    Returns (output paths now owned by this copy, number of files actually placed).
+    """
+    skip = set(skip_outputs)
+    outputs: List[str] = []
+    copied = 0
+    entries = scan_tree(src_root)
+    for rel_path in sorted(entries):
+        output = f"{dest_prefix}/{rel_path}" if dest_prefix else rel_path
+        if output in skip:
+            continue
+        src = src_root / rel_path
+        try:
+            digest = file_digest(src, entries[rel_path])
+            if not manifest.copy_is_fresh(output, digest):
+                place_file(src, manifest.output_dir / output, link)
+                copied += 1
+            manifest.record_copy(output, digest)
+            outputs.append(output)
+        except OSError as e:
+            logger.warning(f"⚠️ Failed to copy {src}: {e}")
+    return outputs, copied
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""
+Minification of exported pages for Maths.pm
+Collapses the template indentation in exported HTML, compacts JSON script blocks
+and JSON routes, and (when minify-html is installed) minifies inline CSS and JS.
+Whitespace-sensitive content is left byte for byte: <pre>/<code>/<textarea>,
+elements styled with white-space: pre, and math between KaTeX/MathJax delimiters.
+"""
+
+import json
+import logging
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ..lifespan.sync import format_bytes, write_atomic
+
+try:
+    import minify_html
+except ImportError:
+    # Inline <style>/<script> code is then kept as-is
+    minify_html = None
+
+logger = logging.getLogger("maths_pm")
+
+_TOKEN = re.compile(
+    r"""<!--.*?-->"""
+    r"""|<(script|style|pre|code|textarea)\b(?:[^<>"']|"[^"]*"|'[^']*')*>.*?</\1\s*>"""
+    r"""|<[a-zA-Z/!?](?:[^<>"']|"[^"]*"|'[^']*')*>""",
+    re.S | re.I,
+)
+_TAG_NAME = re.compile(r"</?([a-zA-Z][\w-]*)")
+_TYPE_ATTRIBUTE = re.compile(r"""\btype\s*=\s*["']?([^"'\s>]+)""", re.I)
+_PRESERVE_STYLE = re.compile(r"whitespace-pre|white-space:\s*(?:pre|break-spaces)", re.I)
+# KaTeX auto-render and MathJax delimiters, display forms first
+_MATH = re.compile(r"\$\$.*?\$\$|\\\[.*?\\\]|\\\(.*?\\\)|\$[^$]+\$", re.S)
+_WHITESPACE = re.compile(r"\s+")
+
+JSON_SCRIPT_TYPES = ("application/json", "application/ld+json", "importmap")
+JS_SCRIPT_TYPES = ("", "text/javascript", "application/javascript", "module")
+VOID_TAGS = frozenset(
+    "area base br col embed hr img input link meta param source track wbr".split()
+)
+
+
+def minify_json_text(text: str) -> str:
+    """Compact JSON, keeping key order and non-ASCII text; `</` stays escaped for HTML."""
+    data = json.loads(text)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
+
+
+def _collapse(match: "re.Match[str]") -> str:
+    return "\n" if "\n" in match.group() else " "
+
+
+def _minify_text(text: str) -> str:
+    """Collapse whitespace runs in a text node, leaving math spans untouched."""
+    if "$" not in text and "\\" not in text:
+        return _WHITESPACE.sub(_collapse, text)
+    pieces = []
+    position = 0
+    for match in _MATH.finditer(text):
+        pieces.append(_WHITESPACE.sub(_collapse, text[position : match.start()]))
+        pieces.append(match.group())
+        position = match.end()
+    pieces.append(_WHITESPACE.sub(_collapse, text[position:]))
+    return "".join(pieces)
+
+
+def _minify_raw_block(name: str, block: str) -> str:
+    """<script>/<style> blocks: JSON is compacted, CSS/JS go through minify-html."""
+    if name == "script":
+        open_end = block.index(">") + 1
+        type_match = _TYPE_ATTRIBUTE.search(block, 0, open_end)
+        script_type = type_match.group(1).lower() if type_match else ""
+        if script_type in JSON_SCRIPT_TYPES:
+            close_start = block.lower().rindex("</script")
+            try:
+                body = minify_json_text(block[open_end:close_start])
+            except ValueError:
+                return block
+            return block[:open_end] + body + block[close_start:]
+        if script_type not in JS_SCRIPT_TYPES:
+            # math/tex, templates, shaders...: not ours to touch
+            return block
+    if minify_html is None:
+        return block
+    try:
+        minified = minify_html.minify(
+            block, minify_css=True, minify_js=True, keep_closing_tags=True
+        )
+    except Exception:
+        return block
+    return minified if len(minified) < len(block) else block
+
+
+def minify_html_document(content: str) -> str:
+    """Minify an exported page without touching whitespace-sensitive content."""
+    pieces: List[str] = []
+    position = 0
+    # Element whose content is kept verbatim (white-space: pre), and its nesting depth
+    preserve_tag: Optional[str] = None
+    preserve_depth = 0
+
+    for match in _TOKEN.finditer(content):
+        text = content[position : match.start()]
+        pieces.append(text if preserve_tag else _minify_text(text))
+        position = match.end()
+        token = match.group()
+
+        if token.startswith("<!--"):
+            # Conditional comments are markup, the rest can go
+            if preserve_tag or token.startswith("<!--["):
+                pieces.append(token)
+            continue
+
+        raw_name = match.group(1)
+        if raw_name:
+            name = raw_name.lower()
+            if name in ("script", "style") and not preserve_tag:
+                pieces.append(_minify_raw_block(name, token))
+            else:
+                pieces.append(token)
+            continue
+
+        pieces.append(token)
+        name_match = _TAG_NAME.match(token)
+        if not name_match:
+            continue
+        name = name_match.group(1).lower()
+        closing = token.startswith("</")
+        if preserve_tag is None:
+            if not closing and name not in VOID_TAGS and _PRESERVE_STYLE.search(token):
+                preserve_tag, preserve_depth = name, 1
+        elif name == preserve_tag:
+            if closing:
+                preserve_depth -= 1
+                if preserve_depth == 0:
+                    preserve_tag = None
+            elif not token.endswith("/>"):
+                preserve_depth += 1
+
+    text = content[position:]
+    pieces.append(text if preserve_tag else _minify_text(text))
+    return "".join(pieces)
+
+
+def _minify_file(path_str: str) -> Tuple[int, int]:
+    """Worker: minify an exported HTML/JSON file in place. Returns (before, after) sizes."""
+    path = Path(path_str)
+    content = path.read_text(encoding="utf-8")
+    before = len(content.encode("utf-8"))
+    try:
+        if path.suffix == ".json":
+            minified = minify_json_text(content)
+        else:
+            minified = minify_html_document(content)
+    except ValueError:
+        return before, before
+    after = len(minified.encode("utf-8"))
+    if after >= before:
+        return before, before
+    write_atomic(path, minified)
+    return before, after
+
+
+def minify_route_outputs(
+    output_dir: Path, results: List[Dict[str, object]], max_workers: Optional[int] = None
+) -> Dict[str, object]:
+    """Minify the HTML/JSON written for freshly rendered routes, on a process pool.
+
+    Each result gets `bytes` updated and `minify_saved` (bytes saved). Returns totals
+    for build-report.json.
+    """
+    start = time.perf_counter()
+    targets = [
+        result
+        for result in results
+        if result.get("success")
+        and not result.get("skipped")
+        and str(result.get("output", "")).endswith((".html", ".json"))
+    ]
+    bytes_before = bytes_after = 0
+    if targets:
+        paths = [str(Path(output_dir) / str(result["output"])) for result in targets]
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            for result, (before, after) in zip(
+                targets, pool.map(_minify_file, paths, chunksize=8)
+            ):
+                result["bytes"] = after
+                result["minify_saved"] = before - after
+                bytes_before += before
+                bytes_after += after
+
+    saved = bytes_before - bytes_after
+    logger.info(
+        f"🪶 Minified {len(targets)} pages: saved {format_bytes(saved)} "
+        f"of {format_bytes(bytes_before)}"
+        + ("" if minify_html is not None else " (minify-html not installed: inline CSS/JS kept)")
+    )
+    return {
+        "pages": len(targets),
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "bytes_saved": saved,
+        "inline_css_js": minify_html is not None,
+        "elapsed_s": round(time.perf_counter() - start, 3),
+    }
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""
+URL rewriting rules for exported HTML
+Every exporter fixes its pages with the same kinds of replacements: server origins
+stripped to "/", .md links turned into .html pages, then a base path or relative
+prefix for href/src/action and /static/ imports. The rule tables live here so the
+exporters share them; a UrlRewriter applies one table as ordered str.replace passes,
+exactly like the chains it replaces (an origin stripped to `href="/` is then prefixed).
+A single regex pass measured slower than these C-level passes in most deployment
+modes (scripts/benchmark_url_rewriter.py), so there is none.
+"""
+
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+# Development server origins found in rendered pages, stripped down to "/"
+GITHUB_ORIGINS = (
+    "http://127.0.0.1:8000/",
+    "http://localhost:8000/",
+    "https://127.0.0.1:8000/",
+    "https://localhost:8000/",
+)
+BUILDER_ORIGINS = ("http://127.0.0.1:8000/", "http://localhost:8000/", "//127.0.0.1:8000/")
+
+# PM links: .md (optionally ?format=html) become .html pages
+PM_LINK_RULES = (
+    ('.md?format=html"', '.html"'),
+    (".md?format=html'", ".html'"),
+    ('.md"', '.html"'),
+    (".md'", ".html'"),
+)
+
+ATTRIBUTE_LEADS = ('href="', "href='", 'src="', "src='", 'action="')
+STATIC_IMPORT_LEADS = ("import '", 'import "', "from '", 'from "')
+
+
+class UrlRewriter:
+    """Ordered literal replacements: server origins first, then the rules in order.
+
+    Args:
+        replacements: (literal, replacement) pairs, applied in sequence
+        origins: Server origins (ending with "/") replaced by "/" before any rule
+    """
+
+    def __init__(self, replacements: Sequence[Tuple[str, str]], origins: Sequence[str] = ()):
+        self.rules: Tuple[Tuple[str, str], ...] = (
+            *((origin, "/") for origin in origins),
+            *replacements,
+        )
+
+    def __call__(self, content: str) -> str:
+        for literal, replacement in self.rules:
+            content = content.replace(literal, replacement)
+        return content
+
+
+def base_path_rules(base_path: str, js_alias_leads: Sequence[str] = ()) -> List[Tuple[str, str]]:
+    """Prefix absolute href/src/action and /static/ imports (and `@js/` aliases) with base_path."""
+    rules = [(lead + "/", f"{lead}{base_path}/") for lead in ATTRIBUTE_LEADS]
+    rules += [(f"{lead}/static/", f"{lead}{base_path}/static/") for lead in STATIC_IMPORT_LEADS]
+    rules += [(f"{lead}@js/", f"{lead}{base_path}/static/js/") for lead in js_alias_leads]
+    return rules
+
+
+@lru_cache(maxsize=None)
+def github_pages_rewriter(base_path: str = "", legacy_paths: bool = False) -> UrlRewriter:
+    """Rules of scripts/build_for_github.py: base path prefix only for legacy GitHub Pages."""
+    rules: List[Tuple[str, str]] = []
+    if base_path and legacy_paths:
+        rules += base_path_rules(base_path)
+    rules += PM_LINK_RULES
+    return UrlRewriter(rules, GITHUB_ORIGINS)
+
+
+def route_depth(path: str) -> int:
+    """Directory depth used by StaticSiteBuilder for relative links."""
+    return len(Path(path).parts) - 1
+
+
+@lru_cache(maxsize=None)
+def static_builder_rewriter(base_path: str = "", depth: int = 0) -> UrlRewriter:
+    """Rules of src/build.py: base path prefix, or relative links `depth` levels deep."""
+    rules: List[Tuple[str, str]] = list(PM_LINK_RULES)
+    if base_path:
+        rules += base_path_rules(base_path, js_alias_leads=("from '", 'from "', "import '", 'import "'))
+    elif depth > 0:
+        prefix = "../" * depth
+        rules += [(lead + "/", f"{lead}{prefix}") for lead in ATTRIBUTE_LEADS]
+        rules += [(f"{lead}/static/", f"{lead}{prefix}static/") for lead in STATIC_IMPORT_LEADS]
+        rules += [(f"{lead}@js/", f"{lead}{prefix}static/js/") for lead in ("from '", 'from "')]
+    else:
+        rules += [(lead + "/", lead) for lead in ATTRIBUTE_LEADS]
+        rules += [(f"{lead}/static/", f"{lead}static/") for lead in ("import '", 'import "')]
+        rules += [(f"{lead}@js/", f"{lead}static/js/") for lead in ("from '", 'from "')]
+    return UrlRewriter(rules, BUILDER_ORIGINS)
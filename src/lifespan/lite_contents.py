@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""
+JupyterLite contents manifest for Maths.pm
+Delta sync of files-for-lite/ and notebooks into a JupyterLite output, plus the
+pre-generated contents index used by the JupyterLite file browser.
+
+The manifest lives next to the files it describes (`_output/.files-manifest.json`)
+and records, per destination file, its source, size, mtime and SHA-256. It lets
+startup copy only what changed and lets the debug route answer without walking disk.
+"""
+
+import json
+import logging
+import mimetypes
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from .sync import file_digest, place_file
+
+logger = logging.getLogger("maths_pm")
+
+MANIFEST_NAME = ".files-manifest.json"
+MANIFEST_VERSION = 1
+
+
+class LiteFilesManifest:
+    """Destination-relative path -> {scope, source, size, mtime_ns, sha256} for one `files/` root."""
+
+    def __init__(self, files_root: Path):
+        self.files_root = files_root
+        self.path = files_root.parent / MANIFEST_NAME
+        self.entries: Dict[str, Dict[str, object]] = {}
+        self.updated_at: Optional[float] = None
+
+    @classmethod
+    def load(cls, files_root: Path) -> "LiteFilesManifest":
+        manifest = cls(files_root)
+        try:
+            with open(manifest.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                manifest.entries = data.get("entries", {})
+                manifest.updated_at = data.get("updated_at")
+        except (OSError, ValueError):
+            pass
+        return manifest
+
+    def save(self) -> None:
+        self.updated_at = time.time()
+        data = {
+            "version": MANIFEST_VERSION,
+            "updated_at": self.updated_at,
+            "entries": dict(sorted(self.entries.items())),
+        }
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def sources(self) -> Iterable[str]:
+        return (str(entry["source"]) for entry in self.entries.values())
+
+
+def _source_digest(src: Path, src_stat: os.stat_result, previous: Optional[dict]) -> str:
+    """Reuse the recorded hash while the source size/mtime are unchanged."""
+    if (
+        previous
+        and previous.get("source") == str(src)
+        and previous.get("size") == src_stat.st_size
+        and previous.get("mtime_ns") == src_stat.st_mtime_ns
+        and previous.get("sha256")
+    ):
+        return str(previous["sha256"])
+    return file_digest(src, src_stat)
+
+
+def sync_files_with_manifest(
+    plan: Dict[str, Path], files_root: Path, scope: str, link: Union[bool, str] = "copy"
+) -> Tuple[int, LiteFilesManifest]:
+    """
+    Copy `plan` (destination-relative path -> source file) into `files_root`.
+
+    Files whose recorded hash matches the source are left alone. Files previously
+    synced under the same `scope` but no longer planned are removed; entries owned
+    by other scopes (e.g. "files-for-lite" vs "notebooks") are kept untouched.
+
+    `link` is a sync_tree placement mode ("auto" reflinks or hardlinks when possible).
+
+    Returns (number of files copied, updated manifest).
+    """
+    manifest = LiteFilesManifest.load(files_root)
+    previous_entries = manifest.entries
+    entries: Dict[str, Dict[str, object]] = {
+        rel_path: entry
+        for rel_path, entry in previous_entries.items()
+        if entry.get("scope") != scope and rel_path not in plan
+    }
+    copied = 0
+
+    for rel_path, src in plan.items():
+        dest = files_root / rel_path
+        try:
+            src_stat = src.stat()
+            previous = previous_entries.get(rel_path)
+            digest = _source_digest(src, src_stat, previous)
+
+            up_to_date = False
+            if previous and previous.get("sha256") == digest and dest.is_file():
+                up_to_date = dest.stat().st_size == src_stat.st_size
+
+            if not up_to_date:
+                place_file(src, dest, link)
+                copied += 1
+
+            entries[rel_path] = {
+                "scope": scope,
+                "source": str(src),
+                "size": src_stat.st_size,
+                "mtime_ns": src_stat.st_mtime_ns,
+                "sha256": digest,
+            }
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to copy {src} -> {dest}: {e}")
+
+    for rel_path, entry in previous_entries.items():
+        if entry.get("scope") == scope and rel_path not in plan:
+            try:
+                (files_root / rel_path).unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"⚠️ Failed to remove stale {files_root / rel_path}: {e}")
+
+    manifest.entries = entries
+    manifest.save()
+    return copied, manifest
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _content_model(rel_path: str, stat: Optional[os.stat_result], is_dir: bool) -> dict:
+    name = rel_path.rsplit("/", 1)[-1] if rel_path else ""
+    modified = _iso(stat.st_mtime) if stat else _iso(time.time())
+    if is_dir:
+        content_type, mimetype, size = "directory", None, None
+    elif name.endswith(".ipynb"):
+        content_type, mimetype, size = "notebook", None, stat.st_size
+    else:
+        content_type, size = "file", stat.st_size
+        mimetype = mimetypes.guess_type(name)[0]
+    return {
+        "content": None,
+        "created": modified,
+        "format": None,
+        "hash": None,
+        "hash_algorithm": None,
+        "last_modified": modified,
+        "mimetype": mimetype,
+        "name": name,
+        "path": rel_path,
+        "size": size,
+        "type": content_type,
+        "writable": True,
+    }
+
+
+def write_contents_index(output_dir: Path, manifest: LiteFilesManifest) -> int:
+    """
+    Merge the manifest's files into JupyterLite's `api/contents/**/all.json` listings,
+    so the file browser shows them without extra requests or a rebuild.
+    Returns the number of directory listings written.
+    """
+    listings: Dict[str, Dict[str, dict]] = {"": {}}
+    for rel_path in manifest.entries:
+        parts = rel_path.split("/")
+        for depth in range(1, len(parts)):
+            parent = "/".join(parts[: depth - 1])
+            directory = "/".join(parts[:depth])
+            listings.setdefault(directory, {})
+            listings.setdefault(parent, {})[parts[depth - 1]] = _content_model(
+                directory, None, is_dir=True
+            )
+        parent = "/".join(parts[:-1])
+        dest = manifest.files_root / rel_path
+        try:
+            stat = dest.stat()
+        except OSError:
+            continue
+        listings.setdefault(parent, {})[parts[-1]] = _content_model(rel_path, stat, is_dir=False)
+
+    contents_root = output_dir / "api" / "contents"
+    written = 0
+    for directory, children in listings.items():
+        index_path = contents_root / directory / "all.json" if directory else contents_root / "all.json"
+        existing: Dict[str, dict] = {}
+        model = _content_model(directory, None, is_dir=True)
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            model = {**data, "content": None}
+            existing = {
+                child["name"]: child
+                for child in data.get("content") or []
+                # Drop listings for files a previous sync removed
+                if child.get("type") == "directory"
+                or (manifest.files_root / child.get("path", "")).is_file()
+            }
+        except (OSError, ValueError):
+            pass
+
+        merged = {**existing, **children}
+        model["content"] = sorted(merged.values(), key=lambda child: child["name"].lower())
+        model["format"] = "json"
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(index_path, "w", encoding="utf-8") as f:
+            json.dump(model, f, ensure_ascii=False)
+        written += 1
+
+    return written
@@ -7,20 +7,130 @@ Encapsulates startup and shutdown logic used by FastAPI lifespan.
 
 import os
 import asyncio
+import hashlib
+import time
 from contextlib import asynccontextmanager
 from pathlib import Path
-from shutil import copy2, rmtree
+from shutil import rmtree
+from typing import Optional
 import logging
 import httpx
 
 from fastapi import FastAPI
 
 from ..settings import settings
+from .lite_contents import LiteFilesManifest, sync_files_with_manifest, write_contents_index
+from .sync import file_digest, log_sync_stats, scan_tree, sync_tree
 
 logger = logging.getLogger("maths_pm")
 
 
+JUPYTERLITE_PACKAGES = ("jupyterlite-core", "jupyterlite-pyodide-kernel", "jupyterlite-p5-kernel")
+JUPYTERLITE_CONFIG_FILES = ("jupyter-lite.json", "jupyter_lite_config.json")
+JUPYTERLITE_HASH_FILE = ".build-inputs.sha256"
+
+
+class JupyterLiteBuildState:
+    """Build status shared with /api/health so readiness never waits on the build."""
+
+    def __init__(self):
+        self.status = "idle"  # idle | cached | building | ready | failed | disabled
+        self.inputs_hash: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status in ("cached", "ready")
+
+    def to_dict(self) -> dict:
+        duration = None
+        if self.started_at is not None and self.finished_at is not None:
+            duration = round(self.finished_at - self.started_at, 2)
+        return {
+            "status": self.status,
+            "ready": self.ready,
+            "inputs_hash": self.inputs_hash,
+            "duration": duration,
+            "error": self.error,
+        }
+
+
+jupyterlite_state = JupyterLiteBuildState()
+
+
+def compute_jupyterlite_inputs_hash() -> str:
+    """
+    Hash everything that influences `jupyter lite build`:
+    the lite config files, the installed JupyterLite package versions and files-for-lite/.
+    """
+    from importlib import metadata
+
+    digest = hashlib.sha256()
+
+    for directory in (settings.base_dir, settings.jupyterlite_dir):
+        for name in JUPYTERLITE_CONFIG_FILES:
+            config_path = directory / name
+            if config_path.is_file():
+                digest.update(f"config:{config_path.relative_to(settings.base_dir)}\n".encode())
+                digest.update(config_path.read_bytes())
+
+    for package in JUPYTERLITE_PACKAGES:
+        try:
+            version = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            version = "missing"
+        digest.update(f"package:{package}=={version}\n".encode())
+
+    source_dir = settings.jupyterlite_content_dir
+    for rel_path in sorted(scan_tree(source_dir)):
+        digest.update(f"file:{rel_path}:{file_digest(source_dir / rel_path)}\n".encode())
+
+    return digest.hexdigest()
+
+
+def _read_built_inputs_hash() -> Optional[str]:
+    hash_file = settings.jupyterlite_dir / JUPYTERLITE_HASH_FILE
+    try:
+        return hash_file.read_text(encoding="utf-8").strip() or None
+    except OSError:
+        return None
+
+
+def _write_built_inputs_hash(inputs_hash: str) -> None:
+    try:
+        (settings.jupyterlite_dir / JUPYTERLITE_HASH_FILE).write_text(inputs_hash, encoding="utf-8")
+    except OSError as e:
+        logger.warning(f"⚠️ Failed to record JupyterLite build hash: {e}")
+
+
+def _log_jupyterlite_output_status() -> bool:
+    output_dir = settings.jupyterlite_dir / "_output"
+    index_exists = (output_dir / "index.html").exists()
+    lab_exists = (output_dir / "lab" / "index.html").exists()
+
+    if index_exists and lab_exists:
+        data_files_dir = output_dir / "files" / "data"
+        if data_files_dir.exists():
+            file_count = sum(1 for _, _, files in os.walk(data_files_dir) for _ in files)
+            logger.info(f"✅ JupyterLite ready ({file_count} data files)")
+        else:
+            logger.info("✅ JupyterLite ready")
+        return True
+
+    logger.error("❌ JupyterLite build failed")
+    return False
+
+
+def _jupyterlite_build_cmd() -> list[str]:
+    relative_source = os.path.relpath(settings.jupyterlite_content_dir, settings.jupyterlite_dir)
+    return ["jupyter", "lite", "build", "--contents", relative_source]
+
+
 def build_jupyterlite():
+    """Synchronous build, kept for scripts and manual use."""
     try:
         source_dir = settings.jupyterlite_content_dir
         jupyterlite_dir = settings.jupyterlite_dir
@@ -33,61 +143,138 @@ def build_jupyterlite():
 
         import subprocess
 
-        original_cwd = os.getcwd()
-        os.chdir(str(jupyterlite_dir))
-
         try:
-            relative_source = os.path.relpath(source_dir, jupyterlite_dir)
-            build_cmd = [
-                "jupyter",
-                "lite",
-                "build",
-                "--contents",
-                relative_source,
-            ]
-            subprocess.run(build_cmd, capture_output=True, text=True, check=True)
+            subprocess.run(
+                _jupyterlite_build_cmd(),
+                cwd=str(jupyterlite_dir),
+                capture_output=True,
+                text=True,
+                check=True,
+            )
         except subprocess.CalledProcessError:
             logger.error("❌ JupyterLite build failed")
-        finally:
-            os.chdir(original_cwd)
-
-        output_dir = jupyterlite_dir / "_output"
-        index_exists = (output_dir / "index.html").exists()
-        lab_exists = (output_dir / "lab" / "index.html").exists()
-
-        if index_exists and lab_exists:
-            files_dir = output_dir / "files"
-            if files_dir.exists():
-                data_files_dir = files_dir / "data"
-                if data_files_dir.exists():
-                    file_count = sum(1 for _, _, files in os.walk(data_files_dir) for _ in files)
-                    logger.info(f"✅ JupyterLite ready ({file_count} data files)")
-                else:
-                    logger.info("✅ JupyterLite ready")
-            else:
-                logger.info("✅ JupyterLite ready")
-        else:
-            logger.error("❌ JupyterLite build failed")
+
+        _log_jupyterlite_output_status()
     except Exception as e:
         logger.error(f"❌ JupyterLite build failed: {e}")
 
 
-async def async_build_jupyterlite(force_rebuild: bool = True):
-    import subprocess
+def _clear_jupyterlite_build_cache():
+    output_dir = settings.jupyterlite_dir / "_output"
+    cache_db = settings.jupyterlite_dir / ".jupyterlite.doit.db"
+    hash_file = settings.jupyterlite_dir / JUPYTERLITE_HASH_FILE
+    try:
+        if output_dir.exists():
+            rmtree(output_dir)
+        for path in (cache_db, hash_file):
+            if path.exists():
+                path.unlink()
+    except OSError as e:
+        logger.warning(f"⚠️ Cache cleanup failed: {e}")
 
-    if force_rebuild:
-        output_dir = settings.jupyterlite_dir / "_output"
-        cache_db = settings.jupyterlite_dir / ".jupyterlite.doit.db"
-        try:
-            if output_dir.exists():
-                subprocess.run(["rm", "-rf", str(output_dir)], check=True)
-            if cache_db.exists():
-                subprocess.run(["rm", "-f", str(cache_db)], check=True)
-        except subprocess.CalledProcessError as e:
-            logger.warning(f"⚠️ Cache cleanup failed: {e}")
 
-    build_jupyterlite()
-    await cleanup_service_worker_issues()
+async def _run_jupyterlite_build() -> bool:
+    """Run `jupyter lite build` without blocking the event loop."""
+    source_dir = settings.jupyterlite_content_dir
+    if not source_dir.exists():
+        logger.warning(f"⚠️  JupyterLite source not found: {source_dir}")
+        return False
+
+    settings.jupyterlite_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *_jupyterlite_build_cmd(),
+            cwd=str(settings.jupyterlite_dir),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except OSError as e:
+        logger.error(f"❌ JupyterLite build failed: {e}")
+        return False
+
+    try:
+        _, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        process.kill()
+        raise
+
+    if process.returncode != 0:
+        tail = stderr.decode("utf-8", errors="replace").strip().splitlines()[-5:]
+        logger.error(f"❌ JupyterLite build failed (exit {process.returncode})")
+        for line in tail:
+            logger.error(f"   {line}")
+        return False
+
+    return _log_jupyterlite_output_status()
+
+
+def _post_build_file_sync():
+    # After JupyterLite is built, mirror files-for-lite fully and then ensure notebooks
+    try:
+        mirror_files_for_lite_into_output()
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to mirror files-for-lite into JupyterLite: {e}")
+    try:
+        preload_notebooks_into_jupyterlite_output()
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to preload notebooks into JupyterLite: {e}")
+
+
+async def async_build_jupyterlite(force_rebuild: bool = False, inputs_hash: Optional[str] = None):
+    """
+    Build JupyterLite if its inputs changed, then sync files into the output.
+    Updates `jupyterlite_state` as it goes; safe to run as a background task.
+    """
+    state = jupyterlite_state
+    state.started_at = time.time()
+    state.finished_at = None
+    state.error = None
+
+    try:
+        if inputs_hash is None:
+            inputs_hash = await asyncio.to_thread(compute_jupyterlite_inputs_hash)
+        state.inputs_hash = inputs_hash
+
+        if (
+            not force_rebuild
+            and settings.jupyterlite_built()
+            and _read_built_inputs_hash() == inputs_hash
+        ):
+            await asyncio.to_thread(_post_build_file_sync)
+            state.status = "cached"
+            logger.info(f"✅ JupyterLite up to date, build skipped ({inputs_hash[:12]})")
+            return True
+
+        state.status = "building"
+        logger.info(f"🔨 JupyterLite inputs changed, building in background ({inputs_hash[:12]})")
+        # Start from a clean output: files-for-lite and the service worker are patched post-build
+        await asyncio.to_thread(_clear_jupyterlite_build_cache)
+        if not await _run_jupyterlite_build():
+            state.status = "failed"
+            state.error = "jupyter lite build failed"
+            return False
+
+        await cleanup_service_worker_issues()
+        await asyncio.to_thread(_post_build_file_sync)
+        _write_built_inputs_hash(inputs_hash)
+        state.status = "ready"
+        return True
+    except Exception as e:
+        state.status = "failed"
+        state.error = str(e)
+        logger.error(f"❌ JupyterLite build failed: {e}")
+        return False
+    finally:
+        state.finished_at = time.time()
+
+
+def start_jupyterlite_build(force_rebuild: bool = False) -> asyncio.Task:
+    """Schedule the JupyterLite build so that server startup does not wait for it."""
+    jupyterlite_state.status = "building"
+    jupyterlite_state.task = asyncio.create_task(
+        async_build_jupyterlite(force_rebuild=force_rebuild), name="jupyterlite-build"
+    )
+    return jupyterlite_state.task
 
 
 async def cleanup_service_worker_issues():
@@ -96,8 +283,6 @@ async def cleanup_service_worker_issues():
         if service_worker_path.exists():
             with open(service_worker_path, "r", encoding="utf-8") as f:
                 sw_content = f.read()
-            import time
-
             timestamp = int(time.time())
             cache_buster = f"\n// Cache buster: {timestamp}\n// Service worker updated at startup\n"
             with open(service_worker_path, "w", encoding="utf-8") as f:
@@ -244,57 +429,46 @@ def _get_configured_notebook_sources() -> tuple[list[Path], list[Path]]:
     return explicit_files, source_dirs
 
 
-def _copy_file_preserve_name(src: Path, dest_dir: Path) -> bool:
-    try:
-        dest_dir.mkdir(parents=True, exist_ok=True)
-        dest_path = dest_dir / src.name
-        copy2(src, dest_path)
-        return True
-    except Exception as e:
-        logger.warning(f"⚠️ Failed to copy notebook {src} -> {dest_dir}: {e}")
-        return False
+def _notebook_plan() -> dict[str, Path]:
+    """Destination-relative path (notebooks/<name>) -> source notebook; later duplicates win."""
+    explicit_files, source_dirs = _get_configured_notebook_sources()
+
+    # Start with explicitly listed files, then notebooks discovered in source directories
+    notebooks: list[Path] = [p for p in explicit_files if p.exists() and p.suffix == ".ipynb"]
+    notebooks.extend(_gather_notebooks_from_dirs(source_dirs))
+
+    plan: dict[str, Path] = {}
+    for nb in notebooks:
+        if nb.suffix != ".ipynb":
+            continue
+        # If duplicate names occur, later entries take precedence
+        plan[f"notebooks/{nb.name}"] = nb
+    return plan
 
 
 def preload_notebooks_into_jupyterlite_output() -> int:
     """
     Ensure configured .ipynb notebooks are present in the built JupyterLite output.
     Works for both runtime hosting and static build (since 'src/static' is copied).
+    Only notebooks whose content changed since the last sync are copied (see lite_contents).
     Returns number of notebooks copied.
     """
-    output_files_dir = settings.jupyterlite_dir / "_output" / "files"
-    target_dir = output_files_dir / "notebooks"
+    output_dir = settings.jupyterlite_dir / "_output"
 
-    if not (settings.jupyterlite_dir / "_output").exists():
+    if not output_dir.exists():
         logger.debug("JupyterLite output missing; skipping notebook preload")
         return 0
 
-    explicit_files, source_dirs = _get_configured_notebook_sources()
-
-    # Start with explicitly listed files
-    notebooks: list[Path] = []
-    notebooks.extend([p for p in explicit_files if p.exists() and p.suffix == ".ipynb"])
-
-    # Add notebooks discovered in source directories
-    notebooks.extend(_gather_notebooks_from_dirs(source_dirs))
-
-    # De-duplicate by name to avoid collisions; last one wins
-    seen_names: set[str] = set()
-    copied = 0
-    for nb in notebooks:
-        if nb.suffix != ".ipynb":
-            continue
-        # If duplicate names occur, later entries overwrite earlier ones
-        if nb.name in seen_names:
-            # Still copy to overwrite to ensure precedence
-            if _copy_file_preserve_name(nb, target_dir):
-                copied += 1
-        else:
-            if _copy_file_preserve_name(nb, target_dir):
-                copied += 1
-                seen_names.add(nb.name)
+    plan = _notebook_plan()
+    copied, manifest = sync_files_with_manifest(
+        plan, output_dir / "files", scope="notebooks", link=settings.static_mirror_link
+    )
+    write_contents_index(output_dir, manifest)
 
     if copied > 0:
-        logger.info(f"📓 JupyterLite notebooks preloaded into output ({copied} files)")
+        logger.info(f"📓 JupyterLite notebooks preloaded into output ({copied}/{len(plan)} files)")
+    elif plan:
+        logger.info(f"📓 JupyterLite notebooks already up-to-date ({len(plan)} files)")
     else:
         logger.info("📓 No extra notebooks to preload")
 
@@ -307,6 +481,10 @@ def mirror_files_for_lite_into_output() -> int:
     Preserves subdirectories like data/, and copies all file types (.ipynb, .svg, etc.).
     Also mirrors to the root _output/files/ for compatibility with static builds.
 
+    Each destination keeps a manifest of source hashes, so only changed files are copied,
+    files removed from files-for-lite/ are removed from the output, and the
+    api/contents listings are regenerated from the manifest.
+
     Returns number of files copied/updated.
     """
     source_dir = settings.jupyterlite_content_dir
@@ -321,6 +499,7 @@ def mirror_files_for_lite_into_output() -> int:
         settings.base_dir / "_output" / "files",  # Legacy/static build location
     ]
 
+    plan = {rel_path: source_dir / rel_path for rel_path in scan_tree(source_dir)}
     total_copied = 0
 
     for dest_root in dest_roots:
@@ -330,28 +509,16 @@ def mirror_files_for_lite_into_output() -> int:
             logger.debug(f"JupyterLite output missing, skipping: {output_parent}")
             continue
 
-        copied = 0
-        for root, dirs, files in os.walk(source_dir):
-            rel_root = os.path.relpath(root, source_dir)
-            dest_dir = dest_root / rel_root if rel_root != "." else dest_root
-            dest_dir.mkdir(parents=True, exist_ok=True)
-
-            for filename in files:
-                src_file = Path(root) / filename
-                dest_file = dest_dir / filename
-                try:
-                    # Copy if missing or source is newer
-                    if (
-                        not dest_file.exists()
-                        or src_file.stat().st_mtime > dest_file.stat().st_mtime
-                    ):
-                        copy2(src_file, dest_file)
-                        copied += 1
-                except Exception as e:
-                    logger.warning(f"⚠️ Failed to copy {src_file} -> {dest_file}: {e}")
+        copied, manifest = sync_files_with_manifest(
+            plan, dest_root, scope="files-for-lite", link=settings.static_mirror_link
+        )
+        listings = write_contents_index(output_parent, manifest)
 
         if copied > 0:
-            logger.info(f"📦 files-for-lite mirrored to {dest_root} ({copied} files)")
+            logger.info(
+                f"📦 files-for-lite mirrored to {dest_root} ({copied}/{len(plan)} files, "
+                f"{listings} contents listings)"
+            )
         total_copied += copied
 
     if total_copied > 0:
@@ -366,6 +533,9 @@ def debug_jupyterlite_files() -> dict:
     """
     Debug utility to check JupyterLite file availability across all locations.
     Returns a comprehensive report of file locations and status.
+
+    Reads the sync manifests written by mirror_files_for_lite_into_output() instead of
+    walking the output trees, so it stays cheap however many files are served.
     """
     source_dir = settings.jupyterlite_content_dir
     report = {
@@ -375,13 +545,6 @@ def debug_jupyterlite_files() -> dict:
         "summary": {},
     }
 
-    if source_dir.exists():
-        source_files = list(source_dir.rglob("*"))
-        source_file_count = len([f for f in source_files if f.is_file()])
-        report["source_file_count"] = source_file_count
-    else:
-        report["source_file_count"] = 0
-
     # Check all potential output locations
     locations_to_check = [
         ("runtime", settings.jupyterlite_dir / "_output" / "files"),
@@ -389,21 +552,24 @@ def debug_jupyterlite_files() -> dict:
         ("dist", settings.base_dir / "dist" / "static" / "jupyterlite" / "_output" / "files"),
     ]
 
+    source_prefix = str(source_dir)
+    source_files: set[str] = set()
+
     for location_name, location_path in locations_to_check:
-        location_info = {
+        manifest = LiteFilesManifest.load(location_path)
+        file_names = sorted(manifest.entries)
+        source_files.update(s for s in manifest.sources() if s.startswith(source_prefix))
+
+        report["locations"][location_name] = {
             "path": str(location_path),
             "exists": location_path.exists(),
-            "file_count": 0,
-            "sample_files": [],
+            "file_count": len(file_names),
+            "sample_files": [name.rsplit("/", 1)[-1] for name in file_names[:5]],  # First 5 files
+            "manifest": str(manifest.path) if manifest.updated_at else None,
+            "synced_at": manifest.updated_at,
         }
 
-        if location_path.exists():
-            files = list(location_path.rglob("*"))
-            file_list = [f for f in files if f.is_file()]
-            location_info["file_count"] = len(file_list)
-            location_info["sample_files"] = [str(f.name) for f in file_list[:5]]  # First 5 files
-
-        report["locations"][location_name] = location_info
+    report["source_file_count"] = len(source_files)
 
     # Generate summary
     total_locations = len(locations_to_check)
@@ -434,20 +600,69 @@ def debug_jupyterlite_files() -> dict:
     return report
 
 
+def _static_mirrors() -> list[dict]:
+    """Source -> static/ mirrors maintained at startup."""
+    return [
+        {
+            "label": "PM files (static/pm)",
+            "emoji": "🌍",
+            "src": settings.base_dir / "pms",
+            "dest": settings.static_dir / "pm",
+        },
+        {
+            "label": "Sujets0 generators",
+            "emoji": "📝",
+            "src": settings.base_dir / "src" / "sujets0" / "generators",
+            "dest": settings.static_dir / "sujets0" / "generators",
+            "recursive": False,
+            "include": lambda path: path.suffix == ".py",
+        },
+        {
+            "label": "Official curriculums",
+            "emoji": "📝",
+            "src": settings.base_dir / "official_curriculums",
+            "dest": settings.static_dir / "official_curriculums",
+        },
+    ]
+
+
+async def mirror_static_trees() -> list:
+    """
+    Incrementally mirror source trees into src/static.
+    Unchanged files are skipped, orphans removed, and the mirrors run concurrently.
+    """
+
+    def run(mirror: dict):
+        try:
+            stats = sync_tree(
+                mirror["src"],
+                mirror["dest"],
+                label=mirror["label"],
+                recursive=mirror.get("recursive", True),
+                include=mirror.get("include"),
+                link=settings.static_mirror_link,
+                max_workers=settings.static_mirror_workers,
+            )
+            log_sync_stats(stats, mirror["emoji"])
+            return stats
+        except Exception as e:
+            logger.warning(f"⚠️ Failed mirroring {mirror['label']}: {e}")
+            return None
+
+    results = await asyncio.gather(
+        *(asyncio.to_thread(run, mirror) for mirror in _static_mirrors())
+    )
+    return [stats for stats in results if stats is not None]
+
+
 @asynccontextmanager
 async def lifespan_manager(app: FastAPI):
     logger.info(f"🚀 Starting Maths.pm ({settings.domain_config.domain_url or 'localhost'})")
     if settings.jupyterlite_enabled:
-        await async_build_jupyterlite()
-        # After JupyterLite is built, mirror files-for-lite fully and then ensure notebooks
-        try:
-            mirror_files_for_lite_into_output()
-        except Exception as e:
-            logger.warning(f"⚠️ Failed to mirror files-for-lite into JupyterLite: {e}")
-        try:
-            preload_notebooks_into_jupyterlite_output()
-        except Exception as e:
-            logger.warning(f"⚠️ Failed to preload notebooks into JupyterLite: {e}")
+        # Runs in the background: the server is ready while JupyterLite builds
+        start_jupyterlite_build(force_rebuild=settings.jupyterlite_force_rebuild)
+    else:
+        jupyterlite_state.status = "disabled"
 
     is_ci = os.environ.get("CI") == "true" or os.environ.get("GITHUB_ACTIONS") == "true"
     should_download = os.environ.get("DOWNLOAD_SAFARI_CSS", "").lower() in ["true", "1", "yes"]
@@ -471,81 +686,27 @@ async def lifespan_manager(app: FastAPI):
     #     except Exception as e:
     #         logger.warning(f"⚠️  Safari CSS check/download failed (non-critical): {e}")
 
-    try:
-        pms_dir = settings.base_dir / "pms"
-        static_pm_dir = settings.static_dir / "pm"
-        if pms_dir.exists():
-            if static_pm_dir.exists():
-                rmtree(static_pm_dir)
-            static_pm_dir.mkdir(parents=True, exist_ok=True)
-            for root, dirs, files in os.walk(pms_dir):
-                rel_root = os.path.relpath(root, pms_dir)
-                dest_root = static_pm_dir / rel_root if rel_root != "." else static_pm_dir
-                dest_root.mkdir(parents=True, exist_ok=True)
-                for file_name in files:
-                    src_file = Path(root) / file_name
-                    dest_file = dest_root / file_name
-                    try:
-                        copy2(src_file, dest_file)
-                    except Exception as e:
-                        logger.warning(f"⚠️ Failed to copy {src_file} -> {dest_file}: {e}")
-            file_count = sum(1 for _, _, files in os.walk(static_pm_dir) for _ in files)
-            logger.info(f"🌍 PM files copied in static/pm/ ({file_count})")
-    except Exception as e:
-        logger.warning(f"⚠️ Failed copying PM files: {e}")
+    await mirror_static_trees()
 
-    try:
-        generators_dir = settings.base_dir / "src" / "sujets0" / "generators"
-        static_generators_dir = settings.static_dir / "sujets0" / "generators"
-        if generators_dir.exists():
-            if static_generators_dir.exists():
-                rmtree(static_generators_dir)
-            static_generators_dir.mkdir(parents=True, exist_ok=True)
-            for file_path in generators_dir.glob("*.py"):
-                if file_path.name != "__pycache__":
-                    try:
-                        dest_file = static_generators_dir / file_path.name
-                        copy2(file_path, dest_file)
-                    except Exception as e:
-                        logger.warning(f"⚠️ Failed to copy {file_path} -> {dest_file}: {e}")
-            file_count = len(list(static_generators_dir.glob("*.py")))
-            logger.info(f"📝  {file_count}  Sujets0 generators ready")
-        else:
-            logger.warning(f"⚠️ Generators directory not found: {generators_dir}")
-    except Exception as e:
-        logger.warning(f"⚠️ Failed copying sujets0 generators: {e}")
+    # Warm sujets0 generator workers (started from a fork server, not forked from here)
+    from ..sujets0.question_pool import question_pool
 
-    try:
-        official_curriculums_dir = settings.base_dir / "official_curriculums"
-        static_official_curriculums_dir = settings.static_dir / "official_curriculums"
-        os.makedirs(static_official_curriculums_dir, exist_ok=True)
-        for root, dirs, files in os.walk(official_curriculums_dir):
-            rel_root = os.path.relpath(root, official_curriculums_dir)
-            dest_root = (
-                static_official_curriculums_dir / rel_root
-                if rel_root != "."
-                else static_official_curriculums_dir
-            )
-            os.makedirs(dest_root, exist_ok=True)
-            for file_path in official_curriculums_dir.glob("**/*"):
-                if file_path.is_file():
-                    try:
-                        dest_file = static_official_curriculums_dir / file_path.relative_to(
-                            official_curriculums_dir
-                        )
-                        copy2(file_path, dest_file)
-                    except Exception as e:
-                        logger.warning(f"⚠️ Failed to copy {file_path} -> {dest_file}: {e}")
-        file_count = len(list(static_official_curriculums_dir.glob("**/*")))
-        logger.info(f"📝 Official curriculums ready ({file_count} files)")
-    except Exception as e:
-        logger.warning(f"⚠️ Failed copying official_curriculums: {e}")
+    question_pool.start()
+
+    # Curriculum YAML and generator summaries for /sujets0/originals/*
+    from ..sujets0.originals import originals_store
+
+    originals_store.summaries()
 
     logger.info(
-        "✅ All static files copied: JupyterLite (optional), PM, Sujets0, Official curriculums"
+        "✅ All static files synced: JupyterLite (optional), PM, Sujets0, Official curriculums"
     )
 
     try:
         yield
     finally:
+        task = jupyterlite_state.task
+        if task is not None and not task.done():
+            task.cancel()
+        question_pool.shutdown()
         logger.info("👋 Shutting down...")
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""
+Incremental directory mirroring for Maths.pm
+Keeps a destination tree in sync with a source tree without recopying everything.
+
+Used at startup to mirror pms/, the sujets0 generators and official_curriculums/
+into src/static, and by the exporters for dist/. Only files whose size/mtime (or
+content hash) differ are placed, orphans are deleted, and the work runs on a thread
+pool. Placement can share storage with the source instead of copying: a reflink
+(copy-on-write clone) where the filesystem supports it, else a hardlink, with a
+plain copy as the fallback across filesystems.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from shutil import copy2
+from typing import Callable, Dict, Optional, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:
+    # Not on Windows: reflinks are unavailable there
+    fcntl = None
+
+logger = logging.getLogger("maths_pm")
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# How a mirrored file is placed: "auto" tries reflink, then hardlink, then copy
+LINK_MODES = ("copy", "hardlink", "reflink", "auto")
+# ioctl(dest_fd, FICLONE, src_fd): Btrfs, XFS (reflink=1), bcachefs, OCFS2...
+FICLONE = 0x40049409
+
+# Digests keyed on (device, inode, size, mtime): a file (and every hardlink to it)
+# is hashed once per process however many mirrors and manifests look at it
+_digest_cache: Dict[Tuple[int, int, int, int], str] = {}
+_digest_lock = threading.Lock()
+
+
+class SyncStats:
+    """Counters collected while mirroring one tree."""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.copied = 0
+        self.linked = 0
+        self.cloned = 0
+        self.unchanged = 0
+        self.deleted = 0
+        self.failed = 0
+        self.bytes_moved = 0
+        self.bytes_shared = 0
+        self.elapsed = 0.0
+
+    @property
+    def total_files(self) -> int:
+        return self.copied + self.linked + self.cloned + self.unchanged
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "label": self.label,
+            "copied": self.copied,
+            "linked": self.linked,
+            "cloned": self.cloned,
+            "unchanged": self.unchanged,
+            "deleted": self.deleted,
+            "failed": self.failed,
+            "bytes_moved": self.bytes_moved,
+            "bytes_shared": self.bytes_shared,
+            "elapsed": round(self.elapsed, 3),
+        }
+
+    def __repr__(self):
+        return (
+            f"SyncStats(label='{self.label}', copied={self.copied}, linked={self.linked}, "
+            f"cloned={self.cloned}, "
+            f"unchanged={self.unchanged}, deleted={self.deleted}, failed={self.failed})"
+        )
+
+
+def format_bytes(size: int) -> str:
+    """Human readable byte count for log lines."""
+    value = float(size)
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024 or unit == "GB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{size} B"
+
+
+def file_digest(path: Path, stat: Optional[os.stat_result] = None) -> str:
+    """SHA-256 of a file, read in chunks (cached while the file is unchanged)."""
+    stat = stat or os.stat(path)
+    key = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    cached = _digest_cache.get(key)
+    if cached is not None:
+        return cached
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    value = digest.hexdigest()
+    with _digest_lock:
+        _digest_cache[key] = value
+    return value
+
+
+def scan_tree(
+    root: Path, recursive: bool = True, include: Optional[Callable[[Path], bool]] = None
+) -> Dict[str, os.stat_result]:
+    """Map POSIX relative paths to stat results for every regular file under root."""
+    entries: Dict[str, os.stat_result] = {}
+    if not root.is_dir():
+        return entries
+
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        with os.scandir(current) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive and entry.name != "__pycache__":
+                        stack.append(Path(entry.path))
+                    continue
+                if not entry.is_file():
+                    continue
+                path = Path(entry.path)
+                if include is not None and not include(path):
+                    continue
+                entries[path.relative_to(root).as_posix()] = entry.stat()
+    return entries
+
+
+def _is_up_to_date(
+    src_path: Path, src_stat: os.stat_result, dest_path: Path, dest_stat: os.stat_result, compare: str
+) -> bool:
+    if src_stat.st_ino == dest_stat.st_ino and src_stat.st_dev == dest_stat.st_dev:
+        return True
+    if src_stat.st_size != dest_stat.st_size:
+        return False
+    if src_stat.st_mtime_ns == dest_stat.st_mtime_ns:
+        return True
+    if compare == "hash" and file_digest(src_path, src_stat) == file_digest(dest_path, dest_stat):
+        # Same bytes, only the timestamp drifted: realign it so the next scan is cheap
+        os.utime(dest_path, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        return True
+    return False
+
+
+def link_mode(link: Union[bool, str]) -> str:
+    """Normalize a `link` argument: True/False are "hardlink"/"copy"."""
+    if link is True:
+        return "hardlink"
+    if not link:
+        return "copy"
+    if link not in LINK_MODES:
+        raise ValueError(f"Unknown link mode {link!r}, expected one of {LINK_MODES}")
+    return link
+
+
+def _reflink(src_path: Path, dest_path: Path) -> bool:
+    if fcntl is None:
+        return False
+    try:
+        with open(src_path, "rb") as src, open(dest_path, "wb") as dest:
+            fcntl.ioctl(dest.fileno(), FICLONE, src.fileno())
+    except OSError:
+        dest_path.unlink(missing_ok=True)
+        return False
+    # Same metadata as copy2
+    st = os.stat(src_path)
+    os.utime(dest_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.chmod(dest_path, st.st_mode & 0o7777)
+    return True
+
+
+def place_file(src_path: Path, dest_path: Path, link: Union[bool, str] = "copy") -> str:
+    """Put src at dest atomically. Returns "cloned", "linked" or "copied".
+
+    Hardlinked files share their inode with the source: whoever rewrites dest must
+    replace it (write_atomic), never write into it.
+    """
+    mode = link_mode(link)
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = dest_path.with_name(f".{dest_path.name}.sync-tmp")
+    tmp_path.unlink(missing_ok=True)
+    if mode in ("reflink", "auto") and _reflink(src_path, tmp_path):
+        os.replace(tmp_path, dest_path)
+        return "cloned"
+    if mode in ("hardlink", "auto"):
+        try:
+            os.link(src_path, tmp_path)
+            os.replace(tmp_path, dest_path)
+            return "linked"
+        except OSError:
+            # Cross-device or unsupported filesystem: fall back to a plain copy
+            pass
+    copy2(src_path, tmp_path)
+    os.replace(tmp_path, dest_path)
+    return "copied"
+
+
+def write_atomic(path: Path, data: Union[bytes, str]) -> None:
+    """Replace a file's contents through a temporary file (safe for hardlinked outputs)."""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    if isinstance(data, str):
+        tmp_path.write_text(data, encoding="utf-8")
+    else:
+        tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def _prune_empty_dirs(root: Path) -> None:
+    for current, _, _ in os.walk(root, topdown=False):
+        if current == str(root):
+            continue
+        try:
+            if not os.listdir(current):
+                os.rmdir(current)
+        except OSError:
+            pass
+
+
+def sync_tree(
+    src: Path,
+    dest: Path,
+    label: str,
+    recursive: bool = True,
+    include: Optional[Callable[[Path], bool]] = None,
+    compare: str = "mtime",
+    delete_orphans: bool = True,
+    keep: Optional[Callable[[str], bool]] = None,
+    link: Union[bool, str] = False,
+    max_workers: Optional[int] = None,
+) -> SyncStats:
+    """Mirror `src` into `dest`, touching only what changed.
+
+    Args:
+        src: Source directory
+        dest: Destination directory (created if missing)
+        label: Name used in log lines
+        recursive: Descend into sub-directories
+        include: Optional predicate selecting which source files are mirrored
+        compare: "mtime" (size + mtime) or "hash" (fall back to SHA-256 when mtimes differ)
+        delete_orphans: Remove destination files that no longer exist in the source
+        keep: Optional predicate on relative paths: orphans it accepts are left in place
+            (files generated in dest, e.g. precompressed siblings)
+        link: Placement mode (see LINK_MODES); True means "hardlink". Files that cannot
+            be reflinked or hardlinked (other filesystem) are copied
+        max_workers: Thread pool size for the copies
+
+    Returns:
+        SyncStats with the counters and the elapsed time
+    """
+    stats = SyncStats(label)
+    start = time.perf_counter()
+
+    if not src.is_dir():
+        logger.warning(f"⚠️ {label}: source directory not found: {src}")
+        return stats
+
+    dest.mkdir(parents=True, exist_ok=True)
+    src_entries = scan_tree(src, recursive=recursive, include=include)
+    dest_entries = scan_tree(dest, recursive=recursive)
+
+    pending = []
+    for rel_path, src_stat in src_entries.items():
+        dest_stat = dest_entries.get(rel_path)
+        src_path = src / rel_path
+        dest_path = dest / rel_path
+        try:
+            if dest_stat is not None and _is_up_to_date(
+                src_path, src_stat, dest_path, dest_stat, compare
+            ):
+                stats.unchanged += 1
+                continue
+        except OSError as e:
+            logger.debug(f"Compare failed for {src_path}: {e}")
+        pending.append((src_path, dest_path, src_stat.st_size))
+
+    def place(item):
+        src_path, dest_path, size = item
+        try:
+            return place_file(src_path, dest_path, link), size
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to copy {src_path} -> {dest_path}: {e}")
+            return "failed", 0
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for outcome, size in pool.map(place, pending):
+                if outcome == "failed":
+                    stats.failed += 1
+                elif outcome == "linked":
+                    stats.linked += 1
+                    stats.bytes_shared += size
+                elif outcome == "cloned":
+                    stats.cloned += 1
+                    stats.bytes_shared += size
+                else:
+                    stats.copied += 1
+                    stats.bytes_moved += size
+
+    if delete_orphans:
+        for rel_path in dest_entries.keys() - src_entries.keys():
+            if keep is not None and keep(rel_path):
+                continue
+            try:
+                (dest / rel_path).unlink()
+                stats.deleted += 1
+            except OSError as e:
+                logger.warning(f"⚠️ Failed to remove orphan {dest / rel_path}: {e}")
+        if stats.deleted:
+            _prune_empty_dirs(dest)
+
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def log_sync_stats(stats: SyncStats, emoji: str = "🔁") -> None:
+    """One summary line per mirror: what moved, how much, how long."""
+    logger.info(
+        f"{emoji} {stats.label}: {stats.total_files} files "
+        f"({stats.copied} copied, {stats.linked} linked, {stats.cloned} reflinked, "
+        f"{stats.unchanged} unchanged, {stats.deleted} removed) - "
+        f"{format_bytes(stats.bytes_moved)} copied, {format_bytes(stats.bytes_shared)} shared "
+        f"in {stats.elapsed:.2f}s"
+    )
+    if stats.failed:
+        logger.warning(f"⚠️ {stats.label}: {stats.failed} files failed to sync")
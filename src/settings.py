@@ -139,6 +139,32 @@ class Settings(BaseSettings):
     jupyterlite_auto_install: bool = Field(
         default=True, description="Automatically install JupyterLite if missing"
     )
+    jupyterlite_force_rebuild: bool = Field(
+        default=False, description="Ignore the input-hash cache and rebuild JupyterLite at startup"
+    )
+
+    # Startup mirroring of pms/, generators and official_curriculums into static/
+    static_mirror_link: str = Field(
+        default="auto",
+        description=(
+            "How mirrored files are placed: auto (reflink, else hardlink, else copy), "
+            "reflink, hardlink or copy"
+        ),
+    )
+    static_mirror_workers: int = Field(
+        default=8, description="Thread pool size used to mirror static trees at startup"
+    )
+
+    # Sujets0 on-demand question generation (/sujets0/api/question)
+    sujets0_question_workers: int = Field(
+        default=2, description="Warm generator worker processes (0 disables the endpoint)"
+    )
+    sujets0_question_cache_size: int = Field(
+        default=4096, description="Generated questions kept in the LRU cache"
+    )
+    sujets0_question_timeout: float = Field(
+        default=10.0, description="Seconds a generator may run before its worker is killed"
+    )
 
     # GitHub integration for PM-from-URL functionality
     github_token: Optional[str] = Field(
@@ -64,6 +64,8 @@ export class Answer {
 export class Question {
     constructor(data = {}) {
         this.generator = data.generator || null;
+        // Seed this question ran on (server class sets: may differ from the copy's)
+        this.seed = data.seed ?? null;
         this.success = data.success || false;
         this.error = data.error || null;
         this.statement = data.statement || null;
@@ -86,6 +88,7 @@ export class Question {
         // Base question properties
         const question = new Question({
             generator: generatorName.replace('.py', ''),
+            seed: rawData.seed,
             success: rawData.success,
             error: rawData.error,
             statement: rawData.statement,
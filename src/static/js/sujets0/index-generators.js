@@ -9,6 +9,7 @@ import { displayStudentResults } from "./index-results.js";
 import generationResults, { StudentExerciseSet } from "./index-data-model.js";
 import { convertAllGraphsToPng } from "./index-svg-converter.js";
 import { buildPCAGraph } from "./index-graphs.js";
+import { isServerGenerationAvailable, streamClassSet } from "./index-server.js";
 
 // Export the generationResults for backward compatibility
 export { generationResults };
@@ -24,12 +25,239 @@ export function selectRandomItems(array, n) {
   return shuffled.slice(0, n);
 }
 
+/**
+ * Attach the graph a generator result needs (SVG and graph dictionary) for papyrus
+ * @param {string} generator - Generator file name
+ * @param {Object} result - Result of executeGeneratorWithSeed (or a server question)
+ * @param {number} studentNum - Student number, for logging
+ */
+async function attachGraph(generator, result, studentNum) {
+  if (generator === "spe_sujet1_auto_07_question.py") {
+    //console.log("result.data.components")
+    //console.log("result.data.components")
+    //console.log("result.data.components")
+    //console.log("result.data.components")
+
+    const Y_LABEL_FOR_HORIZONTAL_LINE = parseInt(
+      result.data.components.n
+    );
+    const svgAndDict = await buildPCAGraph("q7_small", {
+      Y_LABEL_FOR_HORIZONTAL_LINE: Y_LABEL_FOR_HORIZONTAL_LINE, // Slope
+    });
+
+    const graphSvg = svgAndDict.svg;
+    const graphDict = svgAndDict.graphDict;
+
+    result.graphSvg = graphSvg;
+    result.graphDict = graphDict;
+
+    console.log(
+      "💫💫💫💫",
+      `graph-${studentNum}-${generator}`,
+      graphDict
+    );
+  } else if (generator === "spe_sujet1_auto_08_question.py") {
+    console.log(
+      "💫💫💫💫",
+      `graph-${studentNum}-${generator}`,
+      result.data.components_evaluated
+    );
+
+    const A_FLOAT_FOR_AFFINE_LINE = parseFloat(
+      result.data.components_evaluated.a
+    );
+    const B_FLOAT_FOR_AFFINE_LINE = parseFloat(
+      result.data.components_evaluated.b
+    );
+    const svgAndDict = await buildPCAGraph("q8_small", {
+      A_FLOAT_FOR_AFFINE_LINE: A_FLOAT_FOR_AFFINE_LINE,
+      B_FLOAT_FOR_AFFINE_LINE: B_FLOAT_FOR_AFFINE_LINE,
+    });
+
+    const graphSvg = svgAndDict.svg;
+    const graphDict = svgAndDict.graphDict;
+
+    result.graphSvg = graphSvg;
+    result.graphDict = graphDict;
+
+    console.log(
+      "💫💫💫💫",
+      `graph-${studentNum}-${generator}`,
+      graphDict
+    );
+  } else if (generator === "spe_sujet1_auto_10_question.py") {
+    console.log(
+      "💫💫💫💫",
+      `graph-${studentNum}-${generator}`,
+      result.data.components
+    );
+
+    // Very bad naming discrepancy in graph # TODO sel
+    // in spe_sujet1_auto_10_question.py, c is the ordonnée à l'origine
+    // y=ax^2 + c avec |a| = 1 et c réel
+    // A_SHIFT_MAGNITUDE est en fait la valeur absolue de c .....
+    const aFromParabola = parseInt(result.data.components.a);
+    const cFromParabola = parseInt(result.data.components.c);
+
+
+    let PARABOLA_GRAPH_KEY;
+    // Because each graph then deal with it for displaying the minus if necessary
+    let A_SHIFT_MAGNITUDE = Math.abs(cFromParabola);
+
+    if (aFromParabola > 0) {
+      // A_SHIFT_MAGNITUDE = cFromParabola;
+
+      if (cFromParabola > 0) {
+        // p for plus
+        PARABOLA_GRAPH_KEY = "parabola_s1_ap";
+      } else if (cFromParabola < 0) {
+        // m for minus
+        PARABOLA_GRAPH_KEY = "parabola_s1_am";
+      } else if (cFromParabola === 0) {
+        // 0 for zero
+        PARABOLA_GRAPH_KEY = "parabola_s1_a0";
+      } else {
+        throw new Error(`cFromParabola ${cFromParabola} is not valid`);
+      }
+
+      const svgAndDict = await buildPCAGraph(PARABOLA_GRAPH_KEY, {
+        A_SHIFT_MAGNITUDE: A_SHIFT_MAGNITUDE,
+      });
+
+      const graphSvg = svgAndDict.svg;
+      const graphDict = svgAndDict.graphDict;
+
+      result.graphSvg = graphSvg;
+      result.graphDict = graphDict;
+
+      console.log(
+        "💫💫💫💫",
+        `graph-${studentNum}-${generator}`,
+        graphDict
+      );
+
+    } else {
+      // A_SHIFT_MAGNITUDE = -cFromParabola;
+
+      if (cFromParabola > 0) {
+        // p for plus
+        PARABOLA_GRAPH_KEY = "parabola_sm1_ap";
+      } else if (cFromParabola < 0) {
+        // m for minus  
+        PARABOLA_GRAPH_KEY = "parabola_sm1_am";
+      } else if (cFromParabola === 0) {
+        // 0 for zero
+        PARABOLA_GRAPH_KEY = "parabola_sm1_a0";
+      } else {
+        throw new Error(`cFromParabola ${cFromParabola} is not valid`);
+      }   
+
+      const svgAndDict = await buildPCAGraph(PARABOLA_GRAPH_KEY, {
+        A_SHIFT_MAGNITUDE: A_SHIFT_MAGNITUDE,
+      });
+
+      const graphSvg = svgAndDict.svg;
+      const graphDict = svgAndDict.graphDict;
+
+      result.graphSvg = graphSvg;
+      result.graphDict = graphDict;
+
+      console.log(
+        "💫💫💫💫",
+        `graph-${studentNum}-${generator}`,
+        graphDict
+      );
+    }
+
+    // const A_SHIFT_MAGNITUDE
+  }
+
+  else if (generator === "spe_sujet1_auto_11_question.py") {
+    let caseFromGenerator = result.data.components.case;
+    let svgAndDict;
+
+    if (caseFromGenerator === "case_a") {
+       svgAndDict = await buildPCAGraph("q11_case_a_small", {});
+    } else if (caseFromGenerator === "case_b") {
+       svgAndDict = await buildPCAGraph("q11_case_b_small", {});
+    } else if (caseFromGenerator === "case_c") {
+       svgAndDict = await buildPCAGraph("q11_case_c_small", {});
+    } else {
+      throw new Error(`caseFromGenerator ${caseFromGenerator} is not valid`);
+    }
+    const graphSvg = svgAndDict.svg;
+    const graphDict = svgAndDict.graphDict;
+
+    result.graphSvg = graphSvg;
+    result.graphDict = graphDict;
+
+    console.log(
+      "💫💫💫💫",
+      `graph-${studentNum}-${generator}`,
+      graphDict
+    );
+  }
+}
+
+/**
+ * Generate the class set on the server (/sujets0/api/class-set), one student at a time
+ * as the stream delivers them; graphs are still built here
+ * @returns {Promise<boolean>} false if the server failed (the caller falls back to Nagini)
+ */
+async function generateClassSetOnServer(config, selectedGenerators, progressCallback) {
+  const generationProgress = document.getElementById("generation-progress");
+  const generationTime = document.getElementById("generation-time");
+
+  try {
+    for await (const message of streamClassSet(config, selectedGenerators)) {
+      if (message.type !== "student") continue;
+
+      const { id, seed, questions } = message.student;
+      for (let index = 0; index < questions.length; index++) {
+        try {
+          await attachGraph(selectedGenerators[index], questions[index], id);
+        } catch (error) {
+          console.error(error);
+          questions[index] = {
+            success: false,
+            seed: questions[index].seed,
+            error: questions[index].error || error.message,
+            stdout: "",
+            stderr: "",
+          };
+        }
+      }
+
+      generationResults.addStudent(
+        StudentExerciseSet.fromGeneratorResults(id, seed, questions, selectedGenerators)
+      );
+
+      if (generationProgress) {
+        generationProgress.value = id;
+      }
+      if (progressCallback) {
+        const totalProgress = config.nbStudents * config.nbQuestions;
+        progressCallback(id * config.nbQuestions, totalProgress, `Étudiant ${id}/${config.nbStudents}`);
+      }
+      if (generationTime) {
+        const elapsedTime = (performance.now() - generationResults.startTime) / 1000;
+        generationTime.textContent = `${elapsedTime.toFixed(1)}s`;
+      }
+    }
+    return true;
+  } catch (error) {
+    console.warn("⚠️ Server generation failed, falling back to Nagini:", error);
+    generationResults.reset();
+    return false;
+  }
+}
+
 /**
  * Execute all generators with pagination
  */
 export async function executeAllGenerators(formData, progressCallback) {
-  // Check if Nagini is ready (indirectly)
-  if (!window.Nagini) {
+  // Check if Nagini is ready (indirectly), unless the server generates the copies
+  if (!window.Nagini && !(await isServerGenerationAvailable())) {
     // Display error in validation table
     const errorData = {
       copies: { count: "-", isValid: false },
@@ -200,227 +428,75 @@ export async function executeAllGenerators(formData, progressCallback) {
   resultsContainer.className = "mt-4";
   resultsContainer.innerHTML = ``;
 
-  // Process each student
-  for (let studentNum = 1; studentNum <= config.nbStudents; studentNum++) {
-    // const seed = studentNum; // Use student number as seed
-    const seed = Math.floor(Math.random() * 1_000); // Random seed
-    const questionResults = [];
-
-    // Update progress
-    const generationProgress = document.getElementById("generation-progress");
-    const generationTime = document.getElementById("generation-time");
-    if (generationProgress) {
-      generationProgress.value = studentNum - 1;
-    }
+  // Server-side class set when the backend offers it, else one Nagini run per question
+  let generatedOnServer = false;
+  if (await isServerGenerationAvailable()) {
+    generatedOnServer = await generateClassSetOnServer(
+      config,
+      selectedGenerators,
+      progressCallback
+    );
+  }
+
+  if (!generatedOnServer) {
+    // Process each student
+    for (let studentNum = 1; studentNum <= config.nbStudents; studentNum++) {
+      // const seed = studentNum; // Use student number as seed
+      const seed = Math.floor(Math.random() * 1_000); // Random seed
+      const questionResults = [];
+
+      // Update progress
+      const generationProgress = document.getElementById("generation-progress");
+      const generationTime = document.getElementById("generation-time");
+      if (generationProgress) {
+        generationProgress.value = studentNum - 1;
+      }
     
-    // Call progress callback if provided (for refactored version)
-    if (progressCallback) {
-      const currentProgress = (studentNum - 1) * config.nbQuestions;
-      const totalProgress = config.nbStudents * config.nbQuestions;
-      progressCallback(currentProgress, totalProgress, `Étudiant ${studentNum}/${config.nbStudents}`);
-    }
+      // Call progress callback if provided (for refactored version)
+      if (progressCallback) {
+        const currentProgress = (studentNum - 1) * config.nbQuestions;
+        const totalProgress = config.nbStudents * config.nbQuestions;
+        progressCallback(currentProgress, totalProgress, `Étudiant ${studentNum}/${config.nbStudents}`);
+      }
     
-    // Mettre à jour le temps d'exécution
-    if (generationTime) {
-      const elapsedTime = (performance.now() - generationResults.startTime) / 1000;
-      generationTime.textContent = `${elapsedTime.toFixed(1)}s`;
-    }
+      // Mettre à jour le temps d'exécution
+      if (generationTime) {
+        const elapsedTime = (performance.now() - generationResults.startTime) / 1000;
+        generationTime.textContent = `${elapsedTime.toFixed(1)}s`;
+      }
 
-    // Execute each selected generator for this student
-    for (const generator of selectedGenerators) {
-      try {
-        const result = await executeGeneratorWithSeed(generator, seed);
-        // TODO : always validate type of the argument
-
-        if (generator === "spe_sujet1_auto_07_question.py") {
-          //console.log("result.data.components")
-          //console.log("result.data.components")
-          //console.log("result.data.components")
-          //console.log("result.data.components")
-
-          const Y_LABEL_FOR_HORIZONTAL_LINE = parseInt(
-            result.data.components.n
-          );
-          const svgAndDict = await buildPCAGraph("q7_small", {
-            Y_LABEL_FOR_HORIZONTAL_LINE: Y_LABEL_FOR_HORIZONTAL_LINE, // Slope
-          });
+      // Execute each selected generator for this student
+      for (const generator of selectedGenerators) {
+        try {
+          const result = await executeGeneratorWithSeed(generator, seed);
+          // TODO : always validate type of the argument
 
-          const graphSvg = svgAndDict.svg;
-          const graphDict = svgAndDict.graphDict;
-
-          result.graphSvg = graphSvg;
-          result.graphDict = graphDict;
-
-          console.log(
-            "💫💫💫💫",
-            `graph-${studentNum}-${generator}`,
-            graphDict
-          );
-        } else if (generator === "spe_sujet1_auto_08_question.py") {
-          console.log(
-            "💫💫💫💫",
-            `graph-${studentNum}-${generator}`,
-            result.data.components_evaluated
-          );
-
-          const A_FLOAT_FOR_AFFINE_LINE = parseFloat(
-            result.data.components_evaluated.a
-          );
-          const B_FLOAT_FOR_AFFINE_LINE = parseFloat(
-            result.data.components_evaluated.b
-          );
-          const svgAndDict = await buildPCAGraph("q8_small", {
-            A_FLOAT_FOR_AFFINE_LINE: A_FLOAT_FOR_AFFINE_LINE,
-            B_FLOAT_FOR_AFFINE_LINE: B_FLOAT_FOR_AFFINE_LINE,
+          await attachGraph(generator, result, studentNum);
+        
+          questionResults.push(result);
+          // Store graph dictionary as data attribute for access if needed
+          // container.dataset.graphDict = JSON.stringify(result.graphDict);
+        } catch (error) {
+          console.error(error);
+          questionResults.push({
+            success: false,
+            error: error.message,
+            stdout: "",
+            stderr: "",
           });
-
-          const graphSvg = svgAndDict.svg;
-          const graphDict = svgAndDict.graphDict;
-
-          result.graphSvg = graphSvg;
-          result.graphDict = graphDict;
-
-          console.log(
-            "💫💫💫💫",
-            `graph-${studentNum}-${generator}`,
-            graphDict
-          );
-        } else if (generator === "spe_sujet1_auto_10_question.py") {
-          console.log(
-            "💫💫💫💫",
-            `graph-${studentNum}-${generator}`,
-            result.data.components
-          );
-
-          // Very bad naming discrepancy in graph # TODO sel
-          // in spe_sujet1_auto_10_question.py, c is the ordonnée à l'origine
-          // y=ax^2 + c avec |a| = 1 et c réel
-          // A_SHIFT_MAGNITUDE est en fait la valeur absolue de c .....
-          const aFromParabola = parseInt(result.data.components.a);
-          const cFromParabola = parseInt(result.data.components.c);
-
-
-          let PARABOLA_GRAPH_KEY;
-          // Because each graph then deal with it for displaying the minus if necessary
-          let A_SHIFT_MAGNITUDE = Math.abs(cFromParabola);
-
-          if (aFromParabola > 0) {
-            // A_SHIFT_MAGNITUDE = cFromParabola;
-
-            if (cFromParabola > 0) {
-              // p for plus
-              PARABOLA_GRAPH_KEY = "parabola_s1_ap";
-            } else if (cFromParabola < 0) {
-              // m for minus
-              PARABOLA_GRAPH_KEY = "parabola_s1_am";
-            } else if (cFromParabola === 0) {
-              // 0 for zero
-              PARABOLA_GRAPH_KEY = "parabola_s1_a0";
-            } else {
-              throw new Error(`cFromParabola ${cFromParabola} is not valid`);
-            }
-
-            const svgAndDict = await buildPCAGraph(PARABOLA_GRAPH_KEY, {
-              A_SHIFT_MAGNITUDE: A_SHIFT_MAGNITUDE,
-            });
-
-            const graphSvg = svgAndDict.svg;
-            const graphDict = svgAndDict.graphDict;
-
-            result.graphSvg = graphSvg;
-            result.graphDict = graphDict;
-
-            console.log(
-              "💫💫💫💫",
-              `graph-${studentNum}-${generator}`,
-              graphDict
-            );
-
-          } else {
-            // A_SHIFT_MAGNITUDE = -cFromParabola;
-
-            if (cFromParabola > 0) {
-              // p for plus
-              PARABOLA_GRAPH_KEY = "parabola_sm1_ap";
-            } else if (cFromParabola < 0) {
-              // m for minus  
-              PARABOLA_GRAPH_KEY = "parabola_sm1_am";
-            } else if (cFromParabola === 0) {
-              // 0 for zero
-              PARABOLA_GRAPH_KEY = "parabola_sm1_a0";
-            } else {
-              throw new Error(`cFromParabola ${cFromParabola} is not valid`);
-            }   
-
-            const svgAndDict = await buildPCAGraph(PARABOLA_GRAPH_KEY, {
-              A_SHIFT_MAGNITUDE: A_SHIFT_MAGNITUDE,
-            });
-
-            const graphSvg = svgAndDict.svg;
-            const graphDict = svgAndDict.graphDict;
-
-            result.graphSvg = graphSvg;
-            result.graphDict = graphDict;
-
-            console.log(
-              "💫💫💫💫",
-              `graph-${studentNum}-${generator}`,
-              graphDict
-            );
-          }
-
-          // const A_SHIFT_MAGNITUDE
-        }
-
-        else if (generator === "spe_sujet1_auto_11_question.py") {
-          let caseFromGenerator = result.data.components.case;
-          let svgAndDict;
-
-          if (caseFromGenerator === "case_a") {
-             svgAndDict = await buildPCAGraph("q11_case_a_small", {});
-          } else if (caseFromGenerator === "case_b") {
-             svgAndDict = await buildPCAGraph("q11_case_b_small", {});
-          } else if (caseFromGenerator === "case_c") {
-             svgAndDict = await buildPCAGraph("q11_case_c_small", {});
-          } else {
-            throw new Error(`caseFromGenerator ${caseFromGenerator} is not valid`);
-          }
-          const graphSvg = svgAndDict.svg;
-          const graphDict = svgAndDict.graphDict;
-
-          result.graphSvg = graphSvg;
-          result.graphDict = graphDict;
-
-          console.log(
-            "💫💫💫💫",
-            `graph-${studentNum}-${generator}`,
-            graphDict
-          );
         }
-        
-        questionResults.push(result);
-        // Store graph dictionary as data attribute for access if needed
-        // container.dataset.graphDict = JSON.stringify(result.graphDict);
-      } catch (error) {
-        console.error(error);
-        questionResults.push({
-          success: false,
-          error: error.message,
-          stdout: "",
-          stderr: "",
-        });
       }
-    }
 
-    // Create and store student exercise set using our data model
-    const studentExerciseSet = StudentExerciseSet.fromGeneratorResults(
-      studentNum,
-      seed,
-      questionResults,
-      selectedGenerators
-    );
+      // Create and store student exercise set using our data model
+      const studentExerciseSet = StudentExerciseSet.fromGeneratorResults(
+        studentNum,
+        seed,
+        questionResults,
+        selectedGenerators
+      );
 
-    generationResults.addStudent(studentExerciseSet);
+      generationResults.addStudent(studentExerciseSet);
+    }
   }
 
   // Update progress status to complete
@@ -1287,8 +1287,8 @@ function generateTeacherManifestURL() {
                     console.error('Error getting simplified answers:', e);
                 }
                 
-                // Add question data [answer, simplified, generator]
-                studentData[2].push([answer, simplified, generator]);
+                // Add question data [answer, simplified, generator, seed]
+                studentData[2].push([answer, simplified, generator, question.seed ?? student.seed]);
             });
             
             manifest.data.push(studentData);
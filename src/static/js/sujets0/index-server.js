@@ -0,0 +1,78 @@
+/**
+ * Server Generation Module for Sujets0
+ * Generates class sets with the backend's warm generator pool (/sujets0/api/class-set)
+ * instead of one Pyodide execution per question. Static deployments have no backend:
+ * there everything keeps running in Nagini.
+ */
+
+let serverAvailable = null;
+
+/**
+ * Whether the backend can generate questions (checked once per page)
+ * @returns {Promise<boolean>} True if /sujets0/api/class-set can be used
+ */
+export async function isServerGenerationAvailable() {
+  if (serverAvailable !== null) {
+    return serverAvailable;
+  }
+
+  // GitHub Pages and other static copies: no API behind the pages
+  if (
+    window.location.hostname === "pointcarre-app.github.io" ||
+    window.location.pathname.startsWith("/maths.pm/")
+  ) {
+    serverAvailable = false;
+    return serverAvailable;
+  }
+
+  try {
+    const response = await fetch("/sujets0/api/question/stats");
+    serverAvailable = response.ok && (await response.json()).enabled === true;
+  } catch (error) {
+    serverAvailable = false;
+  }
+  console.log(`🖥️ Server generation ${serverAvailable ? "available" : "unavailable"}`);
+  return serverAvailable;
+}
+
+/**
+ * Request a class set and yield the NDJSON messages as they arrive
+ * ({type: "start"}, one {type: "student", student: {id, seed, questions}} per copy,
+ * then {type: "done"})
+ * @param {Object} config - Generator configuration (nbStudents)
+ * @param {Array} selectedGenerators - Generator file names, in question order
+ */
+export async function* streamClassSet(config, selectedGenerators) {
+  const response = await fetch("/sujets0/api/class-set", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({
+      generators: selectedGenerators,
+      nbStudents: config.nbStudents,
+      baseSeed: Math.floor(Math.random() * 1_000_000),
+    }),
+  });
+  if (!response.ok) {
+    throw new Error(`Class set request failed: ${response.status}`);
+  }
+
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += value;
+
+    let newline;
+    while ((newline = buffer.indexOf("\n")) >= 0) {
+      const line = buffer.slice(0, newline).trim();
+      buffer = buffer.slice(newline + 1);
+      if (line) {
+        yield JSON.parse(line);
+      }
+    }
+  }
+  if (buffer.trim()) {
+    yield JSON.parse(buffer);
+  }
+}
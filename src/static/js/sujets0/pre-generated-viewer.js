@@ -88,7 +88,53 @@ function setupKatexRendering() {
 }
 
 /**
- * Load all questions from JSON files
+ * Parse a JSON-lines file
+ */
+async function fetchJsonLines(url) {
+    const response = await fetch(url);
+    if (!response.ok) {
+        throw new Error(`${url}: HTTP ${response.status}`);
+    }
+    const text = await response.text();
+    return text.split('\n').filter(line => line.trim()).map(line => JSON.parse(line));
+}
+
+/**
+ * Load the questions of one generator from its bundle.
+ * Debug captures (stdout, stderr, traceback) live in a sidecar, fetched only
+ * for generators with failures.
+ */
+async function loadGeneratorBundle(generator) {
+    const url = `${QUESTIONS_BASE_URL}${generator.bundle || `${generator.name}.jsonl`}`;
+    try {
+        const questions = await fetchJsonLines(url);
+        if (generator.failed > 0) {
+            try {
+                const debugBySeed = new Map();
+                for (const debug of await fetchJsonLines(url.replace(/\.jsonl$/, '.debug.jsonl'))) {
+                    debugBySeed.set(debug.seed, debug);
+                }
+                for (const question of questions) {
+                    Object.assign(question, debugBySeed.get(question.seed) || {});
+                }
+            } catch (e) {
+                console.warn(`No debug captures for ${generator.name}:`, e);
+            }
+        }
+        for (const question of questions) {
+            question.generator_name = generator.name;
+            question.generator_file = generator.file;
+            question.url = url;
+        }
+        return questions;
+    } catch (e) {
+        console.error(`Failed to load ${generator.name}:`, e);
+        return [];
+    }
+}
+
+/**
+ * Load all questions from the generator bundles
  */
 async function loadAllQuestions() {
     const btn = document.getElementById('load-all-btn');
@@ -105,26 +151,10 @@ async function loadAllQuestions() {
         allQuestions = [];
         const generators = QUESTIONS_INDEX.generators;
         
-        // Load questions from each generator
-        for (const generator of generators) {
-            // Load ALL questions (both successful and failed)
-            const totalQuestions = 100; // We always generate 100 questions per generator
-            for (let seed = 0; seed < totalQuestions; seed++) {
-                const url = `${QUESTIONS_BASE_URL}${generator.name}/${seed}.json`;
-                try {
-                    const response = await fetch(url);
-                    if (response.ok) {
-                        const question = await response.json();
-                        question.generator_name = generator.name;
-                        question.generator_file = generator.file;
-                        question.url = url;
-                        question.seed = seed; // Ensure seed is set
-                        allQuestions.push(question);
-                    }
-                } catch (e) {
-                    console.error(`Failed to load ${generator.name}/${seed}:`, e);
-                }
-            }
+        // Load every generator bundle (one JSON line per seed, successful and failed)
+        const bundles = await Promise.all(generators.map(loadGeneratorBundle));
+        for (const questions of bundles) {
+            allQuestions.push(...questions);
         }
         
         // Count successful and failed questions
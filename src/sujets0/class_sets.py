@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""
+Server-side class sets for sujets0
+A class set is what index-generators.js builds in the browser: nbStudents copies
+of the same questions, one seed per copy. Here every question of every copy is
+submitted to the warm question pool at once, and copies are streamed back in order
+as NDJSON, each shaped like a StudentExerciseSet (index-data-model.js) whose
+questions are executeGeneratorWithSeed results.
+
+Generators that repeat questions across seeds (unique_seeds.json) draw their seed
+from their distinct seeds instead, so two copies only share a question once every
+variant has been handed out. Each question carries the seed it actually ran on.
+"""
+
+import asyncio
+import json
+import random
+import time
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import AliasChoices, BaseModel, Field
+
+from .question_pool import MAX_SEED, QuestionPool
+
+MAX_STUDENTS = 200
+
+# The form sends "Spé." / "Gén."
+FILIERES = {"spe": "spe", "spé": "spe", "spé.": "spe", "gen": "gen", "gén": "gen", "gén.": "gen"}
+
+
+class ClassSetRequest(BaseModel):
+    """Same settings as the generator form (camelCase names accepted)."""
+
+    filiere: str = Field(default="spe", description="spe or gen")
+    sujet: int = Field(default=1, ge=1, description="Sujet number, picks <filiere>_sujet<n>_*")
+    generators: Optional[List[str]] = Field(
+        default=None, description="Explicit generator files (overrides filiere/sujet)"
+    )
+    nb_questions: Optional[int] = Field(
+        default=None, ge=1, validation_alias=AliasChoices("nb_questions", "nbQuestions")
+    )
+    nb_students: int = Field(
+        default=2,
+        ge=1,
+        le=MAX_STUDENTS,
+        validation_alias=AliasChoices("nb_students", "nbStudents", "nbEleves"),
+    )
+    base_seed: Optional[int] = Field(
+        default=None, ge=0, validation_alias=AliasChoices("base_seed", "baseSeed")
+    )
+
+
+def question_seed(seed: int, unique_seeds: Optional[List[int]]) -> int:
+    """Seed to run for a copy: its own, or one of the generator's distinct seeds."""
+    if not unique_seeds:
+        return seed
+    return unique_seeds[seed % len(unique_seeds)]
+
+
+def plan_class_set(
+    request: ClassSetRequest,
+    available: Dict[str, Path],
+    unique_seeds: Optional[Dict[str, List[int]]] = None,
+) -> Tuple[List[str], List[int], List[List[int]]]:
+    """Generators (names, in order), one seed per student and the seed of each of
+    their questions. ValueError if invalid."""
+    if request.generators:
+        names = [name[:-3] if name.endswith(".py") else name for name in request.generators]
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            raise ValueError(f"Unknown generators: {', '.join(unknown)}")
+    else:
+        filiere = FILIERES.get(request.filiere.strip().lower())
+        if filiere is None:
+            raise ValueError(f"Unknown filière {request.filiere!r} (expected spe or gen)")
+        prefix = f"{filiere}_sujet{request.sujet}_"
+        names = [name for name in available if name.startswith(prefix)]
+        if not names:
+            raise ValueError(f"No generators for {prefix}*")
+
+    base_seed = request.base_seed
+    if base_seed is None:
+        base_seed = random.randrange(MAX_SEED - request.nb_students)
+    if base_seed + request.nb_students - 1 > MAX_SEED:
+        raise ValueError(f"Seeds must stay below {MAX_SEED}")
+
+    if request.nb_questions is not None and request.nb_questions != len(names):
+        if request.nb_questions > len(names):
+            raise ValueError(f"Only {len(names)} generators available")
+        # Reproducible from the base seed, kept in sujet order
+        picked = set(random.Random(base_seed).sample(names, request.nb_questions))
+        names = [name for name in names if name in picked]
+
+    seeds = [base_seed + index for index in range(request.nb_students)]
+    unique_seeds = unique_seeds or {}
+    question_seeds = [
+        [question_seed(seed, unique_seeds.get(name)) for name in names] for seed in seeds
+    ]
+    return names, seeds, question_seeds
+
+
+def question_result(record: dict, seed: int) -> dict:
+    """A generated record in the shape of executeGeneratorWithSeed's result.
+
+    seed is the one the question ran on: with unique_seeds.json it is not the copy's.
+    """
+    if not record.get("success"):
+        return {"success": False, "seed": seed, "error": record.get("error") or "Execution failed"}
+    return {
+        "success": True,
+        "seed": seed,
+        "statement": record.get("statement") or record.get("question"),
+        "answer": record.get("answer"),
+        "data": record,
+    }
+
+
+async def _question(pool: QuestionPool, generator: str, seed: int) -> dict:
+    try:
+        record, _ = await pool.get(generator, seed)
+    except asyncio.TimeoutError:
+        return {"success": False, "seed": seed, "error": f"Timed out after {pool.timeout}s"}
+    except Exception as e:
+        return {"success": False, "seed": seed, "error": str(e)}
+    return question_result(record, seed)
+
+
+def _line(data: dict) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+async def stream_class_set(
+    pool: QuestionPool,
+    generators: List[str],
+    seeds: List[int],
+    question_seeds: List[List[int]],
+) -> AsyncIterator[str]:
+    """NDJSON lines: a "start" line, one "student" line per copy in order, then "done"."""
+    start = time.perf_counter()
+    files = [f"{name}.py" for name in generators]
+    yield _line(
+        {"type": "start", "generators": files, "students": len(seeds), "baseSeed": seeds[0]}
+    )
+
+    # Everything is queued up front; the pool runs as many as it has workers
+    students = [
+        asyncio.gather(*(_question(pool, name, seed) for name, seed in zip(generators, row)))
+        for row in question_seeds
+    ]
+    failed = 0
+    try:
+        for number, (seed, pending) in enumerate(zip(seeds, students), start=1):
+            questions = await pending
+            failed += sum(1 for question in questions if not question["success"])
+            yield _line(
+                {
+                    "type": "student",
+                    "done": number,
+                    "total": len(seeds),
+                    "student": {"id": number, "seed": seed, "questions": questions},
+                }
+            )
+    finally:
+        # Client gone: drop the copies nobody will read
+        for pending in students:
+            pending.cancel()
+
+    yield _line(
+        {
+            "type": "done",
+            "questions": len(seeds) * len(generators),
+            "failed": failed,
+            "elapsed_s": round(time.perf_counter() - start, 3),
+        }
+    )
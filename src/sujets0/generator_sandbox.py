@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Sandboxed generator runs for build_questions.py
+
+Generators are arbitrary code: a rejection-sampling loop that never ends or a
+runaway allocation must cost one seed, not the build. Seeds run in worker
+processes that the build can kill:
+
+- every seed has a wall-clock timeout; a worker past it is killed and replaced,
+  and the seed is recorded with error_type "Timeout"
+- workers run under an RLIMIT_AS cap (POSIX), so an allocation past it raises
+  MemoryError in the generator; a worker that dies anyway (OOM killer, segfault,
+  os._exit) gives error_type "WorkerCrashed". Where the platform refuses the cap,
+  workers warn once and run without it
+- workers are recycled after a number of seeds, so leaks do not pile up
+
+The remaining seeds of an interrupted task go back to the queue, to a fresh worker.
+Plain functions and classes only: imported by src/build_questions.py outside the app.
+"""
+
+import multiprocessing
+import sys
+import time
+import traceback
+from collections import deque
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, Tuple
+
+TIMEOUT_ERROR = "Timeout"
+CRASH_ERROR = "WorkerCrashed"
+
+
+def limit_memory(memory_mb: int) -> Optional[str]:
+    """Cap this process's address space (no-op for 0 or without `resource`).
+
+    Returns why the platform refused the cap (the process then runs without one),
+    None otherwise.
+    """
+    if memory_mb <= 0:
+        return None
+    try:
+        import resource
+    except ImportError:
+        return None
+    try:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        limit = memory_mb * 1024 * 1024
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    except (AttributeError, ValueError, OSError) as e:
+        # No RLIMIT_AS, or a platform that does not enforce it and rejects the call
+        return str(e) or type(e).__name__
+    return None
+
+
+def failed_record(generator_path: str, seed: int, error_type: str, error: str) -> dict:
+    """Per-seed result for a seed the worker could not report on itself."""
+    return {
+        "seed": seed,
+        "generator": Path(generator_path).stem,
+        "success": False,
+        "error": error,
+        "error_type": error_type,
+        "traceback": "",
+        "stdout": "",
+        "stderr": "",
+    }
+
+
+def _worker_main(conn, run, initializer, memory_mb: int, warn: bool = False) -> None:
+    """Worker loop: (generator path, seeds) in, one result per seed out."""
+    if initializer is not None:
+        initializer()
+    # After the imports: they may reserve more address space than a generator needs
+    error = limit_memory(memory_mb)
+    if error and warn:
+        print(
+            f"⚠️  Cannot cap worker memory at {memory_mb} MB ({error}): running without a cap",
+            file=sys.stderr,
+            flush=True,
+        )
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        generator_path, seeds = task
+        for seed in seeds:
+            try:
+                result = run(generator_path, seed)
+            except KeyboardInterrupt:
+                raise
+            except BaseException as e:
+                # sys.exit() in a generator, or a failure outside its try/except
+                result = failed_record(generator_path, seed, type(e).__name__, str(e))
+                result["traceback"] = traceback.format_exc()
+            conn.send(result)
+
+
+class SandboxWorker:
+    """One worker process, the task it runs and the deadline of its current seed."""
+
+    def __init__(self, run, initializer, memory_mb: int, warn: bool = False):
+        self.run = run
+        self.initializer = initializer
+        self.memory_mb = memory_mb
+        # Report a refused memory cap from this worker's first process only
+        self.warn = warn
+        self.process = None
+        self.conn = None
+        self.generator_path: Optional[str] = None
+        self.seeds: Deque[int] = deque()
+        self.deadline = 0.0
+        self.seeds_run = 0
+
+    @property
+    def busy(self) -> bool:
+        return bool(self.seeds)
+
+    def start(self) -> None:
+        context = multiprocessing.get_context()
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, self.run, self.initializer, self.memory_mb, self.warn),
+            daemon=True,
+        )
+        self.process.start()
+        self.warn = False
+        child_conn.close()
+        self.seeds_run = 0
+
+    def stop(self, kill: bool = False) -> Optional[int]:
+        """Stop the process (politely unless kill) and return its exit code."""
+        if self.process is None:
+            return None
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+        exitcode = self.process.exitcode
+        self.process = self.conn = None
+        return exitcode
+
+    def submit(self, generator_path: str, seeds: List[int], timeout: float) -> None:
+        self.generator_path = generator_path
+        self.seeds = deque(seeds)
+        self.reset_deadline(timeout)
+        self.conn.send((generator_path, seeds))
+
+    def reset_deadline(self, timeout: float) -> None:
+        """Deadline of the next seed (none for a timeout of 0)."""
+        self.deadline = time.monotonic() + timeout if timeout > 0 else float("inf")
+
+    def interrupt(self) -> Tuple[int, List[int], Optional[int]]:
+        """Kill the worker mid-task and start a fresh one.
+
+        Returns (seed it was running, seeds it had not reached, exit code).
+        """
+        seed = self.seeds.popleft()
+        remaining = list(self.seeds)
+        self.seeds.clear()
+        exitcode = self.stop(kill=True)
+        self.start()
+        return seed, remaining, exitcode
+
+
+def run_sandboxed(
+    tasks: Iterable[Tuple[str, List[int]]],
+    run: Callable[[str, int], dict],
+    jobs: int = 1,
+    timeout: float = 30.0,
+    memory_mb: int = 2048,
+    max_seeds_per_worker: int = 500,
+    initializer: Optional[Callable[[], None]] = None,
+    on_submit: Optional[Callable[[str, List[int]], None]] = None,
+) -> Iterator[Tuple[str, dict]]:
+    """Run (generator path, seeds) tasks on `jobs` sandboxed workers.
+
+    run(generator_path, seed) must be picklable (a module-level function) and
+    return the seed's result. Yields (generator path, result) as seeds finish,
+    one result for every seed of every task.
+    """
+    queue: Deque[Tuple[str, List[int]]] = deque(
+        (path, list(seeds)) for path, seeds in tasks if seeds
+    )
+    workers = [
+        SandboxWorker(run, initializer, memory_mb, warn=index == 0)
+        for index in range(max(1, jobs))
+    ]
+    try:
+        for worker in workers:
+            worker.start()
+
+        while queue or any(worker.busy for worker in workers):
+            for worker in workers:
+                if worker.busy or not queue:
+                    continue
+                if worker.seeds_run >= max_seeds_per_worker:
+                    worker.stop()
+                    worker.start()
+                path, seeds = queue.popleft()
+                if on_submit is not None:
+                    on_submit(path, seeds)
+                worker.submit(path, seeds, timeout)
+
+            busy = [worker for worker in workers if worker.busy]
+            next_deadline = min(worker.deadline for worker in busy)
+            ready = wait(
+                [worker.conn for worker in busy],
+                None
+                if next_deadline == float("inf")
+                else max(0.0, next_deadline - time.monotonic()),
+            )
+
+            for worker in busy:
+                if worker.conn in ready:
+                    try:
+                        result = worker.conn.recv()
+                    except (EOFError, OSError):
+                        seed, remaining, exitcode = worker.interrupt()
+                        yield worker.generator_path, failed_record(
+                            worker.generator_path,
+                            seed,
+                            CRASH_ERROR,
+                            f"Worker process died (exit code {exitcode})",
+                        )
+                        if remaining:
+                            queue.appendleft((worker.generator_path, remaining))
+                        continue
+                    worker.seeds.popleft()
+                    worker.seeds_run += 1
+                    worker.reset_deadline(timeout)
+                    yield worker.generator_path, result
+                elif time.monotonic() >= worker.deadline:
+                    seed, remaining, _ = worker.interrupt()
+                    yield worker.generator_path, failed_record(
+                        worker.generator_path, seed, TIMEOUT_ERROR, f"Exceeded {timeout}s"
+                    )
+                    if remaining:
+                        queue.appendleft((worker.generator_path, remaining))
+    finally:
+        # Interrupted (Ctrl-C, consumer gone): do not wait for running seeds
+        interrupted = any(worker.busy for worker in workers)
+        for worker in workers:
+            worker.stop(kill=interrupted)
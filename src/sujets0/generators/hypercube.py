@@ -193,15 +193,23 @@ This will enable comprehensive test coverage and parameter space exploration
 for all question generators.
 """
 
+import ast
+import builtins
+import math
+import random
+
 # TODO: Implement the actual parsing logic based on this analysis
 # This would involve AST parsing of each generate_components function
 # to extract the parameter generation patterns systematically.
 
 
-def parse_generate_components_functions():
+def parse_generate_components_functions(pattern="spe_sujet1_auto_*_question.py", verbose=True):
     """
     Parse all generate_components functions using AST and extract parameter patterns.
 
+    pattern selects the generator files (glob in this directory); verbose=False
+    parses silently.
+
     This function:
     1. Load each generator file
     2. Parse the generate_components function AST
@@ -209,15 +217,16 @@ def parse_generate_components_functions():
     4. Build a comprehensive parameter space mapping
     5. Return a structured representation of all possible parameters
     """
-    import ast
     from pathlib import Path
 
+    print = builtins.print if verbose else (lambda *args, **kwargs: None)
+
     print("=== PARSING GENERATE_COMPONENTS FUNCTIONS ===")
     print("Using AST to analyze parameter generation patterns\n")
 
-    # Find all spe_sujet1_auto_*_question.py files
+    # Find the matching generator files (spe_sujet1_auto_*_question.py by default)
     generators_dir = Path(__file__).parent
-    generator_files = list(generators_dir.glob("spe_sujet1_auto_*_question.py"))
+    generator_files = list(generators_dir.glob(pattern))
     generator_files.sort()  # Sort for consistent order
 
     parsed_generators = {}
@@ -297,6 +306,12 @@ def analyze_assignment(assign_node, analysis):
     # Analyze the value being assigned
     param_info = analyze_expression(value)
     if param_info:
+        previous = analysis["parameters"].get(var_name)
+        if previous and "possible_values" in previous and "possible_values" not in param_info:
+            # p = gen.random_integer(1, 200); p = tm.Fraction(p=p, q=200): the draw is
+            # what varies, the rewrap depends on it
+            analysis["dependencies"].append({"name": var_name, **param_info})
+            return
         analysis["parameters"][var_name] = param_info
 
 
@@ -389,6 +404,10 @@ def analyze_math_object_call(class_name, args, keywords):
                 value = extract_constant_value(kw.value)
                 if value is not None:
                     return {"type": "fixed_integer", "value": value, "possible_values": [value]}
+                # tm.Integer(n=gen.random_element_from((-1, 1))): the draw inside
+                inner = analyze_expression(kw.value)
+                if inner and inner.get("possible_values"):
+                    return inner
 
     elif class_name == "Symbol":
         # Look for s= keyword argument
@@ -472,88 +491,212 @@ def extract_list_elements(node):
     return None
 
 
-def generate_parameter_grid(parsed_generators=None):
+class ParameterSpace:
     """
-    Generate a comprehensive grid of all possible parameter combinations.
+    Lazy view of a generator's parameter hypercube.
 
-    Uses AST parsing results to create ALL possible combinations of parameter values
-    in lexicographic order (natural increase).
+    Combinations are numbered in itertools.product order (the last parameter varies
+    fastest) and decoded from their index on demand, so the size is exact without
+    enumerating anything and a range of indices can be handed to another process.
+    Works like a read-only sequence: len(), [i], [-1], slices and iteration.
+    """
 
-    Returns a dictionary mapping each generator to its complete parameter space.
+    def __init__(self, generator_name, analysis, start=0, stop=None):
+        self.generator_name = generator_name
+        self.analysis = analysis
+        # Choices the AST could not read (tm objects in the list) are left out
+        self.param_names = [
+            name for name, info in analysis["parameters"].items() if info.get("possible_values")
+        ]
+        self.param_values = [
+            analysis["parameters"][name]["possible_values"] for name in self.param_names
+        ]
+        full_size = math.prod(len(values) for values in self.param_values)
+        stop = full_size if stop is None else min(stop, full_size)
+        self.start = max(0, min(start, stop))
+        self.stop = stop
+
+    @property
+    def size(self):
+        """Exact number of combinations in this view (may exceed sys.maxsize)."""
+        return self.stop - self.start
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return f"<ParameterSpace {self.generator_name} [{self.start}:{self.stop}]>"
+
+    def slice(self, start, stop):
+        """Sub-space over indices [start, stop) of this view."""
+        start, stop, _ = slice(start, stop).indices(self.size)
+        return ParameterSpace(
+            self.generator_name, self.analysis, self.start + start, self.start + stop
+        )
+
+    def shard(self, index, count):
+        """The index-th of count contiguous, near-equal parts (for parallel workers)."""
+        if not 0 <= index < count:
+            raise ValueError(f"Shard {index} out of range for {count} shards")
+        return self.slice(self.size * index // count, self.size * (index + 1) // count)
+
+    def values_at(self, index):
+        """Raw parameter values of the index-th combination (mixed-radix decoding)."""
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError(f"Combination {index} out of range for {self.size}")
+        index += self.start
+        values = [None] * len(self.param_values)
+        for position in range(len(self.param_values) - 1, -1, -1):
+            index, digit = divmod(index, len(self.param_values[position]))
+            values[position] = self.param_values[position][digit]
+        return dict(zip(self.param_names, values))
+
+    def iter_values(self):
+        """Raw parameter values of every combination, lazily and in order."""
+        if self.size == 0:
+            return
+        # Decode the first index once, then count like an odometer
+        digits = []
+        index = self.start
+        for values in reversed(self.param_values):
+            index, digit = divmod(index, len(values))
+            digits.append(digit)
+        digits.reverse()
+        for _ in range(self.size):
+            yield {
+                name: values[digit]
+                for name, values, digit in zip(self.param_names, self.param_values, digits)
+            }
+            for position in range(len(digits) - 1, -1, -1):
+                digits[position] += 1
+                if digits[position] < len(self.param_values[position]):
+                    break
+                digits[position] = 0
+
+    def build(self, values):
+        """Combination of tm objects (plus computed parameters) from raw values."""
+        combination = {
+            name: create_math_object_from_value(value, self.analysis["parameters"][name])
+            for name, value in values.items()
+        }
+        return add_computed_parameters(combination, self.analysis)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if index.step not in (None, 1):
+                raise ValueError("ParameterSpace slices do not support a step")
+            return self.slice(index.start, index.stop)
+        return self.build(self.values_at(index))
+
+    def __iter__(self):
+        for values in self.iter_values():
+            yield self.build(values)
+
+    def sample(self, count, seed=None):
+        """count distinct combinations drawn uniformly, in index order."""
+        indices = sorted(random.Random(seed).sample(range(self.size), min(count, self.size)))
+        return [self[index] for index in indices]
+
+    def stratified_indices(self, count, strata, seed=None):
+        """
+        About count indices spread over strata contiguous shards (uniform within each).
+
+        Indices follow product order, so every range of the leading parameters gets
+        its share of the sample, where a plain sample could miss a rare corner.
+        """
+        rng = random.Random(seed)
+        strata = max(1, min(strata, count, self.size))
+        indices = []
+        for index in range(strata):
+            shard = self.shard(index, strata)
+            wanted = count * (index + 1) // strata - count * index // strata
+            picked = rng.sample(range(shard.size), min(wanted, shard.size))
+            indices.extend(shard.start - self.start + offset for offset in sorted(picked))
+        return indices
+
+
+def parameter_spaces(parsed_generators=None):
+    """Lazy ParameterSpace of every parsed generator that has enumerable parameters."""
+    if parsed_generators is None:
+        parsed_generators = parse_generate_components_functions()
+    spaces = {}
+    for generator_name, analysis in parsed_generators.items():
+        space = ParameterSpace(generator_name, analysis)
+        if space.param_names:
+            spaces[generator_name] = space
+    return spaces
+
+
+def iter_parameter_grid(parsed_generators=None, shard=None):
+    """
+    Yield (generator_name, combination) over all generators without building lists.
+
+    shard=(index, count) restricts every generator to its index-th part, so count
+    processes can each run one shard and cover the whole grid exactly once.
+    """
+    for generator_name, space in parameter_spaces(parsed_generators).items():
+        if shard is not None:
+            space = space.shard(*shard)
+        for combination in space:
+            yield generator_name, combination
+
+
+def generate_parameter_grid(parsed_generators=None, verbose=True):
     """
-    import itertools
+    Generate the grid of all possible parameter combinations, one space per generator.
+
+    Uses AST parsing results; combinations follow lexicographic order (natural
+    increase). Each value is a lazy ParameterSpace: sizes are computed, not counted,
+    and combinations are only built when indexed or iterated.
 
+    Returns a dictionary mapping each generator to its complete parameter space.
+    """
     if parsed_generators is None:
         # Parse the generators first
         parsed_generators = parse_generate_components_functions()
 
-    print("=== GENERATING PARAMETER HYPERCUBE FROM AST ANALYSIS ===")
-    print("Creating all possible parameter combinations based on parsed patterns\n")
+    all_combinations = parameter_spaces(parsed_generators)
+    if not verbose:
+        return all_combinations
 
-    all_combinations = {}
+    print("=== GENERATING PARAMETER HYPERCUBE FROM AST ANALYSIS ===")
+    print("Sizing all possible parameter combinations based on parsed patterns\n")
 
     for generator_name, analysis in parsed_generators.items():
         print(f"🎯 GENERATOR: {generator_name}")
         print(f"File: {analysis['filename']}")
 
-        # Extract parameter spaces from analysis
-        param_spaces = {}
-        returned_params = []
-
         for param_name, param_info in analysis["parameters"].items():
-            if "possible_values" in param_info:
-                param_spaces[param_name] = param_info["possible_values"]
-                print(
-                    f"  • {param_name}: {param_info['type']} with {len(param_info['possible_values'])} values"
-                )
-                if len(param_info["possible_values"]) <= 10:
-                    print(f"    Values: {param_info['possible_values']}")
-                else:
-                    print(
-                        f"    Range: {param_info['possible_values'][0]} to {param_info['possible_values'][-1]}"
-                    )
-            else:
+            possible_values = param_info.get("possible_values")
+            if possible_values is None:
                 print(f"  • {param_name}: {param_info['type']} (complex/computed)")
+                continue
+            print(f"  • {param_name}: {param_info['type']} with {len(possible_values)} values")
+            if len(possible_values) <= 10:
+                print(f"    Values: {possible_values}")
+            else:
+                print(f"    Range: {possible_values[0]} to {possible_values[-1]}")
 
-        # Generate all combinations for this generator
-        if param_spaces:
-            param_names = list(param_spaces.keys())
-            param_value_lists = [param_spaces[name] for name in param_names]
-
-            generator_combinations = []
-            for value_combination in itertools.product(*param_value_lists):
-                combination = {}
-                for param_name, value in zip(param_names, value_combination):
-                    combination[param_name] = create_math_object_from_value(
-                        value, analysis["parameters"][param_name]
-                    )
-
-                # Handle computed/complex parameters
-                combination = add_computed_parameters(combination, analysis)
-                generator_combinations.append(combination)
-
-            all_combinations[generator_name] = generator_combinations
-            print(f"  📊 Total combinations: {len(generator_combinations):,}")
-
-            # Show first few combinations
-            if generator_combinations:
-                print(f"  📝 First combination: {format_combination(generator_combinations[0])}")
-                if len(generator_combinations) > 1:
-                    print(
-                        f"  📝 Last combination: {format_combination(generator_combinations[-1])}"
-                    )
-        else:
+        space = all_combinations.get(generator_name)
+        if space is None:
             print("  ❌ No simple parameter spaces found")
-
+        else:
+            print(f"  📊 Total combinations: {space.size:,}")
+            if space.size:
+                print(f"  📝 First combination: {space.values_at(0)}")
+            if space.size > 1:
+                print(f"  📝 Last combination: {space.values_at(-1)}")
         print()
 
     # Summary
     print("=== HYPERCUBE GENERATION COMPLETE ===")
-    total_combinations = sum(len(combinations) for combinations in all_combinations.values())
-    print(f"🎯 Generated {total_combinations:,} total parameter combinations across all generators")
+    total_combinations = sum(space.size for space in all_combinations.values())
+    print(f"🎯 {total_combinations:,} total parameter combinations across all generators")
     print("\n📊 Breakdown by generator:")
-    for gen_name, combinations in all_combinations.items():
-        print(f"   • {gen_name}: {len(combinations):,} combinations")
+    for gen_name, space in all_combinations.items():
+        print(f"   • {gen_name}: {space.size:,} combinations")
 
     return all_combinations
 
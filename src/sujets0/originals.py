@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""
+Precomputed summaries for /sujets0/originals/{filiere}
+The official curriculum YAML of each filière, its related generators with their
+levels, its dominant level and the level badge of every filière are computed once
+(warmed at startup) into a read-only snapshot shared by all requests. The snapshot
+is rebuilt when a curriculum YAML or the generators directory changes; the level
+mapping (product settings, dispatch_2de_1ere) is loaded at startup and only
+changes with a restart.
+"""
+
+import logging
+import time
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+import yaml
+
+from ..settings import settings
+from .dispatch_2de_1ere import get_generator_level_info
+
+logger = logging.getLogger("maths_pm")
+
+CURRICULUM_DIR = (
+    Path(settings.base_dir) / "official_curriculums" / "france" / "premiere" / "yamelized"
+)
+GENERATORS_DIR = Path(settings.base_dir) / "src" / "sujets0" / "generators"
+
+FILIERES = ("gen-1", "gen-2", "gen-3", "spe-1", "spe-2")
+FILIERE_CONFIG = {
+    "gen-1": {"yaml_file": None, "title": "Sujet Général 1", "pattern": "gen_sujet1_*"},
+    "gen-2": {"yaml_file": None, "title": "Sujet Général 2", "pattern": "gen_sujet2_*"},
+    "gen-3": {"yaml_file": None, "title": "Sujet Général 3", "pattern": "gen_sujet3_*"},
+    "spe-1": {
+        "yaml_file": "sujet_0_spe_sujet_1.yml",
+        "title": "Sujet Spécialité 1",
+        "pattern": "spe_sujet1_*",
+    },
+    "spe-2": {
+        "yaml_file": "sujet_0_spe_sujet_2.yml",
+        "title": "Sujet Spécialité 2",
+        "pattern": "spe_sujet2_*",
+    },
+}
+
+
+def freeze(value):
+    """Read-only copy: dicts become mapping proxies, lists tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def dominant_level(levels: Iterable[str]) -> Tuple[str, str, str]:
+    """(level, note, badge level) of a filière from its generators' levels.
+
+    Any 1ERE content makes the filière 1ERE (conservative for difficulty).
+    """
+    count_2de = count_1ere = 0
+    for level in levels:
+        if level == "2DE":
+            count_2de += 1
+        elif level == "1ERE":
+            count_1ere += 1
+    total = count_2de + count_1ere
+    if total == 0:
+        return "N/A", "", "N/A"
+    if count_1ere > 0:
+        if count_2de > count_1ere:
+            return "1ERE", f"Majoritairement 2DE ({count_2de}/{total}) avec quelques 1ERE", "1ERE"
+        return "1ERE", "Niveau première", "1ERE"
+    return "2DE", "Niveau seconde", "2DE"
+
+
+def load_curriculum(yaml_path: Path, pattern: str) -> Optional[dict]:
+    """Parsed curriculum YAML, part_1 questions annotated with their generator's level."""
+    if not yaml_path.exists():
+        return None
+    with open(yaml_path, "r", encoding="utf-8") as f:
+        curriculum_data = yaml.safe_load(f)
+
+    if curriculum_data and "part_1" in curriculum_data:
+        for i, question_data in enumerate(curriculum_data["part_1"].values(), 1):
+            # question_1 -> spe_sujetX_auto_01_question
+            level_info = get_generator_level_info(f"{pattern}auto_{i:02d}_question")
+            question_data["level"] = level_info["level"]
+            question_data["level_note"] = level_info["note"]
+    return curriculum_data
+
+
+def build_summaries(
+    curriculum_dir: Path, generators_dir: Path, generator_levels: Mapping[str, dict]
+) -> Mapping[str, Mapping]:
+    """Summary of every filière, plus "all_filieres_levels" for the navigation."""
+    generator_files = sorted(generators_dir.glob("*.py")) if generators_dir.exists() else []
+
+    summaries: Dict[str, dict] = {}
+    for filiere in FILIERES:
+        config = FILIERE_CONFIG[filiere]
+        pattern = config["pattern"].replace("*", "")
+
+        curriculum_data = None
+        if config["yaml_file"]:
+            curriculum_data = load_curriculum(curriculum_dir / config["yaml_file"], pattern)
+
+        related_generators = []
+        for gen_file in generator_files:
+            if gen_file.name.startswith(pattern) and gen_file.name != "__init__.py":
+                level_info = get_generator_level_info(gen_file.stem)
+                related_generators.append(
+                    {
+                        "name": gen_file.stem,
+                        "file": gen_file.name,
+                        "path": f"/src/sujets0/generators/{gen_file.name}",
+                        "level": level_info["level"],
+                        "level_note": level_info["note"],
+                    }
+                )
+
+        level, note, simple = dominant_level(gen["level"] for gen in related_generators)
+        summaries[filiere] = {
+            "config": config,
+            "curriculum_data": curriculum_data,
+            "related_generators": related_generators,
+            "filiere_level": level,
+            "filiere_level_note": note,
+            "filiere_level_simple": simple,
+        }
+
+    # Navigation badges count the product's level mapping
+    all_filieres_levels = {
+        filiere: dominant_level(
+            info["level"]
+            for name, info in generator_levels.items()
+            if name.startswith(FILIERE_CONFIG[filiere]["pattern"].replace("*", ""))
+        )[2]
+        for filiere in FILIERES
+    }
+    return freeze({"filieres": summaries, "all_filieres_levels": all_filieres_levels})
+
+
+class OriginalsStore:
+    """Filière summaries, rebuilt when a curriculum YAML or the generators change."""
+
+    def __init__(
+        self,
+        curriculum_dir: Path = CURRICULUM_DIR,
+        generators_dir: Path = GENERATORS_DIR,
+        generator_levels: Optional[Mapping[str, dict]] = None,
+    ):
+        self.curriculum_dir = curriculum_dir
+        self.generators_dir = generators_dir
+        self.generator_levels = freeze(generator_levels or {})
+        self._summaries: Tuple[Optional[tuple], Optional[Mapping]] = (None, None)
+
+    def _stamp(self) -> tuple:
+        stamps = []
+        paths = [
+            self.curriculum_dir / config["yaml_file"]
+            for config in FILIERE_CONFIG.values()
+            if config["yaml_file"]
+        ]
+        # The directory's mtime changes when generators are added or removed
+        for path in [*paths, self.generators_dir]:
+            try:
+                stat = path.stat()
+                stamps.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamps.append(None)
+        return tuple(stamps)
+
+    def summaries(self) -> Mapping:
+        stamp = self._stamp()
+        if self._summaries[0] != stamp:
+            start = time.perf_counter()
+            summaries = build_summaries(
+                self.curriculum_dir, self.generators_dir, self.generator_levels
+            )
+            self._summaries = (stamp, summaries)
+            logger.info(
+                f"📜 Built sujets0 originals summaries for {len(FILIERES)} filières "
+                f"in {(time.perf_counter() - start) * 1000:.0f}ms"
+            )
+        return self._summaries[1]
+
+    def filiere(self, filiere: str) -> Optional[Mapping]:
+        """Summary of one filière, None if unknown."""
+        return self.summaries()["filieres"].get(filiere)
+
+
+def _product_generator_levels() -> Dict[str, dict]:
+    for product in settings.products:
+        if product.name == "sujets0" and product.backend_settings:
+            return product.backend_settings.get("generator_levels", {})
+    return {}
+
+
+originals_store = OriginalsStore(generator_levels=_product_generator_levels())
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+SQLite question bank for pre-generated sujets0 questions.
+
+build_questions.py writes `questions.sqlite` next to the bundles: one row per
+(generator, seed) with statement, statement_html, answer LaTeX, level, success flag
+and error type, indexed on generator/level/success, plus an FTS5 table over the
+statements. Duplicate seeds (see question_bundles) have `same_as` set to the seed
+they repeat and are left out of results unless asked for. /sujets0/api/questions
+searches it ("fraction" at 2DE) with filters, keyset pagination and random sampling
+instead of scanning bundles.
+
+Plain functions only: also imported by src/build_questions.py outside the app.
+"""
+
+import os
+import re
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+BANK_NAME = "questions.sqlite"
+BANK_VERSION = 2
+MAX_PAGE_SIZE = 100
+
+SCHEMA = """
+CREATE TABLE questions (
+    id INTEGER PRIMARY KEY,
+    generator TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    level TEXT,
+    success INTEGER NOT NULL,
+    error_type TEXT,
+    statement TEXT,
+    statement_html TEXT,
+    answer_latex TEXT,
+    same_as INTEGER,
+    UNIQUE (generator, seed)
+);
+CREATE INDEX questions_level ON questions (level, success);
+CREATE INDEX questions_success ON questions (success);
+CREATE VIRTUAL TABLE questions_fts USING fts5 (
+    statement,
+    content = 'questions',
+    content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+COLUMNS = (
+    "id",
+    "generator",
+    "seed",
+    "level",
+    "success",
+    "error_type",
+    "statement",
+    "statement_html",
+    "answer_latex",
+    "same_as",
+)
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def answer_latex(answer) -> Optional[str]:
+    """LaTeX of a generated answer ({"latex": str | [str]}, {"simplified_latex"}, or a value)."""
+    if answer is None:
+        return None
+    if isinstance(answer, dict):
+        latex = answer.get("latex") or answer.get("simplified_latex")
+        if latex is None:
+            return None
+        answer = latex
+    if isinstance(answer, (list, tuple)):
+        return " ; ".join(str(value) for value in answer)
+    return str(answer)
+
+
+def question_row(record: dict, level: Optional[str]) -> Tuple:
+    """Row values (without id) for a bundle record."""
+    return (
+        record["generator"],
+        record["seed"],
+        level,
+        1 if record.get("success") else 0,
+        record.get("error_type"),
+        record.get("statement") or record.get("question"),
+        record.get("statement_html"),
+        answer_latex(record.get("answer")) if record.get("success") else None,
+        record.get("same_as"),
+    )
+
+
+def write_question_bank(
+    questions_dir: Path, records: Iterable[dict], levels: Dict[str, dict]
+) -> int:
+    """(Re)write questions.sqlite from bundle records. Returns the row count.
+
+    Written to a temporary file and swapped in, so readers never see a partial bank.
+    """
+    path = questions_dir / BANK_NAME
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.unlink(missing_ok=True)
+    connection = sqlite3.connect(tmp_path)
+    try:
+        connection.executescript(SCHEMA)
+        rows = [
+            question_row(record, levels.get(record["generator"], {}).get("level"))
+            for record in records
+        ]
+        rows.sort(key=lambda row: (row[0], row[1]))
+        placeholders = ", ".join("?" * (len(COLUMNS) - 1))
+        connection.executemany(
+            f"INSERT INTO questions ({', '.join(COLUMNS[1:])}) VALUES ({placeholders})", rows
+        )
+        connection.execute("INSERT INTO questions_fts (questions_fts) VALUES ('rebuild')")
+        connection.execute(f"PRAGMA user_version = {BANK_VERSION}")
+        connection.commit()
+        connection.execute("VACUUM")
+    finally:
+        connection.close()
+    os.replace(tmp_path, path)
+    return len(rows)
+
+
+def fts_query(text: str) -> Optional[str]:
+    """Search text as an FTS5 query: every word must match, as a prefix ("fraction*")."""
+    words = _WORD.findall(text)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def query_questions(
+    bank_path: Path,
+    search: Optional[str] = None,
+    generator: Optional[str] = None,
+    level: Optional[str] = None,
+    success: Optional[bool] = None,
+    error_type: Optional[str] = None,
+    after: Optional[int] = None,
+    limit: int = 20,
+    sample: bool = False,
+    duplicates: bool = False,
+) -> Dict[str, object]:
+    """Filtered questions, by id after `after` (keyset pagination) or a random sample.
+
+    Returns {"questions": [...], "next": cursor or None}.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    clauses: List[str] = []
+    params: List[object] = []
+    if search:
+        match = fts_query(search)
+        if match is None:
+            return {"questions": [], "next": None}
+        clauses.append("id IN (SELECT rowid FROM questions_fts WHERE questions_fts MATCH ?)")
+        params.append(match)
+    for column, value in (("generator", generator), ("level", level), ("error_type", error_type)):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    if success is not None:
+        clauses.append("success = ?")
+        params.append(1 if success else 0)
+    if not duplicates:
+        clauses.append("same_as IS NULL")
+    if after is not None and not sample:
+        clauses.append("id > ?")
+        params.append(after)
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    order = "ORDER BY random()" if sample else "ORDER BY id"
+    sql = f"SELECT {', '.join(COLUMNS)} FROM questions {where} {order} LIMIT ?"
+    params.append(limit + (0 if sample else 1))
+
+    connection = sqlite3.connect(f"file:{bank_path}?mode=ro", uri=True)
+    try:
+        rows = connection.execute(sql, params).fetchall()
+    finally:
+        connection.close()
+
+    questions = [dict(zip(COLUMNS, row)) for row in rows]
+    for question in questions:
+        question["success"] = bool(question["success"])
+    next_cursor = None
+    if not sample and len(questions) > limit:
+        questions = questions[:limit]
+        next_cursor = questions[-1]["id"]
+    return {"questions": questions, "next": next_cursor}
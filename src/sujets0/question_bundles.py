@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Packed storage of pre-generated sujets0 questions.
+
+One compact JSON-lines bundle per generator (`<generator>.jsonl`, one line per seed
+in seed order) replaces the per-seed JSON files. Debug captures (stdout, stderr,
+traceback) go to a `<generator>.debug.jsonl` sidecar, so the bundles the viewer
+downloads stay small. `offsets.json` maps every generator/seed to the byte range
+of its line: a static host can serve one question with an HTTP Range request, and
+the lookup endpoint seeks straight to it.
+
+Seeds that generate the same question (same normalized statement and answer) as a
+lower seed are not written again: their offsets point at that seed's line, and
+`unique_seeds.json` lists the distinct successful seeds of every generator that
+has duplicates or failures (the others have none to skip).
+
+Plain functions only: also imported by src/build_questions.py outside the app.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+BUNDLE_SUFFIX = ".jsonl"
+DEBUG_SUFFIX = ".debug.jsonl"
+OFFSETS_NAME = "offsets.json"
+UNIQUE_SEEDS_NAME = "unique_seeds.json"
+BUNDLE_FORMAT = "jsonl"
+
+# Moved to the debug sidecar
+DEBUG_FIELDS = ("stdout", "stderr", "traceback", "partial_missive", "profile")
+
+
+def _line(data: dict) -> bytes:
+    return (json.dumps(data, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def split_debug(result: dict) -> Tuple[dict, dict]:
+    """Split a generate_question result into (question record, debug capture)."""
+    record = {key: value for key, value in result.items() if key not in DEBUG_FIELDS}
+    debug = {key: result[key] for key in DEBUG_FIELDS if result.get(key)}
+    return record, debug
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def question_fingerprint(record: dict) -> str:
+    """Hash of the normalized statement and answer: equal for duplicate questions."""
+    statement = _WHITESPACE.sub(" ", str(record.get("statement") or "")).strip()
+    answer = json.dumps(record.get("answer"), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(f"{statement}\n{answer}".encode("utf-8")).hexdigest()
+
+
+def dedupe_results(results: Iterable[dict]) -> Tuple[List[dict], Dict[int, int]]:
+    """Drop successful results that repeat a lower seed's question.
+
+    Returns (kept results, {duplicate seed: seed it repeats}). Failures are all kept.
+    """
+    kept: List[dict] = []
+    aliases: Dict[int, int] = {}
+    first_seed: Dict[str, int] = {}
+    for result in sorted(results, key=lambda r: r["seed"]):
+        if result.get("success"):
+            fingerprint = question_fingerprint(result)
+            if fingerprint in first_seed:
+                aliases[result["seed"]] = first_seed[fingerprint]
+                continue
+            first_seed[fingerprint] = result["seed"]
+        kept.append(result)
+    return kept, aliases
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def write_generator_bundle(
+    questions_dir: Path,
+    generator: str,
+    results: Iterable[dict],
+    aliases: Optional[Dict[int, int]] = None,
+) -> Dict[str, List[int]]:
+    """Write a generator's bundle and debug sidecar, in seed order.
+
+    Returns {seed: [offset, length]} for the bundle lines (seeds as strings, as in JSON);
+    seeds in `aliases` get the line of the seed they repeat.
+    """
+    bundle = bytearray()
+    debug_lines = bytearray()
+    offsets: Dict[str, List[int]] = {}
+    for result in sorted(results, key=lambda r: r["seed"]):
+        record, debug = split_debug(result)
+        line = _line(record)
+        offsets[str(result["seed"])] = [len(bundle), len(line)]
+        bundle += line
+        if debug:
+            debug_lines += _line({"seed": result["seed"], **debug})
+
+    for seed, same_as in (aliases or {}).items():
+        offsets[str(seed)] = offsets[str(same_as)]
+    offsets = dict(sorted(offsets.items(), key=lambda item: int(item[0])))
+
+    _write_atomic(questions_dir / f"{generator}{BUNDLE_SUFFIX}", bytes(bundle))
+    debug_path = questions_dir / f"{generator}{DEBUG_SUFFIX}"
+    if debug_lines:
+        _write_atomic(debug_path, bytes(debug_lines))
+    else:
+        debug_path.unlink(missing_ok=True)
+    return offsets
+
+
+def write_offsets(questions_dir: Path, offsets: Dict[str, Dict[str, List[int]]]) -> None:
+    _write_atomic(
+        questions_dir / OFFSETS_NAME,
+        json.dumps(dict(sorted(offsets.items())), separators=(",", ":")).encode("utf-8"),
+    )
+
+
+def write_unique_seeds(questions_dir: Path, unique_seeds: Dict[str, List[int]]) -> None:
+    _write_atomic(
+        questions_dir / UNIQUE_SEEDS_NAME,
+        json.dumps(dict(sorted(unique_seeds.items())), separators=(",", ":")).encode("utf-8"),
+    )
+
+
+def load_unique_seeds(questions_dir: Path) -> Dict[str, List[int]]:
+    """{generator: distinct successful seeds} for generators with seeds to skip."""
+    try:
+        with open(questions_dir / UNIQUE_SEEDS_NAME, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_offsets(questions_dir: Path) -> Dict[str, Dict[str, List[int]]]:
+    try:
+        with open(questions_dir / OFFSETS_NAME, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def read_question(
+    questions_dir: Path,
+    generator: str,
+    seed: int,
+    offsets: Optional[Dict[str, Dict[str, List[int]]]] = None,
+) -> Optional[dict]:
+    """One question record, read by seeking to its line. None if unknown.
+
+    A duplicate seed returns the record of the seed it repeats, marked "same_as".
+    """
+    offsets = offsets if offsets is not None else load_offsets(questions_dir)
+    entry = offsets.get(generator, {}).get(str(seed))
+    if entry is None:
+        return None
+    start, length = entry
+    try:
+        with open(questions_dir / f"{generator}{BUNDLE_SUFFIX}", "rb") as f:
+            f.seek(start)
+            record = json.loads(f.read(length))
+    except (OSError, ValueError):
+        return None
+    if record.get("seed") != seed:
+        record = {**record, "seed": seed, "same_as": record.get("seed")}
+    return record
+
+
+def read_bundle(questions_dir: Path, generator: str, debug: bool = False) -> Dict[int, dict]:
+    """All records of a generator by seed, with debug captures merged in if asked."""
+    records: Dict[int, dict] = {}
+    suffixes = (BUNDLE_SUFFIX, DEBUG_SUFFIX) if debug else (BUNDLE_SUFFIX,)
+    for suffix in suffixes:
+        try:
+            with open(questions_dir / f"{generator}{suffix}", "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        data = json.loads(line)
+                        records.setdefault(data["seed"], {}).update(data)
+        except FileNotFoundError:
+            continue
+    return records
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""
+Warm worker pool for on-demand sujets0 questions
+Questions for any seed are generated server-side by worker processes that have
+imported `teachers` and loaded every generator module at startup, so a request
+costs one generator run instead of a Pyodide boot on the student's device.
+
+Workers call build_questions.generate_question: a (generator, seed) pair gives
+exactly the question the ex-ante build writes for it. Results are kept in an LRU
+keyed on the generator file's mtime, so an edited generator is never served stale.
+A run that exceeds the timeout has its pool recycled.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import redirect_stderr, redirect_stdout
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ..settings import settings
+from .question_bundles import split_debug
+
+logger = logging.getLogger("maths_pm")
+
+GENERATORS_DIR = Path(__file__).parent / "generators"
+GENERATOR_PATTERNS = ("spe_*.py", "gen_*.py")
+# numpy.random.seed only accepts 32-bit seeds
+MAX_SEED = 2**32 - 1
+
+# Where QuestionPool.get found a question: the LRU, a run another request had
+# already started, or a new run
+CACHE_HIT = "HIT"
+CACHE_SHARED = "SHARED"
+CACHE_MISS = "MISS"
+
+# Workers never fork the server process: by the time the pool starts (or restarts
+# after a timeout) it has thread-pool threads, and forking a threaded process can
+# deadlock the child on a lock one of them held
+_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def list_generators(directory: Path = GENERATORS_DIR) -> Dict[str, Path]:
+    """Generator files by name (file stem), as picked up by build_questions."""
+    generators: Dict[str, Path] = {}
+    for pattern in GENERATOR_PATTERNS:
+        for path in directory.glob(pattern):
+            generators[path.stem] = path
+    return dict(sorted(generators.items()))
+
+
+class _WarmTimeout(BaseException):
+    """A generator module took longer than the pool timeout to load at startup."""
+
+
+def _raise_warm_timeout(signum, frame):
+    raise _WarmTimeout()
+
+
+def _warm_worker(generator_paths: List[str], timeout: float = 0.0) -> None:
+    """Worker initializer: import teachers, then load every generator module once.
+
+    Loading runs each module's code, so everything it imports is in sys.modules and
+    its code is compiled before the first request. Requests still run the module
+    again: its module-level script must run under the request's seed. A module that
+    loads for longer than timeout is skipped (its requests time out as usual).
+    """
+    from ..build_questions import load_generator_module
+
+    try:
+        import teachers.generator  # noqa: F401
+        import teachers.maths  # noqa: F401
+    except ImportError:
+        pass
+    use_alarm = timeout > 0 and hasattr(signal, "setitimer")
+    if use_alarm:
+        previous_handler = signal.signal(signal.SIGALRM, _raise_warm_timeout)
+    try:
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull), redirect_stderr(devnull):
+            for path in generator_paths:
+                if use_alarm:
+                    signal.setitimer(signal.ITIMER_REAL, timeout)
+                try:
+                    load_generator_module(Path(path))
+                except (Exception, _WarmTimeout):
+                    # Reported with the first request for that generator
+                    pass
+                finally:
+                    if use_alarm:
+                        signal.setitimer(signal.ITIMER_REAL, 0)
+    finally:
+        if use_alarm:
+            signal.signal(signal.SIGALRM, previous_handler)
+
+
+def _ping() -> bool:
+    return True
+
+
+def _generate(generator_path: str, seed: int) -> dict:
+    """Worker: one question, without the stdout/stderr/traceback captures."""
+    from ..build_questions import generate_question
+
+    record, _ = split_debug(generate_question(Path(generator_path), seed, capture="off"))
+    return record
+
+
+class QuestionPool:
+    """Process pool, LRU cache and in-flight dedup for generated questions."""
+
+    def __init__(self, workers: int = 2, cache_size: int = 4096, timeout: float = 10.0):
+        self.workers = workers
+        self.cache_size = cache_size
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._cache: "OrderedDict[Tuple[str, int, int], dict]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, int, int], "asyncio.Task[dict]"] = {}
+        self._generators: Tuple[Optional[int], Dict[str, Path]] = (None, {})
+        # At most one submitted run per worker: the timeout then measures the run,
+        # not the time spent queued behind a class set
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.hits = 0
+        self.misses = 0
+        # Requests that joined a run already in progress (neither hit nor miss)
+        self.shared = 0
+        self.timeouts = 0
+        self.restarts = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    @property
+    def started(self) -> bool:
+        return self._executor is not None
+
+    def generators(self) -> Dict[str, Path]:
+        """Known generators, listed again when the directory changes."""
+        try:
+            mtime_ns = GENERATORS_DIR.stat().st_mtime_ns
+        except OSError:
+            return {}
+        if self._generators[0] != mtime_ns:
+            self._generators = (mtime_ns, list_generators(GENERATORS_DIR))
+        return self._generators[1]
+
+    def start(self) -> None:
+        """Spawn and warm the workers (no-op if disabled or already running)."""
+        if not self.enabled or self._executor is not None:
+            return
+        paths = [str(path) for path in self.generators().values()]
+        context = multiprocessing.get_context(_START_METHOD)
+        if _START_METHOD == "forkserver":
+            # Imported once in the fork server, inherited by every worker it forks
+            context.set_forkserver_preload([__name__])
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_warm_worker,
+            initargs=(paths, self.timeout),
+        )
+        # Processes start on demand: one task each brings them all up now
+        for _ in range(self.workers):
+            self._executor.submit(_ping)
+        logger.info(
+            f"🔥 Sujets0 question pool: {self.workers} workers warming {len(paths)} generators"
+        )
+
+    def shutdown(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _restart(self) -> None:
+        """Kill the workers (one of them is stuck in a generator) and start fresh ones."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            # ProcessPoolExecutor cannot cancel a running task: stop its processes
+            for process in list((getattr(executor, "_processes", None) or {}).values()):
+                process.terminate()
+            executor.shutdown(wait=False, cancel_futures=True)
+        self.restarts += 1
+        self.start()
+
+    def _remember(self, key: Tuple[str, int, int], record: dict) -> None:
+        self._cache[key] = record
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def get(self, generator: str, seed: int) -> Tuple[dict, str]:
+        """Question for (generator, seed). Returns (record, CACHE_HIT/SHARED/MISS).
+
+        Raises KeyError for an unknown generator and asyncio.TimeoutError when the
+        generator runs longer than the timeout.
+        """
+        path = self.generators()[generator]
+        key = (generator, seed, path.stat().st_mtime_ns)
+        record = self._cache.get(key)
+        if record is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return record, CACHE_HIT
+
+        # Concurrent requests for the same question share one run. It belongs to the
+        # pool, not to the first caller: a caller going away (client disconnect,
+        # cancelled class set) neither cancels it nor fails the others waiting on it
+        task = self._inflight.get(key)
+        if task is not None:
+            self.shared += 1
+            state = CACHE_SHARED
+        else:
+            self.misses += 1
+            state = CACHE_MISS
+            task = asyncio.ensure_future(self._run(str(path), seed))
+            self._inflight[key] = task
+            task.add_done_callback(partial(self._finish, key))
+        return await asyncio.shield(task), state
+
+    def _finish(self, key: Tuple[str, int, int], task: "asyncio.Task[dict]") -> None:
+        """Done callback of a run: cache its record once every waiter can read it."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # exception() also marks a failure seen when every caller went away
+        if not task.cancelled() and task.exception() is None:
+            self._remember(key, task.result())
+
+    async def _run(self, generator_path: str, seed: int) -> dict:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        async with self._slots:
+            return await self._run_in_worker(generator_path, seed)
+
+    async def _run_in_worker(self, generator_path: str, seed: int, retry: bool = True) -> dict:
+        self.start()
+        executor = self._executor
+        start = time.perf_counter()
+        try:
+            future = executor.submit(_generate, generator_path, seed)
+            record = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning(
+                f"⏱️ {Path(generator_path).stem} seed {seed} exceeded {self.timeout}s: "
+                "restarting question workers"
+            )
+            self._restart()
+            raise
+        except BrokenProcessPool:
+            # Killed along with its pool (a neighbour timed out) or crashed it itself
+            if executor is self._executor:
+                self._restart()
+            if not retry:
+                raise
+            return await self._run_in_worker(generator_path, seed, retry=False)
+        logger.debug(
+            f"🎲 {record.get('generator')} seed {seed} in "
+            f"{(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+        return record
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "started": self.started,
+            "workers": self.workers,
+            "timeout": self.timeout,
+            "cached": len(self._cache),
+            "cache_size": self.cache_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared": self.shared,
+            "timeouts": self.timeouts,
+            "restarts": self.restarts,
+        }
+
+
+question_pool = QuestionPool(
+    workers=settings.sujets0_question_workers,
+    cache_size=settings.sujets0_question_cache_size,
+    timeout=settings.sujets0_question_timeout,
+)
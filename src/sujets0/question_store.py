@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""
+Question store for the pre-generated sujets0 pages
+Loads questions/index.json once and precomputes what /sujets0/ex-ante-generated and
+its error-analysis page render: the filtered generator list with levels, totals,
+per-level aggregates and the error table. Everything is rebuilt when index.json
+(or offsets.json / unique_seeds.json, for the lookup endpoint and class sets) is
+rewritten by build_questions.py.
+"""
+
+import json
+import logging
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from jinja2.utils import htmlsafe_json_dumps
+
+from .dispatch_2de_1ere import get_generator_level_info
+from .question_bundles import (
+    OFFSETS_NAME,
+    UNIQUE_SEEDS_NAME,
+    load_offsets,
+    load_unique_seeds,
+    read_bundle,
+)
+
+logger = logging.getLogger("maths_pm")
+
+# gen_ and spe_ generators with 4 underscores (sujet question files)
+SUJET_GENERATOR = re.compile(r"^(gen|spe)_[^_]+_[^_]+_[^_]+_question$")
+INDEX_NAME = "index.json"
+
+
+def _stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class QuestionIndexView:
+    """One version of index.json with its derived views (computed once)."""
+
+    def __init__(self, questions_dir: Path, index_data: dict):
+        self.questions_dir = questions_dir
+        self._errors: Optional[List[dict]] = None
+        self._error_generators: List[str] = []
+        self._error_types: List[str] = []
+
+        generators = []
+        total_questions = total_failed = 0
+        levels: Dict[str, Dict[str, int]] = {}
+        for generator in index_data.get("generators", []):
+            if not SUJET_GENERATOR.match(generator["name"]):
+                continue
+            level_info = get_generator_level_info(generator["name"])
+            generators.append(
+                {**generator, "level": level_info["level"], "level_note": level_info["note"]}
+            )
+            successful = generator.get("successful", 0)
+            failed = generator.get("failed", 0)
+            total_questions += successful
+            total_failed += failed
+            level = levels.setdefault(
+                level_info["level"], {"generators": 0, "successful": 0, "failed": 0}
+            )
+            level["generators"] += 1
+            level["successful"] += successful
+            level["failed"] += failed
+
+        self.generators = generators
+        self.levels = dict(sorted(levels.items()))
+        self.index = {
+            **index_data,
+            "generators": generators,
+            "total_questions": total_questions,
+            "total_failed": total_failed,
+            "total_generators": len(generators),
+        }
+        # Serialized once for the viewer's data attribute
+        self.index_json = htmlsafe_json_dumps(self.index)
+        self.generators_with_errors = sum(1 for g in generators if g.get("failed", 0) > 0)
+        # Build profiles (index.json "profile"), slowest median seed first
+        self.profiles = sorted(
+            (g for g in generators if g.get("profile")),
+            key=lambda g: -g["profile"]["wall_ms"]["median"],
+        )
+
+    @property
+    def errors(self) -> List[dict]:
+        """Failed seeds with their debug captures, read from the bundles on first use."""
+        if self._errors is None:
+            errors = []
+            for generator in self.generators:
+                if generator.get("failed", 0) == 0:
+                    continue
+                records = read_bundle(self.questions_dir, generator["name"], debug=True)
+                for seed in generator.get("failed_seeds", []):
+                    error_data = records.get(seed)
+                    if error_data is None or error_data.get("success", True):
+                        continue
+                    errors.append(
+                        {
+                            "generator": generator["name"],
+                            "seed": seed,
+                            "error": error_data.get("error", "Unknown error"),
+                            "error_type": error_data.get("error_type", "Unknown"),
+                            "traceback": error_data.get("traceback", ""),
+                            "stdout": error_data.get("stdout", ""),
+                            "stderr": error_data.get("stderr", ""),
+                            "level": generator["level"],
+                            "level_note": generator["level_note"],
+                        }
+                    )
+            self._error_generators = sorted({error["generator"] for error in errors})
+            self._error_types = sorted({error["error_type"] for error in errors})
+            self._errors = errors
+        return self._errors
+
+    @property
+    def error_generators(self) -> List[str]:
+        """Generators appearing in the error table, for its filter."""
+        self.errors
+        return self._error_generators
+
+    @property
+    def error_types(self) -> List[str]:
+        self.errors
+        return self._error_types
+
+
+class QuestionStore:
+    """Pre-generated questions, reloaded whenever the build rewrites them."""
+
+    def __init__(self, questions_dir: Path):
+        self.questions_dir = questions_dir
+        self._view: Tuple[Optional[Tuple[int, int]], Optional[QuestionIndexView]] = (None, None)
+        self._offsets: Tuple[Optional[Tuple[int, int]], dict] = (None, {})
+        self._unique_seeds: Tuple[Optional[Tuple[int, int]], dict] = (None, {})
+
+    def view(self) -> Optional[QuestionIndexView]:
+        """Current index view, None when the questions have not been generated."""
+        stamp = _stamp(self.questions_dir / INDEX_NAME)
+        if stamp is None:
+            return None
+        if self._view[0] != stamp:
+            start = time.perf_counter()
+            with open(self.questions_dir / INDEX_NAME, "r", encoding="utf-8") as f:
+                view = QuestionIndexView(self.questions_dir, json.load(f))
+            self._view = (stamp, view)
+            logger.info(
+                f"📚 Loaded sujets0 question index: {len(view.generators)} generators "
+                f"in {(time.perf_counter() - start) * 1000:.0f}ms"
+            )
+        return self._view[1]
+
+    def offsets(self) -> dict:
+        """Parsed offsets.json (generator -> seed -> [offset, length])."""
+        stamp = _stamp(self.questions_dir / OFFSETS_NAME)
+        if stamp is None:
+            return {}
+        if self._offsets[0] != stamp:
+            self._offsets = (stamp, load_offsets(self.questions_dir))
+        return self._offsets[1]
+
+    def unique_seeds(self) -> Dict[str, List[int]]:
+        """Distinct seeds of the generators that repeat questions (unique_seeds.json)."""
+        stamp = _stamp(self.questions_dir / UNIQUE_SEEDS_NAME)
+        if stamp is None:
+            return {}
+        if self._unique_seeds[0] != stamp:
+            self._unique_seeds = (stamp, load_unique_seeds(self.questions_dir))
+        return self._unique_seeds[1]
@@ -4,11 +4,21 @@ Sujets0 Router - Mathematics Exercise Generator
 Uses product-specific settings for configuration
 """
 
+import asyncio
+from pathlib import Path
+from typing import Optional
+
 from fastapi import APIRouter, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 
 from ..settings import settings
+from .class_sets import ClassSetRequest, plan_class_set, stream_class_set
 from .dispatch_2de_1ere import get_generator_level_info
+from .question_bank import BANK_NAME, MAX_PAGE_SIZE, query_questions
+from .question_bundles import read_question
+from .question_pool import MAX_SEED, question_pool
+from .originals import FILIERE_CONFIG, FILIERES, originals_store
+from .question_store import QuestionStore
 
 # Create sujets0 router
 sujets0_router = APIRouter(tags=["sujets0"], prefix="/sujets0")
@@ -20,6 +30,15 @@ for product in settings.products:
         sujets0_product = product
         break
 
+_generator_levels = (
+    sujets0_product.backend_settings.get("generator_levels", {})
+    if sujets0_product and sujets0_product.backend_settings
+    else {}
+)
+
+# Pre-generated questions (src/build_questions.py), reloaded when rebuilt
+question_store = QuestionStore(Path(settings.base_dir) / "src" / "static" / "sujets0" / "questions")
+
 
 # @sujets0_router.get("/", response_class=HTMLResponse)
 # async def sujets0(request: Request):
@@ -181,7 +200,8 @@ async def sujets0_ex_ante_generated(request: Request):
 
     This route serves pre-generated questions from JSON files created by
     src/build_questions.py. No Python execution happens in the browser.
-    Questions are loaded instantly from static JSON files.
+    Questions are loaded from one static JSON-lines bundle per generator.
+    The filtered index, totals and levels come precomputed from the question store.
 
     Benefits:
     - Instant loading (no Pyodide/Nagini needed)
@@ -190,15 +210,10 @@ async def sujets0_ex_ante_generated(request: Request):
     - Browser cacheable
     """
     try:
-        import json
-        from pathlib import Path
-
-        # Load the index of pre-generated questions
-        questions_dir = Path(settings.base_dir) / "src" / "static" / "sujets0" / "questions"
-        index_file = questions_dir / "index.json"
+        view = question_store.view()
 
         # Check if questions have been generated
-        if not index_file.exists():
+        if view is None:
             return HTMLResponse(
                 """
                 <div style="padding: 2rem; font-family: system-ui;">
@@ -211,48 +226,15 @@ async def sujets0_ex_ante_generated(request: Request):
                 status_code=503,
             )
 
-        # Load index data
-        with open(index_file, "r", encoding="utf-8") as f:
-            index_data = json.load(f)
-
-        # Filter generators to only include gen_ and spe_ with 4 underscores
-        import re
-
-        pattern = re.compile(r"^(gen|spe)_[^_]+_[^_]+_[^_]+_question$")
-
-        filtered_generators = []
-        total_questions = 0
-        total_failed = 0
-
-        for generator in index_data.get("generators", []):
-            if pattern.match(generator["name"]):
-                # Add level information to each generator
-                gen_with_level = generator.copy()
-                level_info = get_generator_level_info(generator["name"])
-                gen_with_level["level"] = level_info["level"]
-                gen_with_level["level_note"] = level_info["note"]
-                filtered_generators.append(gen_with_level)
-                total_questions += generator.get("successful", 0)
-                total_failed += generator.get("failed", 0)
-
-        # Create filtered index data
-        filtered_index_data = {
-            **index_data,
-            "generators": filtered_generators,
-            "total_questions": total_questions,
-            "total_failed": total_failed,
-            "total_generators": len(filtered_generators),
-        }
-
         # Build context for template
         context = {
             "request": request,
             "page": {"title": "Questions Pré-générées - Sujets 0"},
-            "questions_index": filtered_index_data,
+            "questions_index": view.index,
+            "questions_index_json": view.index_json,
+            "questions_levels": view.levels,
             "questions_base_url": "/static/sujets0/questions/",
-            "generator_levels": sujets0_product.backend_settings.get("generator_levels", {})
-            if sujets0_product and sujets0_product.backend_settings
-            else {},
+            "generator_levels": _generator_levels,
             "get_generator_level": get_generator_level_info,
         }
 
@@ -262,7 +244,7 @@ async def sujets0_ex_ante_generated(request: Request):
                 {
                     "product_name": sujets0_product.name,
                     "product_title": "Questions Pré-générées",
-                    "product_description": f"{filtered_index_data.get('total_questions', 0)} questions disponibles instantanément",
+                    "product_description": f"{view.index['total_questions']} questions disponibles instantanément",
                     "product_metatags": sujets0_product.metatags,
                     "current_product": sujets0_product,
                 }
@@ -281,17 +263,13 @@ async def sujets0_ex_ante_generated_error_analysis(request: Request):
 
     Displays all failed questions in a table format for analysis.
     Perfect for feeding to LLMs for debugging patterns.
+    The error table is built once per build from the debug sidecars.
     """
     try:
-        import json
-        from pathlib import Path
-
-        # Load the index of pre-generated questions
-        questions_dir = Path(settings.base_dir) / "src" / "static" / "sujets0" / "questions"
-        index_file = questions_dir / "index.json"
+        view = question_store.view()
 
         # Check if questions have been generated
-        if not index_file.exists():
+        if view is None:
             return HTMLResponse(
                 """
                 <div style="padding: 2rem; font-family: system-ui;">
@@ -303,60 +281,20 @@ async def sujets0_ex_ante_generated_error_analysis(request: Request):
                 status_code=503,
             )
 
-        # Load index data
-        with open(index_file, "r", encoding="utf-8") as f:
-            index_data = json.load(f)
-
-        # Filter generators to only include gen_ and spe_ with 4 underscores
-        import re
-
-        pattern = re.compile(r"^(gen|spe)_[^_]+_[^_]+_[^_]+_question$")
-
-        filtered_generators = []
-        for generator in index_data.get("generators", []):
-            if pattern.match(generator["name"]):
-                filtered_generators.append(generator)
-
-        # Collect all error data
-        errors = []
-        for generator in filtered_generators:
-            if generator.get("failed", 0) > 0:
-                # Load error details for each failed seed
-                gen_dir = questions_dir / generator["name"]
-                for seed in generator.get("failed_seeds", []):
-                    error_file = gen_dir / f"{seed}.json"
-                    if error_file.exists():
-                        with open(error_file, "r", encoding="utf-8") as ef:
-                            error_data = json.load(ef)
-                            if not error_data.get("success", True):
-                                level_info = get_generator_level_info(generator["name"])
-                                errors.append(
-                                    {
-                                        "generator": generator["name"],
-                                        "seed": seed,
-                                        "error": error_data.get("error", "Unknown error"),
-                                        "error_type": error_data.get("error_type", "Unknown"),
-                                        "traceback": error_data.get("traceback", ""),
-                                        "stdout": error_data.get("stdout", ""),
-                                        "stderr": error_data.get("stderr", ""),
-                                        "level": level_info["level"],
-                                        "level_note": level_info["note"],
-                                    }
-                                )
+        errors = view.errors
 
         # Build context for template
         context = {
             "request": request,
             "page": {"title": "Error Analysis - Questions Pré-générées"},
             "errors": errors,
+            "error_generators": view.error_generators,
+            "error_types": view.error_types,
             "total_errors": len(errors),
-            "total_generators": len(filtered_generators),
-            "generators_with_errors": len(
-                [g for g in filtered_generators if g.get("failed", 0) > 0]
-            ),
-            "generator_levels": sujets0_product.backend_settings.get("generator_levels", {})
-            if sujets0_product and sujets0_product.backend_settings
-            else {},
+            "total_generators": len(view.generators),
+            "generators_with_errors": view.generators_with_errors,
+            "profiles": view.profiles,
+            "generator_levels": _generator_levels,
             "get_generator_level": get_generator_level_info,
         }
 
@@ -425,169 +363,38 @@ async def sujets0_originals(request: Request, filiere_number: str):
         filiere_number: One of "gen-1", "gen-2", "gen-3", "spe-1", "spe-2"
     """
     try:
-        import yaml
-        from pathlib import Path
-
         # Validate filiere_number
-        valid_filieres = ["gen-1", "gen-2", "gen-3", "spe-1", "spe-2"]
-        if filiere_number not in valid_filieres:
+        summary = originals_store.filiere(filiere_number)
+        if summary is None:
             return HTMLResponse(
                 f"""
                 <div style="padding: 2rem; font-family: system-ui;">
                     <h1>❌ Filière invalide: {filiere_number}</h1>
-                    <p>Les filières valides sont: {", ".join(valid_filieres)}</p>
+                    <p>Les filières valides sont: {", ".join(FILIERES)}</p>
                     <a href="/sujets0">← Retour aux Sujets 0</a>
                 </div>
                 """,
                 status_code=404,
             )
+        config = summary["config"]
 
-        # Simple filiere configuration
-        filiere_config = {
-            "gen-1": {"yaml_file": None, "title": "Sujet Général 1", "pattern": "gen_sujet1_*"},
-            "gen-2": {"yaml_file": None, "title": "Sujet Général 2", "pattern": "gen_sujet2_*"},
-            "gen-3": {"yaml_file": None, "title": "Sujet Général 3", "pattern": "gen_sujet3_*"},
-            "spe-1": {
-                "yaml_file": "sujet_0_spe_sujet_1.yml",
-                "title": "Sujet Spécialité 1",
-                "pattern": "spe_sujet1_*",
-            },
-            "spe-2": {
-                "yaml_file": "sujet_0_spe_sujet_2.yml",
-                "title": "Sujet Spécialité 2",
-                "pattern": "spe_sujet2_*",
-            },
-        }
-
-        config = filiere_config[filiere_number]
-
-        # Get pattern for generators
-        pattern = config["pattern"].replace("*", "")
-
-        # Load YAML file if specified
-        curriculum_data = None
-        if config["yaml_file"]:
-            yaml_path = (
-                Path(settings.base_dir)
-                / "official_curriculums"
-                / "france"
-                / "premiere"
-                / "yamelized"
-                / config["yaml_file"]
-            )
-            if yaml_path.exists():
-                with open(yaml_path, "r", encoding="utf-8") as f:
-                    curriculum_data = yaml.safe_load(f)
-
-                # Add level information to each question
-                if curriculum_data and "part_1" in curriculum_data:
-                    for i, (question_key, question_data) in enumerate(
-                        curriculum_data["part_1"].items(), 1
-                    ):
-                        # Map question to generator (question_1 -> spe_sujetX_auto_01_question)
-                        generator_name = f"{pattern}auto_{i:02d}_question"
-                        level_info = get_generator_level_info(generator_name)
-                        curriculum_data["part_1"][question_key]["level"] = level_info["level"]
-                        curriculum_data["part_1"][question_key]["level_note"] = level_info["note"]
-
-        # Find related generators
-        generators_dir = Path(settings.base_dir) / "src" / "sujets0" / "generators"
-
-        related_generators = []
-        if generators_dir.exists():
-            for gen_file in generators_dir.glob(f"{pattern}*.py"):
-                if gen_file.name != "__init__.py":
-                    level_info = get_generator_level_info(gen_file.stem)
-                    related_generators.append(
-                        {
-                            "name": gen_file.stem,
-                            "file": gen_file.name,
-                            "path": f"/src/sujets0/generators/{gen_file.name}",
-                            "level": level_info["level"],
-                            "level_note": level_info["note"],
-                        }
-                    )
-
-        related_generators.sort(key=lambda x: x["name"])
-
-        # Calculate dominant level for this filiere
-        filiere_level = "N/A"
-        filiere_level_note = ""
-        filiere_level_simple = "N/A"  # Simple version for badges
-        if related_generators:
-            levels_count = {"2DE": 0, "1ERE": 0}
-            for gen in related_generators:
-                if gen["level"] in levels_count:
-                    levels_count[gen["level"]] += 1
-
-            # Determine dominant level - simplified logic
-            # If majority (>= 80%) are 2DE, show 2DE
-            # Otherwise if any 1ERE exists, show 1ERE (conservative approach for difficulty)
-            total = levels_count["2DE"] + levels_count["1ERE"]
-            if total > 0:
-                if levels_count["1ERE"] > 0:
-                    # If any 1ERE content exists, mark as 1ERE level
-                    filiere_level = "1ERE"
-                    if levels_count["2DE"] > levels_count["1ERE"]:
-                        filiere_level_note = f"Majoritairement 2DE ({levels_count['2DE']}/{total}) avec quelques 1ERE"
-                    else:
-                        filiere_level_note = "Niveau première"
-                    filiere_level_simple = "1ERE"
-                else:
-                    # Only 2DE content
-                    filiere_level = "2DE"
-                    filiere_level_note = "Niveau seconde"
-                    filiere_level_simple = "2DE"
-
-                # Get level info for all filieres (for navigation)
-        all_filieres_levels = {}
-        for f_num in valid_filieres:
-            f_config = filiere_config.get(f_num, {})
-            f_pattern = f_config.get("pattern", "").replace("*", "")
-            f_level_counts = {"2DE": 0, "1ERE": 0}
-
-            # Count levels for this filiere's generators
-            generator_levels = (
-                sujets0_product.backend_settings.get("generator_levels", {})
-                if sujets0_product and sujets0_product.backend_settings
-                else {}
-            )
-            for gen_name, gen_info in generator_levels.items():
-                if gen_name.startswith(f_pattern.replace("_*", "_")):
-                    if gen_info["level"] in f_level_counts:
-                        f_level_counts[gen_info["level"]] += 1
-
-            # Determine level for this filiere - same simplified logic
-            total = f_level_counts["2DE"] + f_level_counts["1ERE"]
-            if total > 0:
-                if f_level_counts["1ERE"] > 0:
-                    # If any 1ERE content, mark as 1ERE
-                    all_filieres_levels[f_num] = "1ERE"
-                else:
-                    # Only 2DE content
-                    all_filieres_levels[f_num] = "2DE"
-            else:
-                all_filieres_levels[f_num] = "N/A"
-
-        # Build context for template
+        # Build context for template (summaries are precomputed, see originals.py)
         context = {
             "request": request,
             "page": {"title": config["title"]},
             "filiere_number": filiere_number,
             "filiere_title": config["title"],
             "filiere_description": f"Questions officielles du curriculum - {config['title']}",
-            "filiere_level": filiere_level,
-            "filiere_level_note": filiere_level_note,
-            "filiere_level_simple": filiere_level_simple,
-            "all_filieres_levels": all_filieres_levels,
-            "curriculum_data": curriculum_data,
-            "related_generators": related_generators,
-            "valid_filieres": valid_filieres,
-            "has_official_data": bool(curriculum_data),
-            "filiere_config": filiere_config,
-            "generator_levels": sujets0_product.backend_settings.get("generator_levels", {})
-            if sujets0_product and sujets0_product.backend_settings
-            else {},
+            "filiere_level": summary["filiere_level"],
+            "filiere_level_note": summary["filiere_level_note"],
+            "filiere_level_simple": summary["filiere_level_simple"],
+            "all_filieres_levels": originals_store.summaries()["all_filieres_levels"],
+            "curriculum_data": summary["curriculum_data"],
+            "related_generators": summary["related_generators"],
+            "valid_filieres": list(FILIERES),
+            "has_official_data": bool(summary["curriculum_data"]),
+            "filiere_config": FILIERE_CONFIG,
+            "generator_levels": _generator_levels,
             "get_generator_level": get_generator_level_info,
         }
 
@@ -667,3 +474,138 @@ async def v4pyjs_test(request: Request):
     V4PyJS test page - Testing environment for V4PyJS.
     """
     return settings.templates.TemplateResponse("sujets0/v4pyjs.html", {"request": request})
+
+
+@sujets0_router.get("/api/pregenerated/{generator}/{seed}")
+async def sujets0_pregenerated_question(generator: str, seed: int):
+    """
+    One pre-generated question, read from its generator bundle.
+
+    The bundle line is located through offsets.json, so only that line is read.
+    Static deployments can do the same client-side with an HTTP Range request on
+    /static/sujets0/questions/<generator>.jsonl.
+    """
+    offsets = question_store.offsets()
+    if generator not in offsets:
+        return JSONResponse({"error": f"Unknown generator {generator}"}, status_code=404)
+    question = read_question(question_store.questions_dir, generator, seed, offsets)
+    if question is None:
+        return JSONResponse({"error": f"No question for seed {seed}"}, status_code=404)
+    return question
+
+
+@sujets0_router.get("/api/questions")
+async def sujets0_questions(
+    q: Optional[str] = None,
+    generator: Optional[str] = None,
+    level: Optional[str] = None,
+    success: Optional[bool] = None,
+    error_type: Optional[str] = None,
+    after: Optional[int] = None,
+    limit: int = 20,
+    sample: bool = False,
+    duplicates: bool = False,
+):
+    """
+    Search the pre-generated question bank (questions.sqlite).
+
+    q is a full-text search over statements (every word, as a prefix, accents
+    ignored); generator, level (2DE, 1ERE...), success and error_type filter.
+    Pages are keyset-paginated: pass the returned `next` as `after`. With
+    sample=true, `limit` random matching questions are returned instead.
+    Seeds repeating another seed's question are skipped unless duplicates=true.
+    """
+    bank_path = question_store.questions_dir / BANK_NAME
+    if not bank_path.exists():
+        return JSONResponse(
+            {"error": "Question bank not built (run python src/build_questions.py)"},
+            status_code=503,
+        )
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return JSONResponse(
+            {"error": f"limit must be between 1 and {MAX_PAGE_SIZE}"}, status_code=422
+        )
+    return await asyncio.to_thread(
+        query_questions,
+        bank_path,
+        search=q,
+        generator=generator,
+        level=level,
+        success=success,
+        error_type=error_type,
+        after=after,
+        limit=limit,
+        sample=sample,
+        duplicates=duplicates,
+    )
+
+
+@sujets0_router.get("/api/question")
+async def sujets0_question(generator: str, seed: int):
+    """
+    A question for any seed, generated on demand by the warm worker pool.
+
+    Same seed -> question mapping as build_questions.generate_question, so seeds
+    0-99 match the pre-generated bundles. X-Cache is HIT (LRU), SHARED (joined a run
+    another request started) or MISS (new run).
+    """
+    if not question_pool.enabled:
+        return JSONResponse(
+            {"error": "On-demand generation is disabled (SUJETS0_QUESTION_WORKERS=0)"},
+            status_code=503,
+        )
+    if not 0 <= seed <= MAX_SEED:
+        return JSONResponse({"error": f"Seed must be between 0 and {MAX_SEED}"}, status_code=422)
+    try:
+        question, cache_state = await question_pool.get(generator, seed)
+    except KeyError:
+        return JSONResponse({"error": f"Unknown generator {generator}"}, status_code=404)
+    except asyncio.TimeoutError:
+        return JSONResponse(
+            {"error": f"{generator} did not finish within {question_pool.timeout}s"},
+            status_code=504,
+        )
+    except Exception as e:
+        return JSONResponse({"error": f"Generation failed: {e}"}, status_code=500)
+
+    headers = {"X-Cache": cache_state}
+    if not question.get("success"):
+        # The generator itself raised for this seed
+        return JSONResponse(question, status_code=422, headers=headers)
+    return JSONResponse(question, headers=headers)
+
+
+@sujets0_router.get("/api/question/stats")
+async def sujets0_question_stats():
+    """Worker pool and cache counters."""
+    return question_pool.stats()
+
+
+@sujets0_router.post("/api/class-set")
+async def sujets0_class_set(request: ClassSetRequest):
+    """
+    Generate a whole class set on the server, streamed as NDJSON.
+
+    Takes the generator form's settings (filière, sujet or explicit generators,
+    nbQuestions, nbStudents, baseSeed); student n gets seed baseSeed + n - 1, mapped
+    onto the distinct seeds of generators that repeat questions.
+    Each "student" line holds {id, seed, questions} as generationResults.students
+    expects, questions being executeGeneratorWithSeed-shaped results.
+    """
+    if not question_pool.enabled:
+        return JSONResponse(
+            {"error": "On-demand generation is disabled (SUJETS0_QUESTION_WORKERS=0)"},
+            status_code=503,
+        )
+    try:
+        generators, seeds, question_seeds = plan_class_set(
+            request, question_pool.generators(), question_store.unique_seeds()
+        )
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=422)
+
+    return StreamingResponse(
+        stream_class_set(question_pool, generators, seeds, question_seeds),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+"""
+Validate sujets0 generators over their whole parameter hypercube.
+
+The build only runs seeds 0-99, so a zero denominator that needs one rare
+combination of draws never shows up there. This script reads each generator's
+random draws with the AST analysis of sujets0/generators/hypercube.py and feeds
+every combination (or, above --max-cases, a stratified sample) through
+generate_components, solve, render_question and the answer's LaTeX rendering:
+
+    python src/validate_generators.py -j 0
+    python src/validate_generators.py --generator "spe_sujet1_*" --max-cases 5000
+
+Draws are replayed in source order by a scripted MathsGenerator; draws the AST
+could not read (loops, tm objects in a choice list...) come from a generator seeded
+with the case index, and such cases are counted as partially scripted. Generators
+without readable draws are run on --seeds plain seeds instead.
+
+Exceptions, timeouts (non-terminating cases), answers that fail to render and
+repeated statements are written per generator to validation.json next to the
+pre-generated questions. Exits with status 1 if any case failed.
+"""
+
+import argparse
+import fnmatch
+import io
+import json
+import os
+import signal
+import sys
+import time
+import traceback
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Add the sujets0/generators to path so imports work
+sys.path.insert(0, str(Path(__file__).parent / "sujets0" / "generators"))
+
+try:
+    from .build_questions import _init_worker, load_generator_module
+    from .sujets0.generators.hypercube import ParameterSpace, parse_generate_components_functions
+    from .sujets0.question_bundles import question_fingerprint
+except ImportError:
+    # Run as a script: src/ is on sys.path
+    from build_questions import _init_worker, load_generator_module
+    from sujets0.generators.hypercube import ParameterSpace, parse_generate_components_functions
+    from sujets0.question_bundles import question_fingerprint
+
+GENERATOR_PATTERNS = ("spe_*.py", "gen_*.py")
+DRAW_TYPES = ("random_integer", "random_choice")
+REPORT_NAME = "validation.json"
+# Failing cases kept per generator and stage (the counts are always complete)
+MAX_EXAMPLES = 5
+
+
+class CaseTimeout(BaseException):
+    """A case ran longer than --timeout (most likely a rejection loop that never ends).
+
+    Not an Exception, so a generator's own `except Exception` cannot swallow it.
+    """
+
+
+class ScriptedGenerator:
+    """MathsGenerator whose first draws return the values of one combination.
+
+    A draw that does not fit the next scripted value (other range, value not among
+    the choices) ends the script: it and all later draws come from the real,
+    seeded generator.
+    """
+
+    def __init__(self, tg, seed, values: List[Any]):
+        self._generator = tg.MathsGenerator(seed)
+        self._values = list(values)
+        self.aligned = True
+
+    def _next(self, accepts) -> Tuple[bool, Any]:
+        if self.aligned and self._values and accepts(self._values[0]):
+            return True, self._values.pop(0)
+        self.aligned = False
+        return False, None
+
+    @property
+    def scripted(self) -> bool:
+        """Every value was used, each by the draw it was read from."""
+        return self.aligned and not self._values
+
+    def random_integer(self, low, high, *args, **kwargs):
+        import teachers.maths as tm
+
+        ok, value = self._next(
+            lambda value: isinstance(low, int) and isinstance(high, int) and low <= value <= high
+        )
+        if ok:
+            return tm.Integer(n=value)
+        return self._generator.random_integer(low, high, *args, **kwargs)
+
+    def random_element_from(self, elements, *args, **kwargs):
+        ok, value = self._next(lambda value: value in list(elements))
+        if ok:
+            return value
+        return self._generator.random_element_from(elements, *args, **kwargs)
+
+    def __getattr__(self, name):
+        # discrete_dirichlet_dist and the rest: not enumerated
+        return getattr(self._generator, name)
+
+
+class _ScriptedTeachersGenerator:
+    """Stand-in for `teachers.generator` in a generator's namespace."""
+
+    def __init__(self, tg):
+        self._tg = tg
+        self.current: Optional[ScriptedGenerator] = None
+        self.values: List[Any] = []
+
+    def MathsGenerator(self, seed=None):
+        self.current = ScriptedGenerator(self._tg, seed, self.values)
+        return self.current
+
+    def __getattr__(self, name):
+        return getattr(self._tg, name)
+
+
+def _raise_timeout(signum, frame):
+    raise CaseTimeout()
+
+
+def answer_latex(answer) -> List[str]:
+    """LaTeX of every maths object in solve()'s answer (as the missive renders it)."""
+    values = answer.values() if isinstance(answer, dict) else [answer]
+    latex = []
+    for value in values:
+        if hasattr(value, "latex"):
+            latex.append(value.latex())
+            if hasattr(value, "simplified"):
+                latex.append(value.simplified().latex())
+    if not latex:
+        raise ValueError(f"No renderable maths object in answer {answer!r}")
+    return latex
+
+
+def _run_case(module, teachers_stub, values: List[Any], seed: int) -> Tuple[str, Any]:
+    """(stage reached, fingerprint or exception) for one case."""
+    teachers_stub.values = values
+    stage = "generate_components"
+    try:
+        components = module.generate_components(None, seed=seed)
+        stage = "solve"
+        answer = module.solve(**components)
+        stage = "render_question"
+        question = module.render_question(**components)
+        statement = question["statement"] if isinstance(question, dict) else question
+        if not isinstance(statement, str) or not statement.strip():
+            raise ValueError(f"Empty statement {statement!r}")
+        stage = "answer"
+        latex = answer_latex(answer)
+    except Exception as e:
+        return stage, e
+    return "ok", question_fingerprint({"statement": statement, "answer": latex})
+
+
+def validate_cases(
+    generator_path: str, analysis: Optional[dict], indices: List[int], timeout: float
+) -> dict:
+    """Run some cases of one generator; a case is an index of its parameter space,
+    or a plain seed when analysis is None.
+
+    Runs in a worker process with --jobs. Returns the counts, failing examples and
+    fingerprints (first index of each distinct question) of these cases.
+    """
+    import teachers.generator as tg
+
+    generator_file = Path(generator_path)
+    result = {
+        "generator": generator_file.stem,
+        "cases": 0,
+        "passed": 0,
+        "scripted": 0,
+        "failures": Counter(),
+        "error_types": Counter(),
+        "examples": [],
+        "fingerprints": {},
+        "duplicate_examples": [],
+    }
+
+    space = ParameterSpace(generator_file.stem, analysis) if analysis else None
+    draws = (
+        [name for name in space.param_names if analysis["parameters"][name]["type"] in DRAW_TYPES]
+        if space
+        else []
+    )
+    use_alarm = timeout > 0 and hasattr(signal, "setitimer")
+    if use_alarm:
+        previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+
+    try:
+        # Generators print as they go; a case's output is not part of the report
+        with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+            try:
+                module = load_generator_module(generator_file)
+            except Exception as e:
+                # Every case of a generator that does not load has failed
+                result["cases"] = len(indices)
+                result["failures"]["load"] = len(indices)
+                result["error_types"][type(e).__name__] = len(indices)
+                result["examples"].append(
+                    {"stage": "load", "error": str(e), "traceback": traceback.format_exc()}
+                )
+                return result
+            teachers_stub = _ScriptedTeachersGenerator(tg)
+            module.tg = teachers_stub
+
+            for index in indices:
+                values = space.values_at(index) if space else {}
+                if use_alarm:
+                    signal.setitimer(signal.ITIMER_REAL, timeout)
+                try:
+                    stage, outcome = _run_case(
+                        module, teachers_stub, [values[name] for name in draws], index
+                    )
+                except CaseTimeout as e:
+                    stage, outcome = "timeout", e
+                finally:
+                    if use_alarm:
+                        signal.setitimer(signal.ITIMER_REAL, 0)
+
+                result["cases"] += 1
+                if space and teachers_stub.current is not None and teachers_stub.current.scripted:
+                    result["scripted"] += 1
+                if stage == "ok":
+                    result["passed"] += 1
+                    first = result["fingerprints"].setdefault(outcome, index)
+                    if first != index and len(result["duplicate_examples"]) < MAX_EXAMPLES:
+                        result["duplicate_examples"].append([first, index])
+                    continue
+
+                result["failures"][stage] += 1
+                result["error_types"][type(outcome).__name__] += 1
+                if sum(1 for e in result["examples"] if e["stage"] == stage) < MAX_EXAMPLES:
+                    result["examples"].append(
+                        {
+                            "stage": stage,
+                            "index": index,
+                            "values": values if space else {"seed": index},
+                            "error_type": type(outcome).__name__,
+                            "error": str(outcome) or f"Exceeded {timeout}s",
+                            "traceback": "".join(traceback.format_exception(outcome)),
+                        }
+                    )
+    finally:
+        # Also on the early return of a load failure
+        if use_alarm:
+            signal.signal(signal.SIGALRM, previous_handler)
+    return result
+
+
+def plan_cases(
+    space: Optional[ParameterSpace], max_cases: int, strata: int, seeds: int, sample_seed: int
+) -> Tuple[str, List[int]]:
+    """(mode, case indices): every combination if it fits max_cases, else a stratified
+    sample; plain seeds for generators without readable draws."""
+    if space is None:
+        return "seeds", list(range(seeds))
+    if space.size <= max_cases:
+        return "exhaustive", list(range(space.size))
+    return "stratified", space.stratified_indices(max_cases, strata, seed=sample_seed)
+
+
+def merge_results(report: dict, chunk: dict) -> None:
+    """Add a chunk's results to its generator's report."""
+    report["cases"] += chunk["cases"]
+    report["passed"] += chunk["passed"]
+    report["scripted"] += chunk["scripted"]
+    report["failures"].update(chunk["failures"])
+    report["error_types"].update(chunk["error_types"])
+    for example in chunk["examples"]:
+        if sum(1 for e in report["examples"] if e["stage"] == example["stage"]) < MAX_EXAMPLES:
+            report["examples"].append(example)
+    for pair in chunk["duplicate_examples"]:
+        if len(report["duplicate_examples"]) < MAX_EXAMPLES:
+            report["duplicate_examples"].append(pair)
+    for fingerprint, index in chunk["fingerprints"].items():
+        first = report["fingerprints"].setdefault(fingerprint, index)
+        if first != index:
+            report["fingerprints"][fingerprint] = min(first, index)
+            if len(report["duplicate_examples"]) < MAX_EXAMPLES:
+                report["duplicate_examples"].append(sorted([first, index]))
+
+
+def finish_report(report: dict) -> dict:
+    """JSON-ready coverage report of one generator."""
+    fingerprints = report.pop("fingerprints")
+    cases = report["cases"]
+    report["failed"] = cases - report["passed"]
+    report["failures"] = dict(report["failures"])
+    report["error_types"] = dict(report["error_types"])
+    report["distinct_questions"] = len(fingerprints)
+    report["duplicates"] = report["passed"] - len(fingerprints)
+    report["coverage"] = round(cases / report["space_size"], 6) if report["space_size"] else 0
+    report["scripted_rate"] = round(report["scripted"] / cases, 4) if cases else 0
+    report["examples"].sort(key=lambda example: (example["stage"], example.get("index", 0)))
+    return report
+
+
+def validate_all_generators(
+    jobs: int = 1,
+    max_cases: int = 50_000,
+    strata: int = 64,
+    seeds: int = 100,
+    timeout: float = 5.0,
+    chunk_size: int = 1000,
+    patterns: Optional[List[str]] = None,
+    sample_seed: int = 0,
+    output: Optional[Path] = None,
+) -> dict:
+    """Validate every generator and write the coverage report. Returns the report."""
+    base_dir = Path(__file__).parent.parent
+    generators_dir = base_dir / "src" / "sujets0" / "generators"
+    output = output or base_dir / "src" / "static" / "sujets0" / "questions" / REPORT_NAME
+
+    generator_files = sorted(
+        path for pattern in GENERATOR_PATTERNS for path in generators_dir.glob(pattern)
+    )
+    if patterns:
+        generator_files = [
+            path
+            for path in generator_files
+            if any(fnmatch.fnmatch(path.stem, pattern) for pattern in patterns)
+        ]
+
+    parsed = {}
+    for pattern in GENERATOR_PATTERNS:
+        parsed.update(parse_generate_components_functions(pattern, verbose=False))
+
+    # One task per chunk of cases, so a huge space is spread over every worker
+    reports: Dict[str, dict] = {}
+    tasks: List[Tuple[str, Optional[dict], List[int]]] = []
+    for path in generator_files:
+        analysis = parsed.get(path.stem)
+        space = ParameterSpace(path.stem, analysis) if analysis else None
+        if space is not None and not space.param_names:
+            space = analysis = None
+        mode, indices = plan_cases(space, max_cases, strata, seeds, sample_seed)
+        reports[path.stem] = {
+            "generator": path.stem,
+            "mode": mode,
+            "space_size": space.size if space else None,
+            "parameters": space.param_names if space else [],
+            "cases": 0,
+            "passed": 0,
+            "scripted": 0,
+            "failures": Counter(),
+            "error_types": Counter(),
+            "examples": [],
+            "fingerprints": {},
+            "duplicate_examples": [],
+        }
+        for start in range(0, len(indices), chunk_size):
+            tasks.append((str(path), analysis, indices[start : start + chunk_size]))
+
+    total_cases = sum(len(task[2]) for task in tasks)
+    print(f"🧪 Validating {len(generator_files)} generators: {total_cases:,} cases")
+    if jobs > 1:
+        print(f"⚙️  {jobs} worker processes, {chunk_size} cases per task")
+    print("-" * 50)
+
+    start = time.perf_counter()
+    remaining = Counter(task[0] for task in tasks)
+
+    def collect(chunk: dict, generator_path: str) -> None:
+        report = reports[chunk["generator"]]
+        merge_results(report, chunk)
+        remaining[generator_path] -= 1
+        if remaining[generator_path] == 0:
+            finish_report(report)
+            status = "✅" if report["failed"] == 0 else "❌"
+            size = f"/{report['space_size']:,}" if report["space_size"] else " seeds"
+            print(
+                f"{status} {report['generator']}: {report['passed']:,}/{report['cases']:,} "
+                f"passed ({report['mode']}, {report['cases']:,}{size}), "
+                f"{report['duplicates']:,} duplicates"
+            )
+            for stage, count in sorted(report["failures"].items()):
+                print(f"     • {stage}: {count:,}")
+
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as executor:
+            futures = {
+                executor.submit(validate_cases, path, analysis, indices, timeout): path
+                for path, analysis, indices in tasks
+            }
+            for future in as_completed(futures):
+                collect(future.result(), futures[future])
+    else:
+        for path, analysis, indices in tasks:
+            collect(validate_cases(path, analysis, indices, timeout), path)
+
+    generators = [reports[path.stem] for path in generator_files if path.stem in reports]
+    for report in generators:
+        if "fingerprints" in report:
+            # Generator without any case (empty space)
+            finish_report(report)
+
+    summary = {
+        "generators": len(generators),
+        "cases": sum(report["cases"] for report in generators),
+        "failed": sum(report["failed"] for report in generators),
+        "duplicates": sum(report["duplicates"] for report in generators),
+        "failing_generators": [r["generator"] for r in generators if r["failed"]],
+        "elapsed_s": round(time.perf_counter() - start, 2),
+    }
+    report = {
+        "settings": {
+            "max_cases": max_cases,
+            "strata": strata,
+            "seeds": seeds,
+            "timeout": timeout,
+            "sample_seed": sample_seed,
+        },
+        "summary": summary,
+        "generators": generators,
+    }
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print("-" * 50)
+    print(f"📊 {summary['cases']:,} cases in {summary['elapsed_s']}s")
+    print(f"❌ Failed cases: {summary['failed']:,} ({len(summary['failing_generators'])} generators)")
+    print(f"🧬 Duplicate questions: {summary['duplicates']:,}")
+    print(f"📁 Report: {output}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate sujets0 generators exhaustively")
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Worker processes (0 = one per CPU, default 1)",
+    )
+    parser.add_argument(
+        "--max-cases",
+        type=int,
+        default=50_000,
+        help="Largest space run exhaustively; bigger ones are sampled (default 50000)",
+    )
+    parser.add_argument(
+        "--strata",
+        type=int,
+        default=64,
+        help="Strata of a sampled space (default 64)",
+    )
+    parser.add_argument(
+        "--seeds",
+        type=int,
+        default=100,
+        help="Seeds for generators without readable draws (default 100)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=5.0,
+        help="Seconds before a case counts as non-terminating (default 5)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1000,
+        help="Cases per task (default 1000)",
+    )
+    parser.add_argument(
+        "--generator",
+        action="append",
+        help="Only generators matching this glob (repeatable)",
+    )
+    parser.add_argument(
+        "--sample-seed",
+        type=int,
+        default=0,
+        help="Seed of the stratified samples (default 0)",
+    )
+    parser.add_argument("--output", type=Path, help=f"Report path (default questions/{REPORT_NAME})")
+    args = parser.parse_args()
+
+    report = validate_all_generators(
+        jobs=args.jobs or os.cpu_count() or 1,
+        max_cases=args.max_cases,
+        strata=args.strata,
+        seeds=args.seeds,
+        timeout=args.timeout,
+        chunk_size=args.chunk_size,
+        patterns=args.generator,
+        sample_seed=args.sample_seed,
+        output=args.output,
+    )
+    sys.exit(1 if report["summary"]["failed"] else 0)
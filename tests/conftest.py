@@ -0,0 +1,19 @@
+"""
+Lets the tests import src modules without starting the app.
+
+src/__init__.py imports the FastAPI app, and src/export and src/lifespan import
+their ASGI and lifespan managers: the packages are registered empty so that
+`from src.export.manifest import ...` only loads the module it names.
+"""
+
+import sys
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+for name in ("src", "src.export", "src.lifespan"):
+    if name not in sys.modules:
+        package = types.ModuleType(name)
+        package.__path__ = [str(ROOT.joinpath(*name.split(".")))]
+        sys.modules[name] = package
@@ -0,0 +1,121 @@
+"""
+Incremental export planning: which routes are rendered again, what is recorded and
+what is pruned.
+
+    python -m pytest tests/
+"""
+
+import pytest
+
+from src.export.manifest import (
+    BuildManifest,
+    RouteInputs,
+    copy_files_with_manifest,
+    merge_route_results,
+    plan_routes,
+)
+
+ROUTES = ["/", "/pm/a.md?format=html", "/pm/b.md?format=html"]
+
+
+@pytest.fixture
+def site(tmp_path):
+    base_dir = tmp_path / "repo"
+    (base_dir / "pms").mkdir(parents=True)
+    (base_dir / "pms" / "a.md").write_text("# A\n![figure](figure.svg)\n", encoding="utf-8")
+    (base_dir / "pms" / "figure.svg").write_text("<svg/>", encoding="utf-8")
+    (base_dir / "pms" / "b.md").write_text("# B\n", encoding="utf-8")
+    (base_dir / "src" / "templates").mkdir(parents=True)
+    (base_dir / "src" / "templates" / "base.html").write_text("<html/>", encoding="utf-8")
+    return base_dir, tmp_path / "dist"
+
+
+def render(manifest, hashes, stale):
+    """Pretend-export the stale routes and record them."""
+    rendered = []
+    for route in stale:
+        output = "index.html" if route == "/" else route.split("?")[0][1:].replace(".md", ".html")
+        path = manifest.output_dir / output
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(route, encoding="utf-8")
+        rendered.append({"route": route, "success": True, "output": output})
+    return merge_route_results(manifest, hashes, rendered)
+
+
+def test_only_changed_routes_are_stale(site):
+    base_dir, dist = site
+    manifest = BuildManifest.load(dist)
+    hashes, stale = plan_routes(manifest, ROUTES, RouteInputs(base_dir))
+    assert stale == ROUTES
+    render(manifest, hashes, stale)
+    manifest.save()
+
+    manifest = BuildManifest.load(dist)
+    assert manifest.loaded
+    assert plan_routes(manifest, ROUTES, RouteInputs(base_dir))[1] == []
+
+    # A file the PM references is one of its inputs
+    (base_dir / "pms" / "figure.svg").write_text("<svg><g/></svg>", encoding="utf-8")
+    assert plan_routes(manifest, ROUTES, RouteInputs(base_dir))[1] == ["/pm/a.md?format=html"]
+
+    # Templates (and the variant) are shared by every page
+    (base_dir / "src" / "templates" / "base.html").write_text("<html lang=fr/>", encoding="utf-8")
+    assert plan_routes(manifest, ROUTES, RouteInputs(base_dir))[1] == ROUTES
+    assert plan_routes(manifest, ROUTES, RouteInputs(base_dir, "/maths.pm"))[1] == ROUTES
+
+
+def test_missing_output_is_stale(site):
+    base_dir, dist = site
+    manifest = BuildManifest(dist)
+    hashes, stale = plan_routes(manifest, ROUTES, RouteInputs(base_dir))
+    render(manifest, hashes, stale)
+    (dist / "pm" / "b.html").unlink()
+    assert plan_routes(manifest, ROUTES, RouteInputs(base_dir))[1] == ["/pm/b.md?format=html"]
+
+
+def test_merge_reports_skipped_and_retries_failures(site):
+    base_dir, dist = site
+    manifest = BuildManifest(dist)
+    hashes, stale = plan_routes(manifest, ROUTES, RouteInputs(base_dir))
+    render(manifest, hashes, stale)
+
+    (base_dir / "pms" / "b.md").write_text("# B, edited\n", encoding="utf-8")
+    hashes, stale = plan_routes(manifest, ROUTES, RouteInputs(base_dir))
+    results = merge_route_results(
+        manifest, hashes, [{"route": "/pm/b.md?format=html", "success": False}]
+    )
+    assert [result.get("skipped", False) for result in results] == [True, True, False]
+    assert results[0]["output"] == "index.html"
+    # The failed route keeps its old inputs, so the next run renders it again
+    assert plan_routes(manifest, ROUTES, RouteInputs(base_dir))[1] == ["/pm/b.md?format=html"]
+
+
+def test_prune_removes_only_orphaned_outputs(site):
+    base_dir, dist = site
+    manifest = BuildManifest(dist)
+    hashes, stale = plan_routes(manifest, ROUTES, RouteInputs(base_dir))
+    render(manifest, hashes, stale)
+    # Same output as /pm/b.md?format=html, which is still exported
+    manifest.record_route("/pm/b.md", "pm/b.html", "old")
+    (dist / "static").mkdir()
+    (dist / "static" / "old.css").write_text("a{}", encoding="utf-8")
+    manifest.record_copy("static/old.css", "old")
+
+    removed = manifest.prune(["/", "/pm/b.md?format=html"], [])
+    assert sorted(removed) == ["pm/a.html", "static/old.css"]
+    assert (dist / "pm" / "b.html").is_file()
+    assert sorted(manifest.routes) == ["/", "/pm/b.md?format=html"]
+    assert manifest.copies == {}
+
+
+def test_unchanged_copies_are_not_placed_again(site):
+    base_dir, dist = site
+    manifest = BuildManifest(dist)
+    outputs, copied = copy_files_with_manifest(manifest, base_dir / "pms", "static/pm")
+    assert sorted(outputs) == ["static/pm/a.md", "static/pm/b.md", "static/pm/figure.svg"]
+    assert copied == 3
+    assert copy_files_with_manifest(manifest, base_dir / "pms", "static/pm")[1] == 0
+
+    (base_dir / "pms" / "b.md").write_text("# B, edited\n", encoding="utf-8")
+    assert copy_files_with_manifest(manifest, base_dir / "pms", "static/pm")[1] == 1
+    assert (dist / "static" / "pm" / "b.md").read_text(encoding="utf-8") == "# B, edited\n"
@@ -0,0 +1,31 @@
+"""
+Nearest-rank percentiles of build_questions' --profile summary.
+
+    python -m pytest tests/
+"""
+
+import pytest
+
+from src.build_questions import _percentile
+
+
+@pytest.mark.parametrize(
+    "values, fraction, expected",
+    [
+        ([7.0], 0.95, 7.0),
+        ([1.0, 2.0], 0.5, 1.0),
+        ([1.0, 2.0], 0.95, 2.0),
+        ([1.0, 2.0, 3.0, 4.0], 0.5, 2.0),
+        ([1.0, 2.0, 3.0, 4.0], 0.75, 3.0),
+        ([1.0, 2.0, 3.0, 4.0, 5.0], 0.5, 3.0),
+        ([float(i) for i in range(1, 21)], 0.95, 19.0),
+        ([float(i) for i in range(1, 101)], 0.95, 95.0),
+    ],
+)
+def test_nearest_rank(values, fraction, expected):
+    assert _percentile(values, fraction) == expected
+
+
+def test_rank_is_clamped():
+    assert _percentile([1.0, 2.0, 3.0], 0.0) == 1.0
+    assert _percentile([1.0, 2.0, 3.0], 1.0) == 3.0
@@ -0,0 +1,84 @@
+"""
+JSON-lines question bundles: byte offsets, seeks, the debug sidecar and duplicate
+seeds.
+
+    python -m pytest tests/
+"""
+
+import json
+
+from src.sujets0.question_bundles import (
+    BUNDLE_SUFFIX,
+    DEBUG_SUFFIX,
+    dedupe_results,
+    load_offsets,
+    read_bundle,
+    read_question,
+    write_generator_bundle,
+    write_offsets,
+)
+
+
+def result(seed, statement, **extra):
+    return {"seed": seed, "success": True, "statement": statement, "answer": {"x": seed}, **extra}
+
+
+def test_offsets_point_at_each_line(tmp_path):
+    # Unordered, with non-ASCII text: offsets count bytes, not characters
+    results = [result(2, "x² = 4 ?"), result(0, "é"), result(1, "plain", stdout="printed")]
+    offsets = write_generator_bundle(tmp_path, "gen", results)
+
+    assert list(offsets) == ["0", "1", "2"]
+    data = (tmp_path / f"gen{BUNDLE_SUFFIX}").read_bytes()
+    assert sum(length for _, length in offsets.values()) == len(data)
+    for seed, (start, length) in offsets.items():
+        line = data[start : start + length]
+        assert line.endswith(b"\n")
+        assert json.loads(line)["seed"] == int(seed)
+
+
+def test_read_question_seeks_to_its_line(tmp_path):
+    results = [result(seed, f"q{seed} → ∞", traceback="boom") for seed in range(5)]
+    write_offsets(tmp_path, {"gen": write_generator_bundle(tmp_path, "gen", results)})
+
+    offsets = load_offsets(tmp_path)
+    assert read_question(tmp_path, "gen", 3, offsets)["statement"] == "q3 → ∞"
+    assert read_question(tmp_path, "gen", 9, offsets) is None
+    assert read_question(tmp_path, "other", 0, offsets) is None
+    # Debug fields only live in the sidecar
+    assert "traceback" not in read_question(tmp_path, "gen", 0, offsets)
+    assert read_bundle(tmp_path, "gen", debug=True)[4]["traceback"] == "boom"
+
+
+def test_debug_sidecar_removed_when_empty(tmp_path):
+    write_generator_bundle(tmp_path, "gen", [result(0, "a", stderr="warning")])
+    assert (tmp_path / f"gen{DEBUG_SUFFIX}").exists()
+    write_generator_bundle(tmp_path, "gen", [result(0, "a")])
+    assert not (tmp_path / f"gen{DEBUG_SUFFIX}").exists()
+
+
+def test_dedupe_keeps_lowest_seed_of_each_question():
+    results = [
+        result(3, "same  question", answer={"x": 1}),
+        result(1, "same question", answer={"x": 1}),
+        result(2, "other", answer={"x": 1}),
+        result(4, "same question", answer={"x": 2}),
+        {"seed": 5, "success": False, "statement": None},
+        {"seed": 6, "success": False, "statement": None},
+    ]
+    kept, aliases = dedupe_results(results)
+    # Whitespace is normalized; the answer is part of the question; failures all stay
+    assert [r["seed"] for r in kept] == [1, 2, 4, 5, 6]
+    assert aliases == {3: 1}
+
+
+def test_duplicate_seed_reads_the_line_it_repeats(tmp_path):
+    results = [result(0, "a"), result(1, "b"), result(2, "a", answer={"x": 0})]
+    kept, aliases = dedupe_results(results)
+    offsets = write_generator_bundle(tmp_path, "gen", kept, aliases)
+
+    assert offsets["2"] == offsets["0"]
+    assert len((tmp_path / f"gen{BUNDLE_SUFFIX}").read_bytes().splitlines()) == 2
+    record = read_question(tmp_path, "gen", 2, {"gen": offsets})
+    assert (record["seed"], record["same_as"], record["statement"]) == (2, 0, "a")
+    assert "same_as" not in read_question(tmp_path, "gen", 0, {"gen": offsets})
@@ -0,0 +1,72 @@
+"""
+Incremental mirroring of source trees into src/static.
+
+    python -m pytest tests/
+"""
+
+import os
+
+from src.lifespan.sync import sync_tree
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def test_second_run_only_touches_changes(tmp_path):
+    src, dest = tmp_path / "src", tmp_path / "dest"
+    write(src / "a.md", "a")
+    write(src / "sub" / "b.md", "b")
+
+    stats = sync_tree(src, dest, "test")
+    assert (stats.copied, stats.unchanged) == (2, 0)
+    assert (dest / "sub" / "b.md").read_text(encoding="utf-8") == "b"
+
+    stats = sync_tree(src, dest, "test")
+    assert (stats.copied, stats.unchanged, stats.deleted) == (0, 2, 0)
+
+    write(src / "a.md", "a, edited")
+    stats = sync_tree(src, dest, "test")
+    assert (stats.copied, stats.unchanged) == (1, 1)
+    assert (dest / "a.md").read_text(encoding="utf-8") == "a, edited"
+
+
+def test_orphans_are_removed_unless_kept(tmp_path):
+    src, dest = tmp_path / "src", tmp_path / "dest"
+    write(src / "a.css", "a{}")
+    write(dest / "a.css.gz", "generated")
+    write(dest / "gone" / "old.css", "old")
+
+    stats = sync_tree(src, dest, "test", keep=lambda rel_path: rel_path.endswith(".gz"))
+    assert stats.deleted == 1
+    assert (dest / "a.css.gz").is_file()
+    # Directories emptied by the cleanup go too
+    assert not (dest / "gone").exists()
+
+    write(dest / "stray.css", "stray")
+    assert sync_tree(src, dest, "test", delete_orphans=False).deleted == 0
+    assert (dest / "stray.css").is_file()
+
+
+def test_include_and_non_recursive(tmp_path):
+    src, dest = tmp_path / "src", tmp_path / "dest"
+    write(src / "gen_a.py", "")
+    write(src / "notes.txt", "")
+    write(src / "__pycache__" / "gen_a.pyc", "")
+
+    stats = sync_tree(
+        src, dest, "test", recursive=False, include=lambda path: path.suffix == ".py"
+    )
+    assert stats.copied == 1
+    assert sorted(os.listdir(dest)) == ["gen_a.py"]
+
+
+def test_hardlinked_files_share_storage(tmp_path):
+    src, dest = tmp_path / "src", tmp_path / "dest"
+    write(src / "a.md", "a")
+
+    stats = sync_tree(src, dest, "test", link="hardlink")
+    assert (stats.linked, stats.copied) == (1, 0)
+    assert os.path.samefile(src / "a.md", dest / "a.md")
+    assert sync_tree(src, dest, "test", link="hardlink").unchanged == 1
@@ -0,0 +1,229 @@
+"""
+Golden test for src/export/rewrite.py: the shared rule tables must produce exactly
+what the exporters' original str.replace chains produced, in every deployment mode.
+
+    python -m pytest tests/
+"""
+
+import importlib.util
+import random
+from pathlib import Path
+
+import pytest
+
+# Load the module on its own: importing the src package starts the whole app
+_spec = importlib.util.spec_from_file_location(
+    "url_rewrite", Path(__file__).parent.parent / "src" / "export" / "rewrite.py"
+)
+rewrite = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(rewrite)
+
+
+# ---------------------------------------------------------------------------
+# Original replace chains, copied verbatim from the exporters
+# ---------------------------------------------------------------------------
+
+
+def legacy_build_for_github(content, base_path="/maths.pm", modern_paths=False):
+    content = content.replace("http://127.0.0.1:8000/", "/")
+    content = content.replace("http://localhost:8000/", "/")
+    content = content.replace("https://127.0.0.1:8000/", "/")
+    content = content.replace("https://localhost:8000/", "/")
+    if base_path and not modern_paths:
+        content = content.replace('href="/', f'href="{base_path}/')
+        content = content.replace("href='/", f"href='{base_path}/")
+        content = content.replace('src="/', f'src="{base_path}/')
+        content = content.replace("src='/", f"src='{base_path}/")
+        content = content.replace('action="/', f'action="{base_path}/')
+        content = content.replace("import '/static/", f"import '{base_path}/static/")
+        content = content.replace('import "/static/', f'import "{base_path}/static/')
+        content = content.replace("from '/static/", f"from '{base_path}/static/")
+        content = content.replace('from "/static/', f'from "{base_path}/static/')
+        content = content.replace(
+            "import PMRuntime from '/static/js/",
+            f"import PMRuntime from '{base_path}/static/js/",
+        )
+        content = content.replace(
+            'import PMRuntime from "/static/js/',
+            f'import PMRuntime from "{base_path}/static/js/',
+        )
+    content = content.replace('.md?format=html"', '.html"')
+    content = content.replace(".md?format=html'", ".html'")
+    content = content.replace('.md"', '.html"')
+    content = content.replace(".md'", ".html'")
+    return content
+
+
+def legacy_static_builder(content_str, path, base_path=""):
+    content_str = content_str.replace("http://127.0.0.1:8000/", "/")
+    content_str = content_str.replace("http://localhost:8000/", "/")
+    content_str = content_str.replace("//127.0.0.1:8000/", "/")
+    content_str = content_str.replace('.md?format=html"', '.html"')
+    content_str = content_str.replace(".md?format=html'", ".html'")
+    content_str = content_str.replace('.md"', '.html"')
+    content_str = content_str.replace(".md'", ".html'")
+    if base_path:
+        content_str = content_str.replace('href="/', f'href="{base_path}/')
+        content_str = content_str.replace("href='/", f"href='{base_path}/")
+        content_str = content_str.replace('src="/', f'src="{base_path}/')
+        content_str = content_str.replace("src='/", f"src='{base_path}/")
+        content_str = content_str.replace('action="/', f'action="{base_path}/')
+        content_str = content_str.replace("import '/static/", f"import '{base_path}/static/")
+        content_str = content_str.replace('import "/static/', f'import "{base_path}/static/')
+        content_str = content_str.replace("from '/static/", f"from '{base_path}/static/")
+        content_str = content_str.replace('from "/static/', f'from "{base_path}/static/')
+        content_str = content_str.replace("from '@js/", f"from '{base_path}/static/js/")
+        content_str = content_str.replace('from "@js/', f'from "{base_path}/static/js/')
+        content_str = content_str.replace("import '@js/", f"import '{base_path}/static/js/")
+        content_str = content_str.replace('import "@js/', f'import "{base_path}/static/js/')
+    else:
+        depth = len(Path(path).parts) - 1
+        if depth > 0:
+            prefix = "../" * depth
+            content_str = content_str.replace('href="/', f'href="{prefix}')
+            content_str = content_str.replace("href='/", f"href='{prefix}")
+            content_str = content_str.replace('src="/', f'src="{prefix}')
+            content_str = content_str.replace("src='/", f"src='{prefix}")
+            content_str = content_str.replace('action="/', f'action="{prefix}')
+            content_str = content_str.replace("import '/static/", f"import '{prefix}static/")
+            content_str = content_str.replace('import "/static/', f'import "{prefix}static/')
+            content_str = content_str.replace("from '/static/", f"from '{prefix}static/")
+            content_str = content_str.replace('from "/static/', f'from "{prefix}static/')
+            content_str = content_str.replace("from '@js/", f"from '{prefix}static/js/")
+            content_str = content_str.replace('from "@js/', f'from "{prefix}static/js/')
+        else:
+            content_str = content_str.replace('href="/', 'href="')
+            content_str = content_str.replace("href='/", "href='")
+            content_str = content_str.replace('src="/', 'src="')
+            content_str = content_str.replace("src='/", "src='")
+            content_str = content_str.replace('action="/', 'action="')
+            content_str = content_str.replace("import '/static/", "import 'static/")
+            content_str = content_str.replace('import "/static/', 'import "static/')
+            content_str = content_str.replace("from '@js/", "from 'static/js/")
+            content_str = content_str.replace('from "@js/', 'from "static/js/')
+    return content_str
+
+
+def legacy_build_static_hardcoded(content, base_path="/maths.pm"):
+    content = content.replace("http://127.0.0.1:8000/", "/")
+    content = content.replace("http://localhost:8000/", "/")
+    content = content.replace("https://127.0.0.1:8000/", "/")
+    content = content.replace("https://localhost:8000/", "/")
+    if base_path:
+        content = content.replace('href="/', f'href="{base_path}/')
+        content = content.replace("href='/", f"href='{base_path}/")
+        content = content.replace('src="/', f'src="{base_path}/')
+        content = content.replace("src='/", f"src='{base_path}/")
+        content = content.replace('action="/', f'action="{base_path}/')
+        content = content.replace("import '/static/", f"import '{base_path}/static/")
+        content = content.replace('import "/static/', f'import "{base_path}/static/')
+        content = content.replace("from '/static/", f"from '{base_path}/static/")
+        content = content.replace('from "/static/', f'from "{base_path}/static/')
+        content = content.replace("from '@js/", f"from '{base_path}/static/js/")
+        content = content.replace('from "@js/', f'from "{base_path}/static/js/')
+    return content
+
+
+def hardcoded_rewriter(html, route):
+    rules = rewrite.base_path_rules("/maths.pm", js_alias_leads=("from '", 'from "'))
+    return rewrite.UrlRewriter(rules, rewrite.GITHUB_ORIGINS)(html)
+
+
+# (legacy function, shared rules) for every deployment mode
+MODES = {
+    "github modern": (
+        lambda html, route: legacy_build_for_github(html, "", True),
+        lambda html, route: rewrite.github_pages_rewriter("", False)(html),
+    ),
+    "github legacy /maths.pm": (
+        lambda html, route: legacy_build_for_github(html, "/maths.pm", False),
+        lambda html, route: rewrite.github_pages_rewriter("/maths.pm", True)(html),
+    ),
+    "hardcoded /maths.pm": (
+        lambda html, route: legacy_build_static_hardcoded(html, "/maths.pm"),
+        hardcoded_rewriter,
+    ),
+    "builder base_path /maths.pm": (
+        lambda html, route: legacy_static_builder(html, route, "/maths.pm"),
+        lambda html, route: rewrite.static_builder_rewriter("/maths.pm", 0)(html),
+    ),
+    "builder relative": (
+        lambda html, route: legacy_static_builder(html, route, ""),
+        lambda html, route: rewrite.static_builder_rewriter("", rewrite.route_depth(route))(html),
+    ),
+    "builder root": (
+        lambda html, route: legacy_static_builder(html, "/", ""),
+        lambda html, route: rewrite.static_builder_rewriter("", rewrite.route_depth("/"))(html),
+    ),
+}
+
+ROUTES = ("/", "/pm/a.md", "/pm/dataviz2/session_1_a.md", "/sujets0/form")
+
+# Edge cases the chained replaces handled through cascades
+GOLDEN_SNIPPETS = [
+    '<a href="http://127.0.0.1:8000/pm/dataviz2/session_1_a.md?format=html">x</a>',
+    "<a href='https://localhost:8000/pm/a.md'>x</a><img src='/static/i.svg'>",
+    '<script src="//127.0.0.1:8000/static/js/app.js"></script>',
+    '<img src="https://127.0.0.1:8000/static/x.png"><form action="/sujets0/form">',
+    "<script type=\"module\">import '/static/js/a.js'; import PMRuntime from '/static/js/pm.js';"
+    " import x from \"@js/b.js\"; import '@js/c.js'; import \"/static/d.js\";</script>",
+    '<a href="//cdn.example.org/lib.js">cdn</a><a href="/">home</a><a href="README.md">r</a>',
+    "from 'http://localhost:8000/static/js/x.js' from \"http://127.0.0.1:8000/@js/y.js\"",
+    "plain text http://localhost:8000/api/health and .md? and .md?format=html",
+    # Cascaded origins: stripping one exposes the next
+    '<a href="http://localhost:8000http://127.0.0.1:8000/pm/a.md">x</a>',
+    "src='https://localhost:8000https://127.0.0.1:8000/static/x.js'",
+]
+
+# Fragments the fuzzer glues together, so rules overlap and cascade
+FUZZ_TOKENS = [
+    *rewrite.GITHUB_ORIGINS,
+    *rewrite.BUILDER_ORIGINS,
+    "http://localhost:8000",
+    "http://127.0.0.1:8000",
+    "//",
+    *rewrite.ATTRIBUTE_LEADS,
+    *rewrite.STATIC_IMPORT_LEADS,
+    "import PMRuntime from '",
+    "/",
+    "/static/",
+    "static/js/",
+    "@js/",
+    ".md",
+    "?format=html",
+    '"',
+    "'",
+    "pm/a",
+    " ",
+    "<a ",
+    ">",
+]
+
+
+def fuzz_pages(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield "".join(rng.choice(FUZZ_TOKENS) for _ in range(rng.randint(1, 40)))
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("route", ROUTES)
+def test_golden_snippets(mode, route):
+    legacy, rewriter = MODES[mode]
+    for snippet in GOLDEN_SNIPPETS:
+        assert rewriter(snippet, route) == legacy(snippet, route), snippet
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_fuzzed_pages(mode):
+    legacy, rewriter = MODES[mode]
+    for i, page in enumerate(fuzz_pages(2000)):
+        route = ROUTES[i % len(ROUTES)]
+        assert rewriter(page, route) == legacy(page, route), page
+
+
+def test_cascaded_origins_are_all_stripped():
+    page = '<a href="http://localhost:8000http://127.0.0.1:8000/pm/a.md">x</a>'
+    assert rewrite.github_pages_rewriter("/maths.pm", True)(page) == (
+        '<a href="/maths.pm/pm/a.html">x</a>'
+    )
@@ -0,0 +1,132 @@
+"""
+Index arithmetic of the parameter hypercube and the validator's case planning and
+chunk merging (none of it needs teachers).
+
+    python -m pytest tests/
+"""
+
+import itertools
+from collections import Counter
+
+import pytest
+
+from src.sujets0.generators.hypercube import ParameterSpace
+from src.validate_generators import MAX_EXAMPLES, merge_results, plan_cases
+
+ANALYSIS = {
+    "parameters": {
+        "a": {"type": "random_integer", "possible_values": [1, 2, 3]},
+        "b": {"type": "random_choice", "possible_values": ["x", "y"]},
+        "c": {"type": "random_integer", "possible_values": [10, 20, 30, 40]},
+        # Not enumerable: left out of the space
+        "d": {"type": "random_choice", "possible_values": None},
+    }
+}
+PRODUCT = [
+    dict(zip("abc", values)) for values in itertools.product([1, 2, 3], "xy", [10, 20, 30, 40])
+]
+
+
+def empty_report():
+    return {
+        "cases": 0,
+        "passed": 0,
+        "scripted": 0,
+        "failures": Counter(),
+        "error_types": Counter(),
+        "examples": [],
+        "fingerprints": {},
+        "duplicate_examples": [],
+    }
+
+
+def test_values_at_follows_product_order():
+    space = ParameterSpace("toy", ANALYSIS)
+    assert space.param_names == ["a", "b", "c"]
+    assert space.size == len(PRODUCT) == 24
+    assert [space.values_at(i) for i in range(space.size)] == PRODUCT
+    assert list(space.iter_values()) == PRODUCT
+    assert space.values_at(-1) == PRODUCT[-1]
+    with pytest.raises(IndexError):
+        space.values_at(24)
+
+
+def test_slices_and_shards_keep_global_offsets():
+    space = ParameterSpace("toy", ANALYSIS)
+    view = space.slice(5, 17)
+    assert view.size == 12
+    assert [view.values_at(i) for i in range(view.size)] == PRODUCT[5:17]
+    assert list(view.iter_values()) == PRODUCT[5:17]
+
+    shards = [space.shard(i, 5) for i in range(5)]
+    assert [shard.start for shard in shards] == [0, 4, 9, 14, 19]
+    assert [values for shard in shards for values in shard.iter_values()] == PRODUCT
+
+
+def test_stratified_indices_cover_every_stratum():
+    space = ParameterSpace("toy", ANALYSIS)
+    indices = space.stratified_indices(8, 4, seed=1)
+    assert len(indices) == len(set(indices)) == 8
+    assert indices == sorted(indices)
+    # Two picks in each quarter of the index range
+    assert Counter(index // 6 for index in indices) == {0: 2, 1: 2, 2: 2, 3: 2}
+    assert indices == space.stratified_indices(8, 4, seed=1)
+
+    # Relative to the view, not to the full space
+    view = space.slice(12, 24)
+    assert all(0 <= index < view.size for index in view.stratified_indices(6, 3, seed=0))
+
+
+def test_plan_cases():
+    space = ParameterSpace("toy", ANALYSIS)
+    assert plan_cases(None, 10, 4, 7, 0) == ("seeds", list(range(7)))
+    assert plan_cases(space, 24, 4, 7, 0) == ("exhaustive", list(range(24)))
+    mode, indices = plan_cases(space, 10, 5, 7, 0)
+    assert mode == "stratified"
+    assert len(indices) == 10 and all(0 <= index < 24 for index in indices)
+
+
+def test_merge_results_adds_chunks():
+    report = empty_report()
+    first = empty_report()
+    first.update(cases=3, passed=2, scripted=3, fingerprints={"q1": 0, "q2": 1})
+    first["failures"]["solve"] = 1
+    first["error_types"]["ZeroDivisionError"] = 1
+    second = empty_report()
+    second.update(cases=2, passed=1, scripted=1, fingerprints={"q3": 5})
+    second["failures"].update(solve=1)
+    second["error_types"]["ZeroDivisionError"] = 1
+
+    merge_results(report, first)
+    merge_results(report, second)
+    assert (report["cases"], report["passed"], report["scripted"]) == (5, 3, 4)
+    assert report["failures"] == {"solve": 2}
+    assert report["error_types"] == {"ZeroDivisionError": 2}
+    assert report["fingerprints"] == {"q1": 0, "q2": 1, "q3": 5}
+    assert report["duplicate_examples"] == []
+
+
+def test_merge_results_keeps_first_index_of_duplicates():
+    report = empty_report()
+    later = empty_report()
+    later["fingerprints"] = {"q": 40}
+    earlier = empty_report()
+    earlier["fingerprints"] = {"q": 3}
+
+    # Chunks finish in any order
+    merge_results(report, later)
+    merge_results(report, earlier)
+    assert report["fingerprints"] == {"q": 3}
+    assert report["duplicate_examples"] == [[3, 40]]
+
+
+def test_merge_results_caps_examples_per_stage():
+    report = empty_report()
+    for start in (0, 100):
+        chunk = empty_report()
+        chunk["examples"] = [
+            {"stage": stage, "index": start + i} for stage in ("solve", "timeout") for i in range(4)
+        ]
+        merge_results(report, chunk)
+    stages = Counter(example["stage"] for example in report["examples"])
+    assert stages == {"solve": MAX_EXAMPLES, "timeout": MAX_EXAMPLES}